@@ -1,4 +1,5 @@
 from collections import Counter
+from model       import FloorGeometry
 
 class DXFAnalysis():
    general_count = Counter()
@@ -16,7 +17,9 @@ class DXFAnalysis():
       - a list of informations for every floor.
       """
       results        = []
-      for floor in building.get_path("dxf.floors", []):
+      floors         = FloorGeometry.with_geometry(building.get_path("dxf.floors", []))
+
+      for floor in floors:
          floor_info  = klass._analyse_dxf_floor(floor)
          results.append(floor_info)
 
@@ -1,12 +1,13 @@
 from utils                 import ConfigManager
 from persistence           import MongoDBPersistenceManager
-from model                 import RoomCategory,Building,BuildingView,AvailableService
+from model                 import RoomCategory,Building,BuildingView,RoomView,AvailableService,DataVersion
 from tasks                 import LookupTableTask
 from model.odm             import ODMModel
 from bson.json_util        import dumps
-from flask                 import Flask, jsonify,abort,request,send_from_directory,render_template,Markup
+from flask                 import Flask, jsonify,abort,request,send_from_directory,render_template,Markup,Response,json,stream_with_context
 from datetime              import datetime
 from api.model             import RoomTimeTable
+from api.response_cache    import ResponseCache
 
 
 app                     = Flask(__name__,static_url_path='')
@@ -16,10 +17,15 @@ app.api_namespace       = '/api'
 app.api_version         = 'v1.0'
 ODMModel.set_pm( app.persistence )
 BuildingView.setup_collection()
+RoomView.setup_collection()
 # radius used with GeoSpatial Query (meters)
 app.radius              = 2000
+# maximum number of buildings of a page
+app.max_page_size       = 1000
 app.maps_folder         = 'static-maps'
 app.lookup_table_folder = 'static-table'
+# serialized responses, valid until the next csv/dxf update
+app.response_cache      = ResponseCache(DataVersion.current)
 
 ###########
 # HELPERS #
@@ -28,10 +34,6 @@ app.lookup_table_folder = 'static-table'
 def url_for_endpoint(url_endpoint):
    return '/'.join( [app.api_namespace,app.api_version,url_endpoint] )+'/'
 
-def filter_buildings_by_service(buildings,service,remove_floor_details=False):
-  return [ b for b in buildings if len([ f for f in b['floors'] if service in f['available_services'] ])>0  ]
-
-
 def maps_url(b_id,f_id):
    return '{0}://{1}/{2}/{3}/{3}_{4}.svg'.format(app.protocol,app.domain,app.maps_folder,b_id,f_id)
 
@@ -40,13 +42,25 @@ def lookup_table_url(db_name):
 
 def prepare_floor_for_api(floor):
    rooms = []
-   for r_id in floor['rooms']:
+   for r_id in floor.get('rooms', {}):
       room           = floor['rooms'][r_id]
       room['r_id']   = r_id
       rooms.append(room)
    floor['rooms'] = rooms;
    return floor
 
+def find_room_for_api(b_id,r_id):
+   # a single indexed read on the flattened room index, see RoomView
+   room = RoomView.find_room(b_id,r_id)
+   if not room:
+      return None
+
+   room        = room.as_dict()
+   room['map'] = maps_url(b_id,room['f_id'])
+   del room['_id']
+
+   return room
+
 def prepare_building_for_api(building):
    building['b_id'] = building['_id']
    del building['_id']
@@ -54,11 +68,73 @@ def prepare_building_for_api(building):
    # remove unnecessary nested object used in GeoJson coordinates structure
    building['coordinates'] = building['coordinates']['coordinates']
 
-   #normalize floors
-   building['floors'] = [ prepare_floor_for_api(f) for f in building['floors'] ]
+   #normalize floors, unless excluded by the query projection
+   if 'floors' in building:
+      building['floors'] = [ prepare_floor_for_api(f) for f in building['floors'] ]
 
    return building
 
+def pagination_args():
+   """
+   Returns the (limit, after) pagination arguments of the request: limit is
+   None if not given, after is the b_id of the last building of the previous
+   page, None for the first page. Limits not between 1 and app.max_page_size
+   are rejected with a 400 response.
+   """
+   limit = request.args.get('limit')
+   after = request.args.get('after') or None
+
+   if limit is not None:
+      try:
+         limit = int(limit)
+      except ValueError:
+         abort(400)
+
+      if limit <= 0 or limit > app.max_page_size:
+         abort(400)
+
+   return limit, after
+
+def buildings_response(buildings, limit=None):
+   """
+   Returns the json response listing buildings, an iterable of building
+   documents read from the db.
+
+   When limit is given, buildings must hold up to limit+1 documents: the one
+   exceeding the limit is not returned, and only tells that another page
+   exists, in which case the response 'next' is the after argument of the
+   following page.
+
+   With the stream argument the array is written one building at a time,
+   while reading the Mongo cursor, instead of being serialized as a whole.
+   """
+   buildings = ( prepare_building_for_api(b) for b in buildings )
+
+   if not request.args.get('stream'):
+      buildings   = list(buildings)
+      result      = { 'buildings': buildings[:limit] }
+
+      if limit is not None and len(buildings) > limit:
+         result['next'] = buildings[limit - 1]['b_id']
+
+      return jsonify(result)
+
+   def generate():
+      yield '{"buildings":['
+
+      last_id = None
+      for i, b in enumerate(buildings):
+         if i == limit:
+            yield '],"next":{}}}'.format(json.dumps(last_id))
+            return
+
+         yield (i and ',' or '') + json.dumps(b)
+         last_id = b['b_id']
+
+      yield ']}'
+
+   return Response(stream_with_context(generate()), mimetype='application/json')
+
 @app.before_request
 def prepare_buildings_collection():
    app.buildings     = BuildingView.get_collection()
@@ -72,6 +148,7 @@ def prepare_buildings_collection():
 
 # Buildings
 @app.route( url_for_endpoint('buildings'),methods=['GET'] )
+@app.response_cache.cached
 def api_get_buildings():
    """
       <h3>/buildings/<em>?service=XXX</em></h3>
@@ -79,37 +156,38 @@ def api_get_buildings():
       <h5>Parameters</h6>
       <p><em>service[string]</em> : could be one of the available services, if provided returns only those buildings with the specified service</p>
       <p><em>show_floors[boolean] default false</em>: show every building with its floors detailed or return for every building its details and a collapsed list of available services</p>
+      <p><em>limit[int]</em> : if provided (at most 1000), returns at most limit buildings, and the b_id to be passed as <em>after</em> to get the following ones in <em>next</em>, if any</p>
+      <p><em>after[string]</em> : the <em>next</em> value of the previous page</p>
+      <p><em>stream[boolean] default false</em>: write the response while reading buildings, without building it in memory</p>
 
    """
-   buildings = list(app.buildings.find({'building_name':{'$exists':True}}))
-
    show_floors = request.args.get('show_floors') or False
+   service     = request.args.get('service') or None
+   query       = {'building_name':{'$exists':True}}
 
-   for b in buildings:
-      b = prepare_building_for_api(b)
+   # filter by available service, on the indexed building level services
+   if service:
+      query['available_services'] = service
 
-      # collapse available services
-      if not show_floors:
-         services = set()
-         for f in b['floors']:
-            del f['rooms']
-            for s in f['available_services']:
-               services.add(s)
+   # floors are only returned with floor details
+   projection  = None if show_floors else { 'floors' : 0 }
+   limit,after = pagination_args()
 
-         b['available_services'] = list(services)
+   if after:
+      query['_id'] = { '$gt' : after }
 
-   # filter by available service
-   service = request.args.get('service') or None
-   if service:
-      buildings = filter_buildings_by_service(buildings,service)
+   buildings   = app.buildings.find(query, projection)
 
-   if not show_floors:
-      for b in buildings:
-         del b['floors']
+   # pages follow the _id order
+   if limit or after:
+      buildings = buildings.sort('_id')
+   if limit:
+      buildings = buildings.limit(limit + 1)
 
-   return jsonify({ 'buildings': buildings })
+   return buildings_response(buildings, limit)
 
 @app.route( url_for_endpoint('buildings/<b_id>'),methods=['GET'] )
+@app.response_cache.cached
 def api_get_building_by_id(b_id):
    """
       <h3>/buildings/<em>b_id</em></h3>
@@ -133,6 +211,7 @@ def api_get_building_by_id(b_id):
    return jsonify(building)
 
 @app.route( url_for_endpoint('buildings/near/<float:lat>/<float:lng>'),methods=['GET'])
+@app.response_cache.cached
 def api_get_buildings_near_position(lat,lng):
    """
       <h3>/buildings/near/<em>lat</em>/<em>lng</em><em>?radius=X</em></h3>
@@ -142,6 +221,9 @@ def api_get_buildings_near_position(lat,lng):
       <p><em>lng[float]</em> : longitude</p>
       <p><em>radius[float]</em> : radius in meters, default 2000m</p>
       <p><em>service[string]</em> : one of the valid available-services</p>
+      <p><em>limit[int]</em> : if provided (at most 1000), returns at most limit buildings, and the b_id to be passed as <em>after</em> to get the following ones in <em>next</em>, if any</p>
+      <p><em>after[string]</em> : the <em>next</em> value of the previous page</p>
+      <p><em>stream[boolean] default false</em>: write the response while reading buildings, without building it in memory</p>
 
    """
 
@@ -149,21 +231,51 @@ def api_get_buildings_near_position(lat,lng):
    if (not lat) or (not lng):
       abort(400)
 
-   geo_json_point = {
-      '$geometry' : {
-         'type'         : 'Point',
-         'coordinates'  : [ lng , lat ] },
-         '$maxDistance' : int(r)
+   query       = {}
+   service     = request.args.get('service') or None
+   if service:
+      query['available_services'] = service
+
+   limit,after = pagination_args()
+   if not (limit or after):
+      geo_json_point = {
+         '$geometry' : {
+            'type'         : 'Point',
+            'coordinates'  : [ lng , lat ] },
+            '$maxDistance' : int(r)
+      }
+
+      query['coordinates'] = { '$near' : geo_json_point }
+      return buildings_response(app.buildings.find(query))
+
+   # pages follow the (distance, _id) order, computed by $geoNear
+   geo_near = {
+      'near'            : { 'type' : 'Point', 'coordinates' : [ lng , lat ] },
+      'distanceField'   : 'distance',
+      'maxDistance'     : int(r),
+      'spherical'       : True,
+      'query'           : query
    }
+   page_filter = []
 
-   buildings   = list(app.buildings.find({ 'coordinates' : { '$near' : geo_json_point } }))
+   if after:
+      last = list(app.buildings.aggregate([ { '$geoNear' : dict(geo_near, query={ '_id' : after }) } ]))
+      if not last:
+         abort(400)
 
-   service = request.args.get('service') or None
-   if service:
-      buildings = filter_buildings_by_service(buildings,service)
+      distance                = last[0]['distance']
+      geo_near['minDistance'] = distance
+      page_filter = [{ '$match' : { '$or' : [
+         { 'distance' : { '$gt' : distance } },
+         { 'distance' : distance, '_id' : { '$gt' : after } }
+      ] } }]
 
-   buildings = [ prepare_building_for_api(b) for b in buildings ]
-   return jsonify({ 'buildings': buildings })
+   pipeline = [ { '$geoNear' : geo_near } ] + page_filter + [ { '$sort' : { 'distance' : 1, '_id' : 1 } } ]
+   if limit:
+      pipeline.append({ '$limit' : limit + 1 })
+   pipeline.append({ '$project' : { 'distance' : 0 } })
+
+   return buildings_response(app.buildings.aggregate(pipeline), limit)
 
 # Categories
 @app.route( url_for_endpoint('categories'),methods=['GET'])
@@ -195,6 +307,7 @@ def api_get_lookup_table():
    return jsonify({ 'update': to_update , 'url':lookup_table_url(task.db_name()) })
 
 @app.route( url_for_endpoint('rooms/<b_id>'),methods=['GET'] )
+@app.response_cache.cached
 def api_get_rooms_in_building(b_id):
    """
       <h3>/rooms/<em>b_id</em></h3>
@@ -211,6 +324,7 @@ def api_get_rooms_in_building(b_id):
    return jsonify({'floors':building['floors']})
 
 @app.route( url_for_endpoint('rooms/<b_id>/<r_id>'),methods=['GET'] )
+@app.response_cache.cached
 def api_get_room_by_id(b_id,r_id):
    """
       <h3>/rooms/<em>b_id</em>/<em>r_id</em></h3>
@@ -221,25 +335,11 @@ def api_get_room_by_id(b_id,r_id):
 
    """
 
-   building = app.buildings.find_one({'_id':b_id})
-   if not building:
+   room = find_room_for_api(b_id,r_id)
+   if not room:
       abort(404)
 
-   for floor in building['floors']:
-      room        = floor['rooms'].get(r_id,None)
-      coordinates = building['coordinates']['coordinates']
-      if room:
-         room['b_id']                  = b_id
-         room['building_name']         = building['building_name']
-         room['building_address']      = building['address']
-         room['building_coordinates']  = [coordinates[0],coordinates[1]]
-         room['f_id']                  = floor['f_id']
-         room['floor']                 = floor['floor_name']
-         room['map']                   = maps_url(b_id,floor['f_id'])
-         room['r_id']                  = r_id
-         return jsonify(room)
-
-   abort(404)
+   return jsonify(room)
 
 @app.route( url_for_endpoint('rooms/timetable/<b_id>/<r_id>'),methods=['GET'] )
 def api_get_room_timetable(b_id,r_id):
@@ -270,37 +370,23 @@ def api_show_room_by_id(b_id,r_id):
 
    """
 
-   building = app.buildings.find_one({'_id':b_id})
-   if not building:
+   room = find_room_for_api(b_id,r_id)
+   if not room:
       abort(404)
 
-   for floor in building['floors']:
-      room        = floor['rooms'].get(r_id,None)
-      coordinates = building['coordinates']['coordinates']
-      if room:
-         room['b_id']                  = b_id
-         room['building_name']         = building['building_name']
-         room['building_address']      = building['address']
-         room['building_coordinates']  = [coordinates[0],coordinates[1]]
-         room['f_id']                  = floor['f_id']
-         room['floor']                 = floor['floor_name']
-         room['map']                   = maps_url(b_id,floor['f_id'])
-
-         building_id          = b_id
-         building_name        = building['building_name']
-         building_address     = room['building_address']
-         lat                  = coordinates[1]
-         lng                  = coordinates[0]
-         floor_name           = floor['floor_name']
-         map_url              = maps_url(b_id,floor['f_id'])
-         room_name            = room['room_name']
-         room_id              = r_id
-
-         return render_template('map_show.html',**locals())
-
-   abort(404)
+   building_id          = b_id
+   building_name        = room['building_name']
+   building_address     = room['building_address']
+   lng, lat             = room['building_coordinates']
+   floor_name           = room['floor']
+   map_url              = room['map']
+   room_name            = room['room_name']
+   room_id              = r_id
+
+   return render_template('map_show.html',**locals())
 
 @app.route( url_for_endpoint('available-services/<lang>'),methods=['GET'] )
+@app.response_cache.cached
 def api_get_available_services(lang):
    """
       <h3>/available-services/</h3>
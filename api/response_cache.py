@@ -0,0 +1,86 @@
+from flask     import request, current_app, Response
+import functools, hashlib
+
+class ResponseCache():
+   """
+   Cache of the serialized bodies of GET responses, per host, path and query
+   arguments. Entries are valid as long as the data version they were built
+   with does not change. Their ETag is made of the version and a hash of the
+   key, so that clients sending it with If-None-Match receive a 304 response,
+   as long as the entry is cached.
+
+   Only successful, not streamed, responses are cached. When the cache is
+   full the oldest entries are discarded.
+
+   Usage:
+   cache = ResponseCache(DataVersion.current)
+
+   @app.route("/buildings/")
+   @cache.cached
+   def buildings():
+      ...
+   """
+
+   def __init__(self, version_function, max_entries = 1024):
+      """
+      Arguments:
+      - version_function: a function returning the current data version;
+      - max_entries: maximum number of cached responses.
+      """
+      self.version_function   = version_function
+      self.max_entries        = max_entries
+      self._entries           = {}
+      self._version           = None
+
+   def cached(self, route):
+      """Decorator caching the responses of a Flask view function"""
+
+      @functools.wraps(route)
+      def wrapper(*args, **kargs):
+         version  = self.version_function()
+
+         # Entries of a previous version are never valid again
+         if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+         key   = (request.host, request.path, tuple(sorted(request.args.items(multi = True))))
+         etag  = self._etag(version, key)
+         entry = self._entries.get(key)
+
+         # Only responses known to be successful are not modified
+         if entry is not None and request.if_none_match.contains(etag):
+            response = Response(status = 304)
+            response.set_etag(etag)
+            return response
+
+         if entry is None:
+            response = current_app.make_response(route(*args, **kargs))
+
+            if response.status_code != 200:
+               return response
+
+            # Streamed bodies are not buffered, that would defeat streaming
+            if response.is_streamed:
+               response.set_etag(etag)
+               return response
+
+            entry = (response.get_data(), response.mimetype)
+            self._store(key, entry)
+
+         response = Response(entry[0], mimetype = entry[1])
+         response.set_etag(etag)
+         return response
+
+      return wrapper
+
+   @classmethod
+   def _etag(klass, version, key):
+      digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+      return "v{}-{}".format(version, digest)
+
+   def _store(self, key, entry):
+      while len(self._entries) >= self.max_entries:
+         del self._entries[next(iter(self._entries))]
+
+      self._entries[key] = entry
@@ -0,0 +1 @@
+from .synthetic_floor import SyntheticFloor
@@ -0,0 +1,252 @@
+"""
+Microbenchmarks of the hot geometry paths: Point arithmetic, segment
+intersection, point in polygon, polygon simplification and self crossing
+check, floor normalization and svg drawing (svgwrite and streaming).
+
+Every case runs on a synthetic floor (see SyntheticFloor) of configurable
+size, generated with a fixed seed. Results are written as json, and a
+previous json file can be supplied to report the relative change of each
+case, flagging regressions.
+
+Usage:
+python -m benchmarks.geometry_benchmark --rooms 200 --output after.json
+python -m benchmarks.geometry_benchmark --compare before.json
+"""
+from .synthetic_floor   import SyntheticFloor
+from model.drawable     import Point, Polygon
+from tasks.drawers      import FloorDrawer, StreamingFloorDrawer
+from utils.logger       import Logger
+import argparse, json, platform, random, time, numpy
+
+class GeometryBenchmark():
+   """
+   Each benchmark case is a pair of methods: setup_<name> returns the data the
+   case works on, run_<name> is the timed part. Setup is called again before
+   every repetition, so that cases may modify their data.
+   """
+
+   cases = [
+      "point_arithmetic",
+      "segment_intersect_with",
+      "polygon_contains_point",
+      "simplify_close_points",
+      "simplify_long_polylines",
+      "is_self_crossing",
+      "floor_normalize",
+      "draw_floor",
+      "stream_floor"
+   ]
+
+   def __init__(self, rooms = 100, vertices = 20, walls = 1000, seed = 42, polyline_vertices = 5000):
+      self.generator          = SyntheticFloor(rooms, vertices, walls, seed)
+      self.seed               = seed
+      self.polyline_vertices  = polyline_vertices
+
+   def run(self, repeat = 5, only = None):
+      """
+      Runs the benchmark cases, returning a dictionary of results.
+
+      Arguments:
+      - repeat: how many times each case is timed;
+      - only: an optional list of case names to be run.
+      """
+      results = {}
+
+      for name in self.cases:
+         if only and name not in only:
+            continue
+
+         times = []
+         for _ in range(repeat):
+            data  = getattr(self, "setup_" + name)()
+            start = time.perf_counter()
+            getattr(self, "run_" + name)(data)
+            times.append(time.perf_counter() - start)
+
+         results[name] = {
+            "best_s"    : min(times),
+            "mean_s"    : sum(times) / len(times),
+            "repeat"    : repeat
+         }
+
+      return results
+
+   def parameters(self):
+      return {
+         "rooms"     : self.generator.n_rooms,
+         "vertices"  : self.generator.n_vertices,
+         "walls"     : self.generator.n_walls,
+         "seed"      : self.seed,
+         "polyline_vertices" : self.polyline_vertices
+      }
+
+   #########
+   # CASES #
+   #########
+
+   def setup_point_arithmetic(self):
+      rnd = random.Random(self.seed)
+      return [ Point(rnd.uniform(0, 1000), rnd.uniform(0, 1000)) for _ in range(20000) ]
+
+   def run_point_arithmetic(self, points):
+      origin = Point(0, 0)
+      for p in points:
+         p.traslate(10, -10).scale(1.5).rotate(30)
+         p.distance_to(origin)
+         p == origin
+         p.clone()
+
+   def setup_segment_intersect_with(self):
+      rnd = random.Random(self.seed)
+      return self.generator.segments(600, rnd)
+
+   def run_segment_intersect_with(self, segments):
+      for i, s1 in enumerate(segments):
+         for s2 in segments[i + 1:i + 21]:
+            s1.intersect_with(s2)
+
+   def setup_polygon_contains_point(self):
+      floor    = self.generator.floor(normalize = False)
+      rnd      = random.Random(self.seed)
+      points   = [
+            Point(rnd.uniform(-10, 130), rnd.uniform(-10, 130))
+            for _ in range(20)
+         ]
+
+      # Points are relative to the anchor point of each room
+      return [ (r.polygon, points) for r in floor.rooms ]
+
+   def run_polygon_contains_point(self, polygons):
+      for polygon, points in polygons:
+         for p in points:
+            polygon._contains_point(p)
+
+   def setup_simplify_close_points(self):
+      rnd      = random.Random(self.seed)
+      polygons = [ r.polygon for r in self.generator.rooms(rnd) ]
+      polyline = self.generator.polyline(2000, rnd = rnd)
+
+      polygons.append(Polygon.from_absolute_coordinates(polyline))
+      return polygons
+
+   def run_simplify_close_points(self, polygons):
+      for polygon in polygons:
+         polygon.simplify_close_points(tollerance = 0.8)
+
+   def setup_simplify_long_polylines(self):
+      rnd = random.Random(self.seed)
+      return [
+            Polygon.from_absolute_coordinates(self.generator.polyline(self.polyline_vertices, rnd = rnd))
+            for _ in range(5)
+         ]
+
+   def run_simplify_long_polylines(self, polygons):
+      for polygon in polygons:
+         polygon.simplify_close_points(tollerance = 0.8)
+
+   def setup_is_self_crossing(self):
+      rnd = random.Random(self.seed)
+      return [ r.polygon for r in self.generator.rooms(rnd) ]
+
+   def run_is_self_crossing(self, polygons):
+      for polygon in polygons:
+         polygon.is_self_crossing()
+
+   def setup_floor_normalize(self):
+      return self.generator.floor(normalize = False)
+
+   def run_floor_normalize(self, floor):
+      floor.normalize()
+      floor.discard_tiny_lines()
+
+   def setup_draw_floor(self):
+      # Compiles and caches the svg stylesheet, which is not part of the case
+      if not FloorDrawer.css_style:
+         FloorDrawer.draw_floor({ "rooms": {} })
+
+      return self.generator.merged_floor()
+
+   def run_draw_floor(self, floor):
+      FloorDrawer.draw_floor(floor).tostring()
+
+   def setup_stream_floor(self):
+      return self.setup_draw_floor()
+
+   def run_stream_floor(self, floor):
+      StreamingFloorDrawer.floor_to_string(floor)
+
+def compare(results, previous, threshold = 0.1):
+   """
+   Compares two results dictionaries.
+
+   Returns a dictionary with, for each case present in both, the ratio of
+   the best times (current / previous) and whether it is a regression, i.e.
+   more than threshold slower.
+   """
+   comparison = {}
+
+   for name, current in results.items():
+      if name not in previous:
+         continue
+
+      ratio = current["best_s"] / previous[name]["best_s"]
+      comparison[name] = {
+         "ratio"        : ratio,
+         "regression"   : ratio > 1 + threshold
+      }
+
+   return comparison
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description = "Microbenchmarks of the geometry model.")
+   parser.add_argument("--rooms", type = int, default = 100)
+   parser.add_argument("--vertices", type = int, default = 20)
+   parser.add_argument("--walls", type = int, default = 1000)
+   parser.add_argument("--seed", type = int, default = 42)
+   parser.add_argument("--polyline-vertices", type = int, default = 5000,
+                      help = "Vertices of the polylines of the simplify_long_polylines case.")
+   parser.add_argument("--repeat", type = int, default = 5)
+   parser.add_argument("--only", type = str, nargs = "*", choices = GeometryBenchmark.cases,
+                      help = "Cases to be run, all by default.")
+   parser.add_argument("--output", type = str, default = None,
+                      help = "File where results are written, stdout by default.")
+   parser.add_argument("--compare", type = str, default = None,
+                      help = "A previous json output to compare results with.")
+   parser.add_argument("--threshold", type = float, default = 0.1,
+                      help = "Relative slowdown reported as regression.")
+
+   args        = parser.parse_args()
+   Logger.verbosity = Logger.VERBOSITY_WARNING
+
+   benchmark   = GeometryBenchmark(
+         args.rooms, args.vertices, args.walls, args.seed, args.polyline_vertices
+      )
+   output      = {
+      "parameters"   : benchmark.parameters(),
+      "environment"  : {
+         "python"    : platform.python_version(),
+         "numpy"     : numpy.__version__,
+         "machine"   : platform.machine()
+      },
+      "results"      : benchmark.run(args.repeat, args.only)
+   }
+
+   if args.compare:
+      with open(args.compare) as fp:
+         previous = json.load(fp)
+
+      if previous.get("parameters") != output["parameters"]:
+         Logger.warning("Compared results were obtained with different parameters")
+
+      output["comparison"] = compare(output["results"], previous["results"], args.threshold)
+
+   text = json.dumps(output, indent = 3, sort_keys = True)
+
+   if args.output:
+      with open(args.output, "w") as fp:
+         fp.write(text + "\n")
+   else:
+      print(text)
+
+   if any(c["regression"] for c in output.get("comparison", {}).values()):
+      exit(1)
@@ -0,0 +1,96 @@
+"""
+Memory benchmark of the geometry model: builds a synthetic floor, expands it
+into the temporary objects created on dxf import and svg drawing (polygon
+points, segments, clones, bounding boxes), and reports peak RSS, traced
+memory and the number of live allocations.
+
+Each measure runs in a fresh process, so that peak RSS is not affected by
+previous runs. The output is json: run it on two commits to compare them.
+
+Usage:
+python -m benchmarks.memory_benchmark --rooms 400 --vertices 40 --walls 20000
+"""
+from .synthetic_floor   import SyntheticFloor
+from model.drawable     import Point, Segment, Text
+import argparse, json, multiprocessing, resource, sys, tracemalloc
+
+def instance_size(obj):
+   """Returns the size in bytes of obj, including its __dict__ if any"""
+   size = sys.getsizeof(obj)
+   if hasattr(obj, "__dict__"):
+      size += sys.getsizeof(obj.__dict__)
+
+   return size
+
+def measure_floor(rooms, vertices, walls, trace = True):
+   """
+   Builds a floor and its derived objects, optionally tracing allocations
+   (tracing affects the peak RSS, which is hence reported only untraced).
+
+   Returns a dictionary of measures.
+   """
+   if trace:
+      tracemalloc.start()
+
+   floor    = SyntheticFloor(rooms, vertices, walls).floor()
+   walls    = list(floor.walls)
+   windows  = list(floor.windows)
+   points   = [ list(r.polygon.points) for r in floor.rooms ]
+   segments = [ r.polygon.as_segment_list() for r in floor.rooms ]
+   clones   = [ r.polygon.clone() for r in floor.rooms ]
+   clones  += [ Segment(l.start.clone(), l.end.clone()) for l in walls ]
+
+   result = {
+      "segments" : len(walls) + len(windows) + sum(len(s) for s in segments),
+      "points"   : sum(len(p) for p in points)
+   }
+
+   if trace:
+      snapshot       = tracemalloc.take_snapshot()
+      current, peak  = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+
+      result["traced_current_bytes"]   = current
+      result["traced_peak_bytes"]      = peak
+      result["live_allocations"]       = sum(s.count for s in snapshot.statistics("filename"))
+   else:
+      result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+   return result
+
+def run(rooms, vertices, walls):
+   """Runs measure_floor in a fresh process and returns its results"""
+   context = multiprocessing.get_context("spawn")
+   result  = {}
+
+   for trace in (False, True):
+      with context.Pool(1) as pool:
+         result.update(pool.apply(measure_floor, (rooms, vertices, walls, trace)))
+
+   return {
+      "parameters"   : { "rooms": rooms, "vertices": vertices, "walls": walls },
+      "instances"    : {
+         "Point"     : instance_size(Point(1, 2)),
+         "Segment"   : instance_size(Segment(Point(1, 2), Point(3, 4))),
+         "Text"      : instance_size(Text("R001", Point(1, 2)))
+      },
+      "floor"        : result
+   }
+
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description = "Memory benchmark of the geometry model.")
+   parser.add_argument("--rooms", type = int, default = 400)
+   parser.add_argument("--vertices", type = int, default = 40)
+   parser.add_argument("--walls", type = int, default = 20000)
+   parser.add_argument("--output", type = str, default = None,
+                      help = "File where results are written, stdout by default.")
+
+   args     = parser.parse_args()
+   results  = run(args.rooms, args.vertices, args.walls)
+   text     = json.dumps(results, indent = 3, sort_keys = True)
+
+   if args.output:
+      with open(args.output, "w") as fp:
+         fp.write(text + "\n")
+   else:
+      print(text)
@@ -0,0 +1,157 @@
+from model           import Room, Floor
+from model.drawable  import Point, Segment, Polygon, Text
+from math            import sin, cos, pi
+import random
+
+class SyntheticFloor():
+   """
+   Generates floors with a configurable number of rooms, vertices per room
+   and walls, laid out as in the floors read from dxf files: rooms on a grid,
+   one text per room, wall and window segments around rooms.
+
+   The same seed always generates the same floor, so that benchmark results
+   can be compared across commits.
+
+   Usage:
+   generator   = SyntheticFloor(rooms = 100, vertices = 40, walls = 2000)
+   floor       = generator.floor()
+   """
+
+   def __init__(self, rooms = 100, vertices = 20, walls = 1000, seed = 42):
+      """
+      Arguments:
+      - rooms: number of rooms of the floor;
+      - vertices: number of vertices of each room polygon (at least 4);
+      - walls: number of wall segments, windows are a tenth of them;
+      - seed: seed of the random generator.
+      """
+      self.n_rooms      = rooms
+      self.n_vertices   = max(4, vertices)
+      self.n_walls      = walls
+      self.seed         = seed
+      self.room_size    = 100
+      self.columns      = max(1, int(self.n_rooms ** 0.5))
+
+   def room_origin(self, i):
+      """Returns the bottom left corner of the cell of the i-th room"""
+      return (
+         (i % self.columns) * self.room_size * 1.2,
+         (i // self.columns) * self.room_size * 1.2
+      )
+
+   def room_coordinates(self, i, rnd):
+      """
+      Returns the absolute coordinates of the i-th room: a rectangle whose
+      sides are split in slightly jagged vertices, like the ones drawn by hand
+      in CAD files.
+      """
+      x0, y0   = self.room_origin(i)
+      size     = self.room_size
+      per_side = self.n_vertices // 4
+      extra    = self.n_vertices - per_side * 4
+      corners  = [ (0, 0), (size, 0), (size, size), (0, size) ]
+      coords   = []
+
+      for side, (ax, ay) in enumerate(corners):
+         bx, by   = corners[(side + 1) % 4]
+         n        = per_side + (side < extra and 1 or 0)
+
+         for k in range(n):
+            t     = k / n
+            noise = k and rnd.uniform(-0.2, 0.2) or 0
+            coords.append((
+                  x0 + ax + (bx - ax) * t + noise * (by - ay) / size,
+                  y0 + ay + (by - ay) * t + noise * (ax - bx) / size
+               ))
+
+      return coords
+
+   def polyline(self, n, radius = 1000, rnd = None):
+      """
+      Returns a closed polyline with n vertices on a noisy circle, with some
+      consecutive points closer than the tollerances used on dxf import.
+      """
+      rnd      = rnd or random.Random(self.seed)
+      coords   = []
+
+      for k in range(n):
+         angle = 2 * pi * k / n
+         r     = radius + rnd.uniform(-1, 1)
+         coords.append((r * cos(angle), r * sin(angle)))
+
+         if k % 7 == 0:
+            coords.append((r * cos(angle) + 0.1, r * sin(angle) + 0.1))
+
+      coords.append(coords[0])
+      return coords
+
+   def rooms(self, rnd):
+      return [
+            Room(Polygon.from_absolute_coordinates(self.room_coordinates(i, rnd)))
+            for i in range(self.n_rooms)
+         ]
+
+   def texts(self, rnd):
+      half = self.room_size / 2
+      return [
+            Text("R{:03d}".format(i), Point(x + half, y + half))
+            for i, (x, y) in ( (i, self.room_origin(i)) for i in range(self.n_rooms) )
+         ]
+
+   def segments(self, n, rnd):
+      width    = self.columns * self.room_size * 1.2
+      height   = (self.n_rooms // self.columns + 1) * self.room_size * 1.2
+      result   = []
+
+      for k in range(n):
+         x, y     = rnd.uniform(0, width), rnd.uniform(0, height)
+         length   = rnd.uniform(5, self.room_size)
+         if k % 2:
+            result.append(Segment(Point(x, y), Point(x + length, y)))
+         else:
+            result.append(Segment(Point(x, y), Point(x, y + length)))
+
+      return result
+
+   def floor(self, normalize = True):
+      """
+      Builds a floor following the same steps of DxfReader: rooms and lines
+      are added, texts are associated to rooms, then the floor is normalized.
+      """
+      rnd   = random.Random(self.seed)
+      rooms = self.rooms(rnd)
+      walls = self.segments(self.n_walls, rnd)
+      wins  = self.segments(self.n_walls // 10, rnd)
+
+      floor = Floor("1234", "0", rooms, walls, wins)
+      floor.associate_room_texts(self.texts(rnd))
+
+      if normalize:
+         floor.normalize()
+
+      return floor
+
+   def merged_floor(self):
+      """
+      Returns the floor as a dictionary in the format of merged floors, as
+      read from the database by the svg task: half of the rooms identified,
+      the others unidentified.
+      """
+      data        = self.floor().to_serializable()
+      rooms       = data["rooms"]
+      identified  = rooms[0::2]
+
+      return {
+         "f_id"               : data["f_id"],
+         "rooms"              : {
+            "R{:03d}".format(i): {
+               "polygon"   : room["polygon"],
+               "room_name" : "Aula {}".format(i),
+               "cat_id"    : "AUL03"
+            }
+            for i, room in enumerate(identified)
+         },
+         "unidentified_rooms" : rooms[1::2],
+         "walls"              : data["walls"],
+         "windows"            : data["windows"]
+      }
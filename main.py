@@ -3,6 +3,7 @@ from tasks          import CSVTask, DXFTask, SVGTask, LookupTableTask
 from persistence    import MongoDBPersistenceManager
 from utils.logger   import Logger
 from model.odm      import ODMModel
+from model          import DataVersion
 import time
 
 class Main():
@@ -10,8 +11,17 @@ class Main():
    Main class, is the entry point of the application.
    """
 
-   def __init__(self):
+   def __init__(self, jobs = 1, use_cache = True):
+      """
+      Arguments:
+      - jobs: number of worker processes to be used by the commands supporting
+      parallel processing (dxf, svg);
+      - use_cache: if False, dxf files are parsed even if already cached, and
+      all svg maps are drawn again.
+      """
       self._config      = ConfigManager("config/general.json")
+      self._jobs        = jobs
+      self._use_cache   = use_cache
 
    def run_command(self, command, files):
       """
@@ -47,13 +57,17 @@ class Main():
       Returns: None
 
       Instantiates a MongoDBPersistenceManager and a DXFTask to process the dxf
-      files whit the apposite procedure.
+      files whit the apposite procedure, reading them with the requested number
+      of worker processes.
       """
       persistence       = MongoDBPersistenceManager(self._config)
       ODMModel.set_pm( persistence )
 
-      task              = DXFTask(self._config)
-      task.perform_updates_on_files(files)
+      task              = DXFTask(self._config, use_cache = self._use_cache)
+      task.perform_updates_on_files(files, jobs = self._jobs)
+
+      # Invalidates the responses cached by the API
+      DataVersion.bump()
 
       self.run_lookup()
 
@@ -75,6 +89,9 @@ class Main():
       task              = CSVTask(self._config)
       task.perform_updates_on_files(files)
 
+      # Invalidates the responses cached by the API
+      DataVersion.bump()
+
       self.run_lookup()
 
    def run_svg(self, b_ids):
@@ -94,8 +111,8 @@ class Main():
       persistence       = MongoDBPersistenceManager(self._config)
       ODMModel.set_pm( persistence )
 
-      task              = SVGTask(self._config)
-      task.perform_svg_update(b_ids)
+      task              = SVGTask(self._config, force = not self._use_cache)
+      task.perform_svg_update(b_ids, jobs = self._jobs)
 
    def run_lookup(self, files=None):
       """
@@ -121,6 +138,12 @@ if __name__ == '__main__':
    parser.add_argument('files', metavar='file', type=str, nargs='*',
                       help='I file su cui lavorare, a seconda del comando scelto.')
 
+   parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1,
+                      help='Numero di processi da usare per leggere i file dxf e disegnare le mappe svg.')
+
+   parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                      help='Rilegge i file dxf ignorando la cache delle entita\' estratte, e ridisegna tutte le mappe svg.')
+
    args = parser.parse_args()
 
    # Development mode
@@ -141,5 +164,5 @@ if __name__ == '__main__':
          print("There is no cow level.")
       exit()
 
-   program = Main()
+   program = Main(jobs = max(1, args.jobs), use_cache = args.use_cache)
    program.run_command(args.command, args.files)
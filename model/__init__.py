@@ -1,14 +1,21 @@
 from .room              import Room
+from .floor_spatial_index import FloorSpatialIndex
+from .line_merger       import LineMerger
 from .floor             import Floor
 from .building          import Building
 from .room_category     import RoomCategory
 from .building_view     import BuildingView
+from .room_view         import RoomView
 from .available_service import AvailableService
+from .floor_geometry    import FloorGeometry
+from .data_version      import DataVersion
 
 def update_building_view(building):
    bv = BuildingView.create_from_building(building)
    bv.save()
+   RoomView.update_building_rooms(bv)
 
 Building.listen("after_save", update_building_view)
 
 Building.listen("after_remove_deleted_buildings", BuildingView.remove_deleted_buildings)
+Building.listen("after_remove_deleted_buildings", RoomView.remove_deleted_buildings)
@@ -74,21 +74,22 @@ class Building(ODMModel):
       update action of buildings on the supplied namespace
 
       Returns a tuple (n, buildings), where n is the amount of records
-      affected, and buildings is a list of the buildings that have been
-      changed. The buildings list reflect the state of those buildings
-      BEFORE the update action.
+      affected, and buildings is a list of dictionaries containing only the
+      _id of the buildings that have been changed.
       """
       query       = {
          namespace : {"$exists": True},
          namespace + ".updated_at" : { "$lt" : batch_date }
       }
-      buildings   = list(Building.where(query))
+      buildings   = list(Building.where(query, [ "_id" ], raw = True))
       action      = {
          "$unset" : {namespace : ""},
          "$set"   : {"deleted_" + namespace : batch_date}
       }
       options  = {"multi" : True}
       result   = klass._pm.update("building", query, action, options)
+
+      klass.evict(b["_id"] for b in buildings)
       return (result["n"], buildings)
 
    @classmethod
@@ -102,9 +103,8 @@ class Building(ODMModel):
       all it's sources.
 
       Returns a tuple (n, buildings), where n is the amount of records
-      affected, and buildings is a list of the buildings that have been
-      changed. The buildings list reflect the state of those buildings
-      BEFORE the update action.
+      affected, and buildings is a list of dictionaries containing only the
+      _id of the buildings that have been removed.
       """
       query    = {
          "$or" : [
@@ -118,9 +118,11 @@ class Building(ODMModel):
             }
          ]
       }
-      buildings   = list(Building.where(query))
+      buildings   = list(Building.where(query, [ "_id" ], raw = True))
       options     = {"multi" : True}
       result      = klass._pm.remove("building", query, options)
+
+      klass.evict(b["_id"] for b in buildings)
       return (result["n"], buildings)
 
    @classmethod
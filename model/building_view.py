@@ -21,6 +21,12 @@ class BuildingView(ODMModel):
          for f in building.get_path("merged.floors", [])
       ]
 
+      # building level union of the floor services, used by the api to
+      # filter buildings without loading their floors
+      bv_attrs["available_services"] = sorted({
+         s for f in bv_attrs["floors"] for s in f["available_services"]
+      })
+
       return BuildingView(bv_attrs)
 
    @classmethod
@@ -63,6 +69,7 @@ class BuildingView(ODMModel):
       }
 
       klass._pm.remove(BuildingView.collection_name(), query, options)
+      BuildingView.evict()
 
    @classmethod
    def _prepare_rooms_dict(klass, floor):
@@ -82,4 +89,23 @@ class BuildingView(ODMModel):
 
    @classmethod
    def setup_collection(klass):
-      klass.get_collection().create_index([("coordinates", pymongo.GEOSPHERE)])
+      collection = klass.get_collection()
+      collection.create_index([("coordinates", pymongo.GEOSPHERE)])
+      collection.create_index("available_services")
+      collection.create_index("floors.available_services")
+
+      # Views saved before the building level available_services existed
+      collection.update_many(
+            { "available_services" : { "$exists" : False } },
+            [{
+               "$set" : {
+                  "available_services" : {
+                     "$reduce" : {
+                        "input"        : { "$ifNull" : [ "$floors.available_services", [] ] },
+                        "initialValue" : [],
+                        "in"           : { "$setUnion" : [ "$$value", "$$this" ] }
+                     }
+                  }
+               }
+            }]
+         )
@@ -0,0 +1,26 @@
+from .odm      import ODMModel
+from datetime  import datetime
+
+class DataVersion(ODMModel):
+   """
+   A version stamp of the data served by the API, bumped by the tasks updating
+   it (csv and dxf imports), so that the API knows when its cached responses
+   are stale.
+   """
+
+   stamp_id = "api"
+
+   @classmethod
+   def current(klass):
+      """Returns the current version, an integer (0 if never bumped)"""
+      doc = ODMModel._pm.find_one(klass.collection_name(), { "_id" : klass.stamp_id }, [ "version" ])
+      return doc and doc.get("version", 0) or 0
+
+   @classmethod
+   def bump(klass):
+      """Increments the current version"""
+      klass.get_collection().update_one(
+            { "_id" : klass.stamp_id },
+            { "$inc" : { "version" : 1 }, "$set" : { "updated_at" : datetime.now() } },
+            upsert = True
+         )
@@ -5,6 +5,8 @@ class Anchorable():
    absolutization of the element, i.e.: converting its elements to absolutize
    coordinates"""
 
+   __slots__ = ()
+
    def absolutize(self):
      """Trasform the current element in an absolute coordinates element
 
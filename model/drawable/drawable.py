@@ -16,6 +16,8 @@ class Drawable():
    the translation will happen automatically by calling translate on each
    point object."""
 
+   __slots__ = ()
+
    def __init__(self):
       self._calculate_bounding_box()
 
@@ -2,6 +2,10 @@ from math import sin, cos, radians, sqrt
 from sys import float_info
 
 class Point():
+   # Floors are made of hundreds of thousands of points: slots avoid a
+   # per-instance __dict__
+   __slots__   = ("x", "y")
+
    _precision  = 4
    _epsilon    = 0.001
 
@@ -1,24 +1,56 @@
 from utils.myitertools  import circular_pairwise
-from itertools          import chain, product
-from . import Point, Drawable, Anchorable, Segment
+from itertools          import chain
+from math               import radians, sin, cos, sqrt
+from .                  import Point, Drawable, Anchorable, Segment
+from .polygon_points    import PolygonPoints, prepare_coords
+import numpy as np
 
 class Polygon(Drawable, Anchorable):
+   """
+   A polygon, defined by an anchor point and a list of points relative to it.
+
+   Points are stored as an (N, 2) float64 array (the coords attribute), and
+   transformations are applied to the whole array at once. The points
+   attribute exposes the same coordinates as a list of Point-like objects.
+   """
 
    def __init__(self):
       self.bounding_box = ()
       self.center_point = None
+      self.coords       = np.empty((0, 2))
+
+   @property
+   def coords(self):
+      return self._coords
+
+   @coords.setter
+   def coords(self, coords):
+      self._coords   = coords
+      self._points   = None
+
+   @property
+   def points(self):
+      if self._points is None:
+         self._points = PolygonPoints(self)
+
+      return self._points
+
+   @points.setter
+   def points(self, points):
+      self.coords = prepare_coords(points)
 
    def from_absolute_coordinates(points):
       """Factory method, creates a polygon based on absolute coordinates
       (list of tuples)"""
 
+      coords = np.array([ (p[0], p[1]) for p in points ], dtype=float)
+
       # Calculate anchor point.
-      min_x = min(points, key=lambda s: s[0])
-      min_y = min(points, key=lambda s: s[1])
+      min_x, min_y = coords.min(axis=0).tolist()
 
       return Polygon.from_relative_coordinates(
-               (min_x[0], min_y[1]),
-               [ (x-min_x[0], y-min_y[1]) for (x, y) in points ]
+               (min_x, min_y),
+               coords - (min_x, min_y)
             )
 
    def from_relative_coordinates(anchor_point, points):
@@ -28,7 +60,7 @@ class Polygon(Drawable, Anchorable):
 
       p              = Polygon()
       p.anchor_point = Point(anchor_point)
-      p.points       = Polygon._prepare_points(points)
+      p.points       = points
       p._calculate_bounding_box()
       return p
 
@@ -37,10 +69,10 @@ class Polygon(Drawable, Anchorable):
       True if the polygon is closed, i.e. first and last points are close enough,
       which is determined by the tollerance parameter.
       """
-      first = self.points[0]
-      last  = self.points[-1]
+      first_x, first_y  = self.coords[0]
+      last_x, last_y    = self.coords[-1]
 
-      return first.distance_to(last) < tollerance
+      return bool(np.hypot(first_x - last_x, first_y - last_y) < tollerance)
 
    def ensure_is_closed(self, tollerance = 0.5):
       """
@@ -50,8 +82,8 @@ class Polygon(Drawable, Anchorable):
       if self.is_closed():
          return self
 
-      if len(self.points) > 2:
-         self.points.append(self.points[0].clone())
+      if len(self.coords) > 2:
+         self.coords = np.vstack((self.coords, self.coords[:1]))
          self._calculate_bounding_box()
 
       return self
@@ -62,24 +94,39 @@ class Polygon(Drawable, Anchorable):
       distance smaller than tollerance into a single point.
       If the original polygon is closed, the final one is also granted to be.
 
+      Every point not yet removed removes the points following it (circularly)
+      as long as they are closer than tollerance to it. Only the points whose
+      successor is close enough need to be visited, hence the whole procedure
+      is linear in the number of points.
+
       Returns self
       """
-      to_remove   = set()
       was_closed  = self.is_closed()
+      n           = len(self.coords)
+      xs          = self.coords[:, 0].tolist()
+      ys          = self.coords[:, 1].tolist()
+
+      following   = np.roll(self.coords, -1, axis=0) - self.coords
+      candidates  = np.flatnonzero(np.hypot(following[:, 0], following[:, 1]) < tollerance)
+      removed     = np.zeros(n, dtype=bool)
 
-      points = list(enumerate(self.points))
-      for i, p in points:
-         if i in to_remove:
+      for i in candidates.tolist():
+         if removed[i]:
             continue
 
-         for i2, p2 in chain(points[i+1:], points[0:i]):
-            if p.distance_to(p2) < tollerance:
-               to_remove.add(i2)
-            else:
+         j = (i + 1) % n
+         while j != i:
+            dx = xs[j] - xs[i]
+            dy = ys[j] - ys[i]
+
+            if sqrt(dx * dx + dy * dy) >= tollerance:
                break
 
-      if to_remove:
-         self.points = [ p for i, p in points if i not in to_remove ]
+            removed[j] = True
+            j = (j + 1) % n
+
+      if removed.any():
+         self.coords = self.coords[~removed]
 
          if was_closed:
             self.ensure_is_closed(tollerance)
@@ -88,28 +135,74 @@ class Polygon(Drawable, Anchorable):
 
       return self
 
-   def is_self_crossing(self):
-      """
-      Returns True if this polygon crosses itself
+   def is_self_crossing(self, tollerance = 2):
       """
-      segments = self.as_segment_list()
+      Returns a tuple (point, s1, s2) if this polygon crosses itself, where
+      point is the intersection of the segments s1 and s2, False otherwise.
 
-      for s1, s2 in product(segments, segments):
-         if s1.links_with(s2, tollerance=2):
-            continue
+      Segments whose endpoints are closer than tollerance (i.e. that link
+      together, see Segment.links_with) are not considered crossing.
 
-         p = s1.intersect_with(s2)
-         if p is not False and p is not True:
-            return (p, s1, s2)
+      Uses a sort and sweep strategy: segments are sorted by their minimum x
+      and every segment is only compared with the following ones that overlap
+      its bounding box. The exact intersection test is performed only for
+      those candidates, and the search stops at the first crossing found.
+      """
+      start = self.coords
+      end   = np.roll(self.coords, -1, axis=0)
+
+      # A small margin, so that rounding of intersection points never
+      # discards a candidate pair
+      margin      = 0.001
+      min_x       = np.minimum(start[:, 0], end[:, 0])
+      max_x       = np.maximum(start[:, 0], end[:, 0])
+      min_y       = np.minimum(start[:, 1], end[:, 1])
+      max_y       = np.maximum(start[:, 1], end[:, 1])
+
+      order       = np.argsort(min_x, kind="mergesort")
+      sorted_x    = min_x[order]
+
+      for k, i in enumerate(order.tolist()):
+         stop     = np.searchsorted(sorted_x, max_x[i] + margin, side="right")
+         others   = order[k + 1:stop]
+
+         others   = others[
+               (min_y[others] <= max_y[i] + margin) &
+               (max_y[others] >= min_y[i] - margin)
+            ]
+
+         others   = others[
+               ~Polygon._links_with(start[i], end[i], start[others], end[others], tollerance)
+            ]
+
+         for j in sorted(others.tolist()):
+            a, b  = min(i, j), max(i, j)
+            s1    = Segment.from_tuples(start[a].tolist(), end[a].tolist())
+            s2    = Segment.from_tuples(start[b].tolist(), end[b].tolist())
+
+            p = s1.intersect_with(s2)
+            if p is not False and p is not True:
+               return (p, s1, s2)
 
       return False
 
-   def as_segment_list(self):
-      return [ Segment(a.clone(), b.clone()) for a, b in circular_pairwise(self.points) ]
+   @staticmethod
+   def _links_with(start, end, other_starts, other_ends, tollerance):
+      """
+      Vectorized version of Segment.links_with, comparing the segment
+      start-end with arrays of segments.
+      """
+      def close(a, b):
+         return np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1]) < tollerance
+
+      return (
+         close(other_starts, start) | close(other_ends, start) |
+         close(other_ends, end)     | close(other_starts, end)
+      )
 
-   def _prepare_points(polypoints):
-      """From a list of tuples, create a list of Point"""
-      return [Point(p[0], p[1]) for p in polypoints]
+   def as_segment_list(self):
+      coords = self.coords.tolist()
+      return [ Segment(Point(a), Point(b)) for a, b in circular_pairwise(coords) ]
 
    def __str__(self):
       return (
@@ -131,7 +224,7 @@ class Polygon(Drawable, Anchorable):
 
    def clone(self):
       p              = Polygon()
-      p.points       = [p.clone() for p in self.points]
+      p.coords       = self.coords.copy()
       p.anchor_point = self.anchor_point.clone()
       p._calculate_bounding_box()
       return p
@@ -146,7 +239,7 @@ class Polygon(Drawable, Anchorable):
    def from_serializable(json_obj):
       p = Polygon()
       p.anchor_point = Point.from_serializable( json_obj["anchor_point"] )
-      p.points = [ Point.from_serializable(el) for el in json_obj["points"] ]
+      p.points = [ (el["x"], el["y"]) for el in json_obj["points"] ]
       p._calculate_bounding_box()
       return p
 
@@ -154,6 +247,79 @@ class Polygon(Drawable, Anchorable):
       """Hook method for Anchorable"""
       return chain(self.points, self.bounding_box, [self.center_point])
 
+   def _box_entities(self):
+      """The bounding box and center points, which are transformed together
+      with the polygon coordinates"""
+      return [ p for p in chain(self.bounding_box, [self.center_point]) if p is not None ]
+
+   ##########################
+   # TRANSFORMATION METHODS #
+   ##########################
+
+   # The following methods replace the per-entity implementation supplied by
+   # Drawable and Anchorable, by operating on the whole coordinates array.
+
+   def traslate(self, amount_x, amount_y):
+      """Traslates the polygon points"""
+      self.coords += (amount_x, amount_y)
+
+      for p in self._box_entities():
+         p.traslate(amount_x, amount_y)
+
+      return self
+
+   def scale(self, amount_x, amount_y = None):
+      amount_y = amount_y or amount_x
+      self.coords *= (amount_x, amount_y)
+
+      for p in self._box_entities():
+         p.scale(amount_x, amount_y)
+
+      return self
+
+   def reflect_y(self):
+      np.negative(self.coords[:, 1], out=self.coords[:, 1])
+
+      for p in self._box_entities():
+         p.reflect_y()
+
+      self._calculate_bounding_box()
+      return self
+
+   def rotate(self, grades):
+      theta = radians(grades)
+      x     = self.coords[:, 0].copy()
+      y     = self.coords[:, 1].copy()
+
+      self.coords[:, 0] = np.round(x * cos(theta) - y * sin(theta), Point._precision)
+      self.coords[:, 1] = np.round(x * sin(theta) + y * cos(theta), Point._precision)
+
+      for p in self._box_entities():
+         p.rotate(grades, 0, 0)
+
+      self._calculate_bounding_box()
+      return self
+
+   def absolutize(self):
+      """Trasform the current polygon in an absolute coordinates polygon"""
+      self.traslate(self.anchor_point.x, self.anchor_point.y)
+      self.anchor_point.x = 0
+      self.anchor_point.y = 0
+      return self
+
+   def _calculate_bounding_box(self):
+      if len(self.coords):
+         min_x, min_y = self.coords.min(axis=0).tolist()
+         max_x, max_y = self.coords.max(axis=0).tolist()
+      else:
+         min_x = min_y = float("+inf")
+         max_x = max_y = float("-inf")
+
+      self.bounding_box = (Point(min_x, min_y), Point(max_x, max_y))
+      center_x = (min_x - max_x) / 2
+      center_y = (min_y - max_y) / 2
+      self.center_point = Point(abs(center_x), abs(center_y))
+
    #############################
    # TESTS FOR POINT INCLUSION #
    #############################
@@ -184,65 +350,103 @@ class Polygon(Drawable, Anchorable):
    def _contains_point(self, point):
       """Tests whether or not the current room cointains a specific point
 
-      Return true if this room object contains the supplied object
+      Return true if this room object contains the supplied object.
+      See contains_points for the details of the algorithm.
+      """
+      return bool(self.contains_points([ (point.x, point.y) ])[0])
+
+   def contains_points(self, points):
+      """Tests a batch of points for inclusion in the current polygon
+
+      Arguments:
+      - points: an (M, 2) array (or a list of tuples) of coordinates, relative
+      to the polygon anchor point.
+
+      Returns: a boolean array of length M.
+
       Uses the ray casting algorithm:
       http://en.wikipedia.org/wiki/Point_in_polygon#Ray_casting_algorithm
-      For simplicity we assume the ray is casted horizontally to the left
-   """
+      For simplicity we assume the ray is casted horizontally to the left.
+      Every point is tested against every edge at once, with the same rules of
+      Polygon._compare_line_and_point: points over a border are contained, and
+      a ray passing precisely over a vertex counts that vertex only once.
+      """
+      points   = np.asarray(points, dtype=float).reshape(-1, 2)
+      result   = np.zeros(len(points), dtype=bool)
+
+      if not len(self.coords):
+         return result
 
       # We first compare against the bounding box. For most points this will be
       # enough
       min_point, max_point = self.bounding_box
-
-      if (
-            (point.x > max_point.x) or
-            (point.x < min_point.x) or
-            (point.y > max_point.y) or
-            (point.y < min_point.y)
-         ):
-         return False
-
-      # Amount of intersections counted
-      match_count = 0
-
-      # Handle some special cases
-      counted_vertices = []
-      for (a, b) in circular_pairwise(self.points):
-
-         # Is the y coordinate of the point valid? I.e.: is it between
-         # the y coordinates of a and b?
-         if( a.y <= point.y <= b.y or a.y >= point.y >= b.y ):
-
-            # The following function returns -1 if the point is to the left
-            # of the segment, 0 if it is on the same line as the segment,
-            # +1 if it is to the right
-            comparison = Polygon._compare_line_and_point(a, b, point)
-
-            # If the point is on the same line, we can conclude it belongs
-            # to the shape if its x coordinates are between a's and b's
-            if(comparison == 0 and
-                  max(a.x, b.x) >= point.x >= min(a.x, b.x) and
-                  max(a.y, b.y) >= point.y >= min(a.y, b.y)):
-               return True # the point is over a border
-
-            # If the point is not over the line, is it to the right?
-            # Being to the right means that the ray being cast to the left
-            # might actually intersect the segment.
-            elif(comparison > 0):
-
-               # Simple case, the ray does not match any vertice, so it
-               # intersects inside the segment.
-               if ((point.y != a.y) and (point.y != b.y)):
-                  match_count = match_count + 1
-               else:
-                  # Special cases, the ray intersects precisely one of the vertices
-                  if a.y == point.y and a.x <= point.x and a not in counted_vertices:
-                     counted_vertices.append(a)
-                     match_count = match_count + 1
-                  if b.y == point.y and b.x <= point.x and (b not in counted_vertices):
-                     counted_vertices.append(b)
-                     match_count = match_count + 1
+      in_box = np.flatnonzero(
+            (points[:, 0] <= max_point.x) & (points[:, 0] >= min_point.x) &
+            (points[:, 1] <= max_point.y) & (points[:, 1] >= min_point.y)
+         )
+
+      if not len(in_box):
+         return result
+
+      # Points as columns, edges (a, b) as rows: every comparison below is an
+      # (M, N) matrix of points x edges
+      px = points[in_box, 0][:, None]
+      py = points[in_box, 1][:, None]
+      ax, ay = self.coords[:, 0], self.coords[:, 1]
+      bx, by = np.roll(ax, -1), np.roll(ay, -1)
+
+      # Is the y coordinate of the point between the y coordinates of a and b?
+      valid_y = ((ay <= py) & (py <= by)) | ((ay >= py) & (py >= by))
+
+      # Same result of _compare_line_and_point: -1 if the point is to the left
+      # of the segment, 0 if it is on the same line, +1 if it is to the right.
+      # The cross product is rounded with the Point precision, so that points
+      # over a border are not missed because of floating point errors
+      cross       = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+      cross       = np.round(cross, Point._precision)
+      comparison  = np.where(by - ay < 0, cross, -cross)
+
+      # Points over the same line, between a and b, are over a border
+      on_border   = valid_y & (comparison == 0) & (
+            (np.minimum(ax, bx) <= px) & (px <= np.maximum(ax, bx)) &
+            (np.minimum(ay, by) <= py) & (py <= np.maximum(ay, by))
+         )
+
+      # Being to the right means that the ray being cast to the left
+      # might actually intersect the segment.
+      to_right    = valid_y & (comparison > 0)
+
+      # Simple case, the ray does not match any vertice
+      crossings   = to_right & (py != ay) & (py != by)
+
+      # Special cases, the ray intersects precisely one of the vertices. Vertex
+      # i is the start of edge i and the end of edge i - 1.
+      vertex_hits = (
+            (to_right & (py == ay) & (ax <= px)) |
+            np.roll(to_right & (py == by) & (bx <= px), 1, axis=1)
+         )
+
+      # Vertices sharing the same coordinates are counted only once
+      for duplicate, first in self._duplicate_vertices():
+         vertex_hits[:, first]     |= vertex_hits[:, duplicate]
+         vertex_hits[:, duplicate]  = False
 
       # After analyzing all segments, if we found an even amount of intersections
       # it means the point is outside of the polygon
-      return match_count % 2 != 0
+      match_count    = crossings.sum(axis=1) + vertex_hits.sum(axis=1)
+      result[in_box] = on_border.any(axis=1) | (match_count % 2 != 0)
+
+      return result
+
+   def _duplicate_vertices(self):
+      """Returns a list of (duplicate, first) index pairs, where duplicate
+      is the index of a vertex having the same coordinates as the vertex
+      with index first, and first < duplicate"""
+      _, first_index, inverse = np.unique(
+            self.coords, axis=0, return_index=True, return_inverse=True
+         )
+      first = first_index[inverse.reshape(-1)]
+
+      return [
+         (i, f) for i, f in enumerate(first.tolist()) if i != f
+      ]
@@ -0,0 +1,113 @@
+from . import Point
+import numpy as np
+
+class PointView(Point):
+   """
+   A Point whose coordinates are stored in a row of an (N, 2) coordinates
+   array. Reading or transforming a PointView reads or writes that row, so
+   the usual Point api keeps working over the array storage of a Polygon.
+   """
+
+   __slots__ = ("_coords", "_index")
+
+   def __init__(self, coords, index):
+      self._coords   = coords
+      self._index    = index
+
+   @property
+   def x(self):
+      return float(self._coords[self._index, 0])
+
+   @x.setter
+   def x(self, value):
+      self._coords[self._index, 0] = value
+
+   @property
+   def y(self):
+      return float(self._coords[self._index, 1])
+
+   @y.setter
+   def y(self, value):
+      self._coords[self._index, 1] = value
+
+class PolygonPoints():
+   """
+   List-like view over the coordinates array of a Polygon. Items are
+   PointView objects, created lazily and kept for the lifetime of the array,
+   so that the same object is returned on repeated accesses.
+   """
+
+   def __init__(self, polygon):
+      self._polygon  = polygon
+      self._coords   = polygon.coords
+      self._views    = [ None ] * len(self._coords)
+
+   def __len__(self):
+      return len(self._coords)
+
+   def __getitem__(self, index):
+      if type(index) is slice:
+         return [ self[i] for i in range(*index.indices(len(self))) ]
+
+      if index < 0:
+         index += len(self)
+
+      if not 0 <= index < len(self):
+         raise IndexError("PolygonPoints index {} out of range".format(index))
+
+      if self._views[index] is None:
+         self._views[index] = PointView(self._coords, index)
+
+      return self._views[index]
+
+   def __setitem__(self, index, point):
+      self._coords[index] = (point[0], point[1])
+
+   def __iter__(self):
+      return ( self[i] for i in range(len(self)) )
+
+   def __contains__(self, point):
+      try:
+         other = np.array((point[0], point[1]), dtype=float)
+      except Exception:
+         return False
+
+      close = np.abs(self._coords - other) <= Point._epsilon
+      return bool(np.any(close.all(axis=1)))
+
+   def __eq__(self, other):
+      if isinstance(other, PolygonPoints):
+         return (
+            self._coords.shape == other._coords.shape and
+            bool(np.all(np.abs(self._coords - other._coords) <= Point._epsilon))
+            )
+
+      try:
+         if len(self) != len(other):
+            return False
+      except TypeError:
+         return False
+
+      return all(a == b for a, b in zip(self, other))
+
+   def __str__(self):
+      return "[" + ", ".join(str(p) for p in self) + "]"
+
+   def __repr__(self):
+      return str(self)
+
+   def append(self, point):
+      """Appends a point to the polygon, by growing its coordinates array"""
+      self._polygon.coords = np.vstack((self._coords, prepare_coords([point])))
+
+def prepare_coords(points):
+   """
+   From a list of tuples or Point objects (or an array), creates an (N, 2)
+   float64 array of coordinates, rounded with the same precision as Point.
+   """
+   if isinstance(points, np.ndarray):
+      coords = points.astype(float)
+   else:
+      coords = np.array([ (p[0], p[1]) for p in points ], dtype=float)
+
+   return np.round(coords.reshape(-1, 2), Point._precision)
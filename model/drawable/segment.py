@@ -1,6 +1,7 @@
 from . import Drawable, Point
 
 class Segment(Drawable):
+   __slots__ = ("start", "end", "slope", "y_intercept", "x_value", "bounding_box", "center_point")
 
    def __init__(self, start, end):
       self.start        = start
@@ -1,6 +1,8 @@
 from . import Point, Anchorable
 
 class Text(Anchorable):
+   __slots__ = ("text", "anchor_point")
+
    def __init__(self, txt, anchor_point):
       self.text         = txt
       self.anchor_point = anchor_point
@@ -1,6 +1,8 @@
-from .            import Room
-from .drawable    import Segment
-from itertools    import chain
+from .                      import Room
+from .floor_spatial_index  import FloorSpatialIndex
+from .line_merger          import LineMerger
+from .drawable             import Segment
+from itertools             import chain
 import time
 
 class Floor:
@@ -17,6 +19,7 @@ class Floor:
       self.n_rooms         = 0
       self.walls           = []
       self.windows         = []
+      self._spatial_index  = None
 
       if rooms:
          for r in rooms:
@@ -52,6 +55,7 @@ class Floor:
 
       self.rooms.append(room)
       self.n_rooms = self.n_rooms + 1
+      self._spatial_index = None
 
    def control_line(self, line):
       self.min_x  = min(self.min_x, line[0].x)
@@ -65,15 +69,35 @@ class Floor:
       self.max_y  = max(self.max_y, line[1].y)
       return line
 
+   def spatial_index(self):
+      """Returns a FloorSpatialIndex over the current rooms, building it the
+      first time it is needed. The index is discarded whenever rooms are added
+      or transformed."""
+      if self._spatial_index is None:
+         self._spatial_index = FloorSpatialIndex(self.rooms)
+
+      return self._spatial_index
+
+   def room_at(self, x, y):
+      """Returns the room containing the point (x, y), or None"""
+      return self.spatial_index().room_at(x, y)
+
    def associate_room_texts(self, texts):
-      """Given a list of texts, associates each one with a room belonging to the current floor"""
-      for t in texts:
-         for r in self.rooms:
-            if r.contains_text( t ):
-               r.add_text(t)
-               break
+      """Given a list of texts, associates each one with a room belonging to the current floor
+
+      Each text is associated to the first room containing it. Candidate rooms
+      are found through the floor spatial index."""
+      texts    = list(texts)
+      coords   = [ (t.anchor_point.x, t.anchor_point.y) for t in texts ]
+      owners   = self.spatial_index().locate(coords)
+
+      for t, room_index in zip(texts, owners.tolist()):
+         if room_index >= 0:
+            self.rooms[room_index].add_text(t)
 
    def transform(self, scale_amount=1, traslate_x=0, traslate_y=0):
+      self._spatial_index = None
+
       for r in self.rooms:
          # L'ordine di queste operazioni di transformazione
          # e' rilevante.
@@ -93,6 +117,22 @@ class Floor:
       scale_amount = self.calculate_scale_amount()
       self.transform(scale_amount=scale_amount, traslate_x = -self.min_x, traslate_y = -self.min_y)
 
+   def consolidate_lines(self, merger = None):
+      """
+      Replaces the wall and window lines with the result of merging their
+      duplicate, overlapping and split collinear segments (see LineMerger).
+
+      Returns a tuple (number of lines before, number of lines after).
+      """
+      merger         = merger or LineMerger()
+      walls, windows = list(self.walls), list(self.windows)
+      before         = len(walls) + len(windows)
+
+      self.walls     = merger.merge(walls)
+      self.windows   = merger.merge(windows)
+
+      return before, len(self.walls) + len(self.windows)
+
    def discard_tiny_lines(self):
       self.walls = ( l for l in self.walls if l.length() >= 4 )
       self.windows = ( l for l in self.windows if l.length() >= 4 )
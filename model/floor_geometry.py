@@ -0,0 +1,79 @@
+from .odm   import ODMModel
+import hashlib, json
+
+class FloorGeometry(ODMModel):
+   """
+   The FloorGeometry class stores the heavy geometry of a dxf floor (wall and
+   window lines) outside of the Building document, which only keeps a
+   reference to it in the geometry_id key of the floor.
+
+   Documents are identified by building id, floor id and a hash of their
+   content, hence saving the same geometry twice is harmless. The geometry is
+   loaded only where needed (svg drawing, analysis) through with_geometry.
+   """
+
+   geometry_keys = [ "walls", "windows" ]
+
+   @classmethod
+   def content_hash(klass, geometry):
+      """Returns the SHA-1 hex digest of a geometry dictionary"""
+      text = json.dumps(geometry, sort_keys = True, separators = (",", ":"))
+      return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+   @classmethod
+   def extract_from(klass, b_id, floor):
+      """
+      Removes the geometry keys from a floor dictionary, storing them in a new
+      FloorGeometry object (not saved) referenced by the floor geometry_id.
+
+      Arguments:
+      - b_id: the id of the building of the floor;
+      - floor: a floor dictionary, as produced by Floor.to_serializable.
+
+      Returns the FloorGeometry object.
+      """
+      geometry = { k : floor.pop(k, []) for k in klass.geometry_keys }
+      c_hash   = klass.content_hash(geometry)
+
+      geometry.update({
+         "_id"          : "_".join([ b_id, floor["f_id"], c_hash ]),
+         "b_id"         : b_id,
+         "f_id"         : floor["f_id"],
+         "content_hash" : c_hash
+      })
+
+      floor["geometry_id"] = geometry["_id"]
+      return FloorGeometry(geometry)
+
+   @classmethod
+   def with_geometry(klass, floors):
+      """
+      Given a list of floor dictionaries, returns a list of copies of them
+      including their geometry, loaded with a single query. Floors without a
+      geometry_id (e.g. stored before geometries were split from buildings)
+      are returned unchanged.
+      """
+      ids         = [ f["geometry_id"] for f in floors if "geometry_id" in f ]
+      geometries  = klass.find_by_ids(ids)
+      result      = []
+
+      for floor in floors:
+         geometry = geometries.get(floor.get("geometry_id"))
+
+         if geometry is not None:
+            floor = dict(floor)
+            floor.update((k, geometry.get(k, [])) for k in klass.geometry_keys)
+
+         result.append(floor)
+
+      return result
+
+   @classmethod
+   def remove(klass, ids):
+      """Removes the geometries with the supplied ids"""
+      ids = list(ids)
+      if not ids:
+         return
+
+      klass._pm.delete_many(klass.collection_name(), { "_id" : { "$in" : ids } })
+      klass.evict(ids)
@@ -0,0 +1,123 @@
+from math      import ceil, floor, sqrt
+import numpy as np
+
+class FloorSpatialIndex:
+   """
+   Uniform grid over the bounding boxes of the rooms of a floor.
+
+   Each cell of the grid keeps the indices of the rooms whose bounding box
+   overlaps it, so that a point only needs to be tested against the one or two
+   rooms around it, instead of every room of the floor. Rooms are always
+   visited in the same order as the supplied list, and hence the first
+   containing room of a point is the same as with a linear search.
+
+   Usage:
+   index = FloorSpatialIndex(floor.rooms)
+   index.room_at(120, 340) # returns a Room or None
+   """
+
+   def __init__(self, rooms, cell_size = None):
+      """
+      Arguments:
+      - rooms: a list of Room objects.
+      - cell_size: side of the grid cells. By default the mean size of the
+      rooms bounding boxes is used.
+      """
+      self.rooms  = list(rooms)
+      self.cells  = {}
+
+      boxes       = [ self._absolute_box(r) for r in self.rooms ]
+      self.boxes  = np.array(boxes, dtype=float).reshape(-1, 4)
+
+      if not len(self.rooms):
+         self.origin    = (0, 0)
+         self.cell_size = cell_size or 1
+         return
+
+      self.origin    = tuple(self.boxes[:, 0:2].min(axis=0).tolist())
+      self.cell_size = cell_size or self._default_cell_size(self.boxes)
+
+      for i, (min_x, min_y, max_x, max_y) in enumerate(self.boxes.tolist()):
+         min_cx, min_cy = self._cell_of(min_x, min_y)
+         max_cx, max_cy = self._cell_of(max_x, max_y)
+
+         for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+               self.cells.setdefault((cx, cy), []).append(i)
+
+   def _absolute_box(self, room):
+      """Returns a (min_x, min_y, max_x, max_y) tuple for the room"""
+      min_point = room.min_absolute_point()
+      max_point = room.max_absolute_point()
+      return (min_point.x, min_point.y, max_point.x, max_point.y)
+
+   def _default_cell_size(self, boxes):
+      sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+      size  = float(sizes.mean())
+
+      if size > 0:
+         return size
+
+      # Degenerated rooms: fall back to a grid of about sqrt(n) x sqrt(n)
+      extent = float((boxes[:, 2:4].max(axis=0) - boxes[:, 0:2].min(axis=0)).max())
+      return extent / ceil(sqrt(len(boxes))) or 1
+
+   def _cell_of(self, x, y):
+      return (
+         floor((x - self.origin[0]) / self.cell_size),
+         floor((y - self.origin[1]) / self.cell_size)
+      )
+
+   def candidates(self, x, y):
+      """
+      Returns the indices of the rooms whose bounding box contains the point
+      (x, y), in the same order of the rooms list.
+      """
+      return [
+         i for i in self.cells.get(self._cell_of(x, y), [])
+         if self.boxes[i, 0] <= x <= self.boxes[i, 2] and
+            self.boxes[i, 1] <= y <= self.boxes[i, 3]
+      ]
+
+   def room_at(self, x, y):
+      """
+      Returns the first room containing the point (x, y), or None if no room
+      contains it.
+      """
+      index = self.locate([ (x, y) ])[0]
+      if index < 0:
+         return None
+
+      return self.rooms[index]
+
+   def locate(self, points):
+      """
+      Given an (M, 2) array (or list of tuples) of absolute coordinates,
+      returns an array with the index of the first room containing each point,
+      or -1 for points outside every room.
+      """
+      points   = np.asarray(points, dtype=float).reshape(-1, 2)
+      result   = np.full(len(points), -1, dtype=int)
+
+      if not len(points) or not self.cells:
+         return result
+
+      cells    = np.floor((points - self.origin) / self.cell_size).astype(int)
+
+      by_cell  = {}
+      for i, cell in enumerate(map(tuple, cells.tolist())):
+         if cell in self.cells:
+            by_cell.setdefault(cell, []).append(i)
+
+      for cell, indices in by_cell.items():
+         indices = np.array(indices)
+
+         for room_index in self.cells[cell]:
+            pending = indices[result[indices] < 0]
+            if not len(pending):
+               break
+
+            inside         = self.rooms[room_index].contains_points(points[pending])
+            result[pending[inside]] = room_index
+
+      return result
@@ -0,0 +1,143 @@
+from .drawable import Point, Segment
+from math      import atan2, cos, sin, pi
+
+class LineMerger:
+   """
+   Consolidates the wall and window lines of a floor, which the dxf files
+   describe with many duplicate, overlapping and split collinear segments.
+
+   Endpoints are first snapped to a grid of side snap. Segments are then
+   grouped by direction and by offset of their endpoints from a common line,
+   and the overlapping or touching segments of each group are replaced by a
+   single segment, from the first to the last of their endpoints along the
+   line. Every endpoint of a merged segment is within offset_tolerance of the
+   line of the result, so merging never moves a line by more than that.
+
+   Usage:
+   walls = LineMerger().merge(floor.walls)
+   """
+
+   def __init__(self, snap = 0.5, offset_tolerance = 0.5, angle_tolerance = 0.01):
+      """
+      Arguments:
+      - snap: side of the grid endpoints are snapped to, and maximum gap
+      between merged collinear segments;
+      - offset_tolerance: maximum distance of the endpoints of merged segments
+      from the line of the result;
+      - angle_tolerance: maximum difference, in radians, between the
+      directions of merged segments.
+      """
+      self.snap               = snap
+      self.offset_tolerance   = offset_tolerance
+      self.angle_tolerance    = angle_tolerance
+
+   def merge(self, segments):
+      """
+      Returns a list of consolidated Segment objects, given an iterable of
+      Segment objects. Segments of null length (after snapping) are dropped.
+      """
+      lines = []
+
+      for s in segments:
+         start, end = self._snapped(s.start), self._snapped(s.end)
+         if start == end:
+            continue
+
+         angle = atan2(end[1] - start[1], end[0] - start[0])
+
+         # Directions are compared modulo pi, in [-angle_tolerance, pi - angle_tolerance)
+         if angle < -self.angle_tolerance:
+            angle += pi
+         elif angle >= pi - self.angle_tolerance:
+            angle -= pi
+
+         lines.append((angle, start, end))
+
+      lines.sort(key = lambda l: l[0])
+      result = []
+
+      for group in self._split(lines, lambda l: l[0], self.angle_tolerance):
+         result.extend(self._merge_direction_group(group))
+
+      return result
+
+   def _snapped(self, point):
+      snap = self.snap
+      return (round(point.x / snap) * snap, round(point.y / snap) * snap)
+
+   @classmethod
+   def _split(klass, items, key, tolerance):
+      """
+      Splits a list of items, sorted by key, in groups whose keys differ from
+      the first one of the group by at most tolerance. Groups are bounded,
+      so that slowly changing keys (e.g. the directions of the segments of
+      a curved wall) are not chained in a single group.
+      """
+      group = []
+
+      for item in items:
+         if group and key(item) - key(group[0]) > tolerance:
+            yield group
+            group = []
+         group.append(item)
+
+      if group:
+         yield group
+
+   def _merge_direction_group(self, lines):
+      """Merges a group of lines with about the same direction"""
+      angle    = lines[0][0]
+      dx, dy   = cos(angle), sin(angle)
+
+      # Position of a point along the direction, and offset from it
+      along    = lambda p: p[0] * dx + p[1] * dy
+      offset   = lambda p: p[1] * dx - p[0] * dy
+
+      lines    = sorted(lines, key = lambda l: (offset(l[1]) + offset(l[2])) / 2)
+      result   = []
+      group    = []
+      base     = None
+
+      for line in lines:
+         offsets = (offset(line[1]), offset(line[2]))
+
+         if group and max(abs(o - base) for o in offsets) <= self.offset_tolerance:
+            group.append(line)
+            continue
+
+         result.extend(self._merge_collinear(group, along))
+         group = [ line ]
+         base  = sum(offsets) / 2
+
+      result.extend(self._merge_collinear(group, along))
+      return result
+
+   def _merge_collinear(self, lines, along):
+      """
+      Merges the overlapping or touching lines of a group of collinear lines.
+      """
+      intervals = []
+
+      for angle, start, end in lines:
+         if along(start) > along(end):
+            start, end = end, start
+         intervals.append((along(start), along(end), start, end))
+
+      intervals.sort(key = lambda i: i[0])
+      result   = []
+      current  = None
+
+      for interval in intervals:
+         if current and interval[0] <= current[1] + self.snap:
+            if interval[1] > current[1]:
+               current = (current[0], interval[1], current[2], interval[3])
+            continue
+
+         if current:
+            result.append(Segment(Point(current[2]), Point(current[3])))
+         current = interval
+
+      if current:
+         result.append(Segment(Point(current[2]), Point(current[3])))
+
+      return result
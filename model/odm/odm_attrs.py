@@ -1,3 +1,7 @@
+from bson.errors  import InvalidDocument
+from itertools    import chain
+import bson
+
 class ODMAttrs:
 
    def __init__(self, attrs = None, external_id = "_id"):
@@ -7,6 +11,7 @@ class ODMAttrs:
 
       self._attrs          = attrs or {}
       self._external_id    = external_id
+      self._snapshot       = None
 
       """Since __setitem__ is not called during ODMAttrs creation, we need
       to manually ensure id sanitization"""
@@ -48,6 +53,7 @@ class ODMAttrs:
       """
       old = self._attrs.get(key)
 
+      self._track(key)
       self._attrs[key] = value
       self._ensure_sanitize_id()
 
@@ -60,6 +66,7 @@ class ODMAttrs:
       Item getter.
       Just delegates attributes retrieval to native dictionary
       """
+      self._track(key)
       return self._attrs[key]
 
    @replace_external_key
@@ -68,7 +75,9 @@ class ODMAttrs:
       Item deleter.
       Just delegates attributes retrieval to native dictionary
       """
+      self._track(key)
       del self._attrs[key]
+      self._changed = True
 
    @replace_external_key
    def __contains__(self, key):
@@ -82,6 +91,7 @@ class ODMAttrs:
       """
       Optional get, delegates to native dict method
       """
+      self._track(key)
       return self._attrs.get(key, default)
 
    @replace_external_key
@@ -119,13 +129,16 @@ class ODMAttrs:
       else:
          keys = path # already a list of keys
 
+      self._track(keys[0] == self._external_id and "_id" or keys[0])
+
       path = [ (k, False) for k in keys[:-1] ]
       path.append( (keys[-1], True) )
 
       ns = self._attrs
       for key, last in path:
          if key not in ns and build is not False:
-            ns[key]  = {} if not last else default
+            ns[key]        = {} if not last else default
+            self._changed  = True
 
          if key in ns:
             ns       = ns[key]
@@ -192,6 +205,119 @@ class ODMAttrs:
       for k in new_attrs:
          self[k] = new_attrs[k]
 
+   def mark_as_persisted(self):
+      """
+      Records the current attributes as the ones stored on database, the
+      reference for changed_paths. Called after loading and saving.
+
+      The stored value of a top level key is only recorded (bson encoded) when
+      the key is first accessed, so that documents only read, or keys never
+      accessed, cost nothing. After a save the keys accessed so far are
+      recorded again, since references to their values may still be in use.
+      """
+      accessed       = self._snapshot or {}
+      self._snapshot = {}
+
+      for key in accessed:
+         self._track(key)
+
+      self._changed = False
+
+   def _track(self, key):
+      """Records the stored value of a top level key before its first access"""
+      if self._snapshot is not None and key not in self._snapshot:
+         self._snapshot[key] = self._encode(key)
+
+   def _encode(self, key):
+      """
+      Returns the bson encoding of the value of a top level key, None if the
+      key is missing, False if the value can not be encoded.
+      """
+      if key not in self._attrs:
+         return None
+
+      try:
+         return bson.encode({ "v" : self._attrs[key] })
+      except (InvalidDocument, TypeError, OverflowError):
+         return False
+
+   def changed_paths(self):
+      """
+      Compares the accessed attributes with the ones recorded by
+      mark_as_persisted, including changes made in place on nested
+      dictionaries. Values are compared as stored by mongo, so that, for
+      instance, a tuple equals the list it is stored as.
+
+      Returns a tuple of two dictionaries (to_set, to_unset), in the format
+      of the mongo $set and $unset operators, with dot-notation paths of the
+      changed and removed attributes. Returns None if the changes can only
+      be stored by replacing the whole document, i.e. the document has never
+      been persisted or its id changed.
+
+      Example:
+      >>> a = ODMAttrs({ "_id": "1", "dxf": { "floors": [], "updated_at": 1 }, "old": 1 })
+      >>> a.mark_as_persisted()
+      >>> a["dxf"]["updated_at"] = 2
+      >>> del a["old"]
+      >>> a.changed_paths()
+      ({'dxf.updated_at': 2}, {'old': ''})
+      """
+      if self._snapshot is None:
+         return None
+
+      to_set, to_unset = {}, {}
+
+      for key, old in self._snapshot.items():
+         new = self._encode(key)
+
+         if new == old:
+            continue
+
+         if key == "_id":
+            return None
+
+         if new is None:
+            to_unset[key] = ""
+         elif not old or not new:
+            to_set[key] = self._attrs[key]
+         else:
+            self._diff(
+                  { key : bson.decode(old)["v"] },
+                  { key : bson.decode(new)["v"] },
+                  "", to_set, to_unset
+               )
+
+      if "" in to_set:
+         return None
+
+      return (to_set, to_unset)
+
+   @classmethod
+   def _diff(klass, old, new, path, to_set, to_unset):
+      """
+      Adds to to_set and to_unset the paths, below path, on which the
+      dictionaries old and new differ. Keys that can not be part of a path
+      cause the whole dictionary to be set.
+      """
+      if any(type(k) is not str or "." in k or k.startswith("$") for k in chain(old, new)):
+         to_set[path] = new
+         return
+
+      prefix = path and path + "." or ""
+
+      for k in old:
+         if k not in new:
+            to_unset[prefix + k] = ""
+
+      for k, value in new.items():
+         if k not in old:
+            to_set[prefix + k] = value
+         elif type(value) is dict and type(old[k]) is dict:
+            if value != old[k]:
+               klass._diff(old[k], value, prefix + k, to_set, to_unset)
+         elif value != old[k]:
+            to_set[prefix + k] = value
+
    def set_changed(self, value=True):
       self._changed = value
 
@@ -212,6 +338,8 @@ class ODMAttrs:
       if(new_attrs):
          self._merge_new_attrs(new_attrs)
       else:
+         for key in self._attrs:
+            self._track(key)
          return self._attrs
 
    def attr(self, key, value = None):
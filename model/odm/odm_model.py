@@ -1,5 +1,6 @@
 import types
-from . import ODMAttrs
+from .            import ODMAttrs
+from contextlib   import contextmanager
 
 def around_callbacks(funz):
    """
@@ -60,6 +61,9 @@ class ODMModel(ODMAttrs):
    before_callbacks = {}
    after_callbacks  = {}
 
+   # Instances by (collection name, _id) while a session is open (see session)
+   _identity_map    = None
+
    """
 
       GENERAL CLASS METHODS
@@ -81,6 +85,88 @@ class ODMModel(ODMAttrs):
       """
       return ODMModel._pm.get_collection(klass_or_instance.collection_name())
 
+   @classmethod
+   def batch(klass, batch_size = None):
+      """
+      Returns a context manager in which the saves are queued by the
+      Persistence Manager and written in bulk, every batch_size documents and
+      at its end. Save callbacks still fire for every document, when save is
+      called.
+
+      Usage:
+      with Building.batch():
+         for b in buildings:
+            b.save()
+      """
+      return ODMModel._pm.batch(batch_size)
+
+   @classmethod
+   @contextmanager
+   def session(klass):
+      """
+      Context manager opening an identity map session: until its end, each
+      document is represented by a single instance, returned by every
+      following find, find_by_field and where, and find does not query the
+      database again for ids already retrieved (or known to be missing).
+
+      Documents modified on database bypassing the instances (e.g. through
+      the Persistence Manager update and remove) must be evicted from the
+      session, see evict. Nested sessions share the outermost one.
+
+      Usage:
+      with ODMModel.session():
+         Building.find("11010") is Building.find("11010") # True
+      """
+      outermost = ODMModel._identity_map is None
+
+      if outermost:
+         ODMModel._identity_map = {}
+
+      try:
+         yield
+      finally:
+         if outermost:
+            ODMModel._identity_map = None
+
+   @classmethod
+   def evict(klass, ids = None):
+      """
+      Removes from the current session, if any, the documents of this class
+      collection with the supplied ids, or all of them if ids is None.
+      """
+      identity_map = ODMModel._identity_map
+      if identity_map is None:
+         return
+
+      name = klass.collection_name()
+
+      if ids is None:
+         ids = [ id for (coll, id) in identity_map if coll == name ]
+
+      for id in ids:
+         identity_map.pop((name, id), None)
+
+   @classmethod
+   def _from_document(klass, document, partial = False):
+      """
+      Returns the instance representing a document read from database: the
+      one of the current session if any, otherwise a new one. Partial
+      documents (read with a projection) are never added to the session.
+      """
+      identity_map   = None if partial else ODMModel._identity_map
+      key            = (klass.collection_name(), document.get("_id"))
+
+      if identity_map is not None and identity_map.get(key) is not None:
+         return identity_map[key]
+
+      res = klass(document)
+      res.mark_as_persisted()
+
+      if identity_map is not None:
+         identity_map[key] = res
+
+      return res
+
    @classmethod # can actually be called on instances
    def collection_name(klass_or_instance):
       return klass_or_instance.__name__.lower()
@@ -107,54 +193,139 @@ class ODMModel(ODMAttrs):
       klass_name = self.__class__.__name__
 
       if self.is_changed :
-         self._pm.save(self.collection_name(), self.as_dict())
+         changes = self.changed_paths()
+
+         # Documents loaded from database only send their changed fields
+         if changes is None:
+            self._pm.save(self.collection_name(), self.as_dict())
+         else:
+            self._pm.update_fields(self.collection_name(), self.attr("_id"), *changes)
+
+         self.mark_as_persisted()
+
+      if self._identity_map is not None:
+         self._identity_map[(self.collection_name(), self.attr("_id"))] = self
 
    @classmethod
    def clean(self):
       self._pm.clean_collection(self.collection_name())
+      self.evict()
 
    @around_callbacks
    def destroy(self):
       self._pm.destroy_by_id(self.collection_name(), self.attr("_id"))
+      self._snapshot = None
+
+      if self._identity_map is not None:
+         self._identity_map[(self.collection_name(), self.attr("_id"))] = None
 
    @classmethod
-   def find(klass, id):
+   def find(klass, id, projection = None, raw = False):
       """
       Retrieves from database a document and returns an instance representing it.
 
+      Arguments:
+      - id: the id of the document;
+      - projection, raw: see where.
+
       Returns none if query returns no results
       """
-      return klass.find_by_field("_id", klass.sanitize_id(id))
+      id             = klass.sanitize_id(id)
+      identity_map   = ODMModel._identity_map
+      key            = (klass.collection_name(), id)
+
+      if projection is not None or raw:
+         return klass.find_by_field("_id", id, projection, raw)
+
+      if identity_map is not None and key in identity_map:
+         return identity_map[key]
+
+      res = klass.find_by_field("_id", id)
+
+      if identity_map is not None and res is None:
+         identity_map[key] = None
+
+      return res
 
    @classmethod
-   def find_by_field(klass, field_name, value):
-      obj = klass.get_collection().find_one( { field_name : value })
+   def find_by_ids(klass, ids):
+      """
+      Retrieves from database, with a single query, the documents whose id is
+      among the supplied ones.
+
+      Arguments:
+      - ids: an iterable of ids, not necessarily sanitized.
+
+      Returns a dictionary of ODMModel objects, indexed by (sanitized) id.
+      Ids without a document are not present in the dictionary. Inside a
+      session, ids already retrieved are not queried again.
+      """
+      ids            = { klass.sanitize_id(id) for id in ids }
+      identity_map   = ODMModel._identity_map or {}
+      name           = klass.collection_name()
+      result         = {}
+
+      for id in [ id for id in ids if (name, id) in identity_map ]:
+         ids.discard(id)
+
+         if identity_map[(name, id)] is not None:
+            result[id] = identity_map[(name, id)]
+
+      if ids:
+         result.update(
+            (obj["_id"], obj) for obj in klass.where({ "_id" : { "$in" : list(ids) } })
+         )
+
+      return result
+
+   @classmethod
+   def find_by_field(klass, field_name, value, projection = None, raw = False):
+      """
+      Retrieves from database the first document with the supplied value of
+      field_name. See where for projection and raw.
+
+      Returns none if query returns no results
+      """
+      query = { field_name : value }
+      obj   = ODMModel._pm.find_one(klass.collection_name(), query, projection)
 
       res = None
       if(obj):
-         res = klass(obj)
-         res.set_changed(False)
+         res = raw and obj or klass._from_document(obj, partial = projection is not None)
 
       return res
 
    @classmethod
-   def where(klass, query):
+   def where(klass, query, projection = None, raw = False):
       """
       Retrieves a list of objects from database.
 
       Arguments:
       - query: a MONGO filtering query
+      - projection: the fields to be retrieved (_id is always present), either
+      as a list of field names or as a MONGO projection dictionary. By default
+      whole documents are retrieved.
+      - raw: if True, documents are returned as dictionaries, without
+      instantiating ODMModel objects.
+
+      Return value: a generator of ODMModel objects (or dictionaries).
 
-      Return value: a generator of ODMModel objects.
+      Objects built from partial documents are not part of the current
+      session (see session) and, when saved, only write their changed fields.
+
+      Example:
+      >>> ids = [ b["_id"] for b in Building.where(query, [ "_id" ], raw = True) ]
       """
-      docs = klass.get_collection().find( query )
+      if projection is None:
+         docs = klass.get_collection().find( query )
+      else:
+         docs = klass.get_collection().find( query, projection )
 
-      def generate_model_obj(document):
-         document = klass(document)
-         document.set_changed(False)
-         return document
+      if raw:
+         return ( doc for doc in docs )
 
-      results = ( generate_model_obj(doc) for doc in docs )
+      partial = projection is not None
+      results = ( klass._from_document(doc, partial) for doc in docs )
       return results
 
    """
@@ -1,4 +1,5 @@
 from .drawable import Text, Polygon, Drawable
+import numpy as np
 
 class Room(Drawable):
    def __init__(self, polygon = None, texts=None):
@@ -46,6 +47,18 @@ class Room(Drawable):
       relative_point = text.traslated_ac(traslate_x, traslate_y)
       return self.polygon._contains_point(relative_point)
 
+   def contains_points(self, points):
+      """Batch version of contains_text. Given an (M, 2) array of absolute
+      coordinates, returns a boolean array telling which of them are inside
+      the current room"""
+      points = np.asarray(points, dtype=float).reshape(-1, 2)
+
+      if not self.polygon:
+         return np.zeros(len(points), dtype=bool)
+
+      anchor = (self.polygon.anchor_point.x, self.polygon.anchor_point.y)
+      return self.polygon.contains_points(points - anchor)
+
    def min_absolute_point(self):
       min_point, _ = self.polygon.bounding_box
       return self.polygon.traslated_ac(*min_point)
@@ -0,0 +1,97 @@
+from .odm   import ODMModel
+from .      import Building, BuildingView
+import copy
+
+class RoomView(ODMModel):
+   """
+   The RoomView class is a flattened index of the rooms of the BuildingView
+   documents, one document per room, carrying the building and floor data the
+   api shows along with a room. It is kept in sync with BuildingView, so that
+   single rooms are read with an _id lookup instead of a whole building.
+   """
+
+   @classmethod
+   def room_id(klass, b_id, r_id):
+      """Returns the _id of the RoomView of the room r_id of building b_id"""
+      return "{}_{}".format(b_id, r_id)
+
+   @classmethod
+   def find_room(klass, b_id, r_id):
+      """Returns the RoomView of the room r_id of building b_id, or None"""
+      return klass.find(klass.room_id(b_id, r_id))
+
+   @classmethod
+   def create_from_building_view(klass, building_view):
+      """
+      Returns the list of RoomView objects (not saved) of a BuildingView
+      object or dictionary.
+      """
+      b_id        = building_view["_id"]
+      coordinates = building_view.get("coordinates", {}).get("coordinates", [])
+      rooms       = []
+
+      for floor in building_view.get("floors", []):
+         for r_id, room in floor.get("rooms", {}).items():
+            room = copy.deepcopy(room)
+            room.update({
+               "_id"                   : klass.room_id(b_id, r_id),
+               "b_id"                  : b_id,
+               "r_id"                  : r_id,
+               "building_name"         : building_view.get("building_name", ""),
+               "building_address"      : building_view.get("address", ""),
+               "building_coordinates"  : coordinates[:2],
+               "f_id"                  : floor["f_id"],
+               "floor"                 : floor.get("floor_name", "")
+            })
+            rooms.append(RoomView(room))
+
+      return rooms
+
+   @classmethod
+   def update_building_rooms(klass, building_view):
+      """
+      Saves the RoomView objects of a BuildingView, removing those of rooms
+      it no longer contains.
+      """
+      rooms    = klass.create_from_building_view(building_view)
+      old_ids  = klass.where({ "b_id" : building_view["_id"] }, [ "_id" ], raw = True)
+      stale    = { r["_id"] for r in old_ids } - { r["_id"] for r in rooms }
+
+      with klass.batch():
+         for room in rooms:
+            room.save()
+
+      if stale:
+         klass._pm.delete_many(klass.collection_name(), { "_id" : { "$in" : list(stale) } })
+         klass.evict(stale)
+
+   @classmethod
+   def remove_deleted_buildings(klass):
+      """
+      Listener to be executed after Building.remove_deleted_buildings, removes
+      the rooms of deleted buildings.
+      """
+      valid_ids   = klass._pm.get_collection_ids(Building.collection_name())
+      query       = {
+         "b_id" : {
+            "$nin" : list(valid_ids)
+         }
+      }
+
+      klass._pm.remove(klass.collection_name(), query, { "multi" : True })
+      klass.evict()
+
+   @classmethod
+   def setup_collection(klass):
+      """
+      Creates the indexes of the collection and, if it is empty, fills it from
+      the BuildingView documents saved before the index existed.
+      """
+      collection = klass.get_collection()
+      collection.create_index("b_id")
+
+      if collection.find_one({}, { "_id" : 1 }) is None:
+         with klass.batch():
+            for building_view in BuildingView.where({}, raw = True):
+               for room in klass.create_from_building_view(building_view):
+                  room.save()
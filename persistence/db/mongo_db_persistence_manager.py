@@ -1,31 +1,178 @@
 from . import DB;
+from pymongo      import ReplaceOne, UpdateOne
+from bson         import ObjectId
+from contextlib   import contextmanager
 
 class MongoDBPersistenceManager:
 
+   default_batch_size = 500
+
    def __init__(self, config = None, db = None):
+      self.batch_size = self.default_batch_size
+
       if config is not None:
          db_cfg = config["db"]
          db = DB(db_cfg["url"], db_cfg["port"], db_cfg["db_name"])
+         self.batch_size = db_cfg.get("batch_size", self.batch_size)
 
       self.db = db
 
+      # Batched unit of work: write operations queued per collection, indexed
+      # by the _id of their document
+      self._batch_depth = 0
+      self._pending     = {}
+
    def clean_collection(self,collection_name):
+      self._pending.pop(collection_name, None)
       self.db[collection_name].drop()
 
    def save(self, collection_name, value):
-      self.db[collection_name].save(value)
+      """
+      Saves (inserts or replaces) a document. Documents without an _id get a
+      new ObjectId, as the old Collection.save did.
+
+      Inside a batch (see batch) the document is only queued, and written with
+      the following flush, in its state at that time.
+      """
+      if "_id" not in value:
+         value["_id"] = ObjectId()
+
+      if not self._batch_depth:
+         self.db[collection_name].replace_one({ "_id" : value["_id"] }, value, upsert = True)
+         return
+
+      self._enqueue(collection_name, value["_id"], ReplaceOne({ "_id" : value["_id"] }, value, upsert = True))
+
+   def update_fields(self, collection_name, id, to_set, to_unset):
+      """
+      Updates only some fields of an existing document.
+
+      Arguments:
+      - collection_name: the collection of the document;
+      - id: the _id of the document;
+      - to_set, to_unset: dictionaries in the format of the $set and $unset
+      operators, either can be empty.
+
+      Inside a batch (see batch) the update is queued as save does.
+      """
+      update = {}
+      if to_set:
+         update["$set"] = to_set
+      if to_unset:
+         update["$unset"] = to_unset
+
+      if not update:
+         return
+
+      if not self._batch_depth:
+         self.db[collection_name].update_one({ "_id" : id }, update)
+         return
+
+      self._enqueue(collection_name, id, UpdateOne({ "_id" : id }, update))
+
+   def _enqueue(self, collection_name, id, operation):
+      pending = self._pending.setdefault(collection_name, {})
+
+      # A document replaced twice in the same batch is written once, in its
+      # last version. Unordered bulk writes do not grant the order of
+      # operations, hence other operations on a queued document cause a flush
+      if id in pending:
+         if not (type(operation) is ReplaceOne and type(pending[id]) is ReplaceOne):
+            self.flush(collection_name)
+            pending = self._pending.setdefault(collection_name, {})
+
+      pending[id] = operation
+
+      if sum(len(ops) for ops in self._pending.values()) >= self.batch_size:
+         self.flush()
 
    def destroy_by_id(self, collection_name, id):
-      self.db[collection_name].remove({"_id" : id})
+      self.get_collection(collection_name).delete_one({"_id" : id})
+
+   def delete_many(self, collection_name, query):
+      """
+      Removes with a single query the documents matching query, after writing
+      the documents queued for the collection.
+
+      Returns: the number of removed documents.
+      """
+      return self.get_collection(collection_name).delete_many(query).deleted_count
 
    def get_collection(self, collection_name):
+      """
+      Returns the collection, after writing the documents queued for it, so
+      that queries performed on it always see previous saves.
+      """
+      self.flush(collection_name)
       return self.db[collection_name]
 
+   def find_one(self, collection_name, query, projection = None):
+      """
+      Returns the first document matching query, optionally with only the
+      fields selected by projection. Queries by _id only cause a flush of the
+      pending saves if the requested document is among them.
+      """
+      pending = self._pending.get(collection_name)
+
+      if pending and (list(query) != ["_id"] or query["_id"] in pending):
+         self.flush(collection_name)
+
+      if projection is None:
+         return self.db[collection_name].find_one(query)
+
+      return self.db[collection_name].find_one(query, projection)
+
    def update(self, collection_name, query, action, options):
-      return self.db[collection_name].update(query, action, **options)
+      return self.get_collection(collection_name).update(query, action, **options)
 
    def remove(self, collection_name, query, options):
-      return self.db[collection_name].remove(query, **options)
+      return self.get_collection(collection_name).remove(query, **options)
 
    def get_collection_ids(self, collection_name):
-      return map(lambda o: o["_id"], self.db[collection_name].find({}, { "_id" : 1 }))
+      return map(lambda o: o["_id"], self.get_collection(collection_name).find({}, { "_id" : 1 }))
+
+   ##############
+   # BATCH MODE #
+   ##############
+
+   @contextmanager
+   def batch(self, batch_size = None):
+      """
+      Context manager in which saves are queued and written with bulk_write,
+      every batch_size documents and when the outermost batch ends (even if
+      an exception is raised).
+
+      Arguments:
+      - batch_size: the number of queued documents causing a flush, the
+      configured db.batch_size by default.
+
+      Usage:
+      with pm.batch():
+         for b in buildings:
+            pm.save("building", b)
+      """
+      previous_size     = self.batch_size
+      self.batch_size   = batch_size or self.batch_size
+      self._batch_depth += 1
+
+      try:
+         yield self
+      finally:
+         self._batch_depth -= 1
+         self.batch_size   = previous_size
+
+         if not self._batch_depth:
+            self.flush()
+
+   def flush(self, collection_name = None):
+      """
+      Writes the queued operations of a collection, or of every collection if
+      collection_name is None, with one unordered bulk_write per collection.
+      """
+      names = collection_name is None and list(self._pending) or [ collection_name ]
+
+      for name in names:
+         operations = self._pending.pop(name, None)
+
+         if operations:
+            self.db[name].bulk_write(list(operations.values()), ordered = False)
@@ -1,6 +1,7 @@
 from utils.csv_reader import CSVReader
 from .                import Task, FileUpdateException
 from .data_updaters   import EdiliziaDataUpdater, EasyroomDataUpdater, AvailableServicesDataUpdater
+from model.odm        import ODMModel
 import os, re
 
 class CSVTask(Task):
@@ -92,7 +93,9 @@ class CSVTask(Task):
       else:
          raise FileUpdateException("Unknown service type: "+str(service))
 
-      updater.perform_update(entities_type, content)
+      # Each building is represented by a single object during the update
+      with ODMModel.session():
+         updater.perform_update(entities_type, content)
 
    def get_backup_filepath(self, filename):
       """
@@ -8,6 +8,7 @@ class AvailableServicesDataUpdater:
 
    def perform_update(self,entities_type, content):
       AvailableService.clean()
-      for s in content:
-         service = AvailableService(s)
-         service.save()
+      with AvailableService.batch():
+         for s in content:
+            service = AvailableService(s)
+            service.save()
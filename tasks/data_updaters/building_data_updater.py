@@ -2,6 +2,7 @@ from model         import Building
 from utils.logger  import Logger
 from tasks.mergers import DataMerger
 from datetime      import datetime
+from .prefetched_buildings import PrefetchedBuildings
 
 class BuildingDataUpdater():
    """
@@ -37,16 +38,21 @@ class BuildingDataUpdater():
       be updated, otherwise it will be replaced.
       """
       self.batch_date   = datetime.now()
+      buildings         = [ b for b in buildings if self._validate_building_data(b) ]
 
-      for b in buildings:
-         if not self._validate_building_data(b):
-            continue
+      # All the involved buildings are loaded with a single query
+      self.prefetched_buildings = PrefetchedBuildings(
+         id for b in buildings for id in self.building_ids_to_prefetch(b)
+      )
 
-         building = self.find_building_to_update(b)
-         self._mark_building_as_updated(building)
+      # Saves are written in bulk, and all of them before the cleanup
+      with Building.batch():
+         for b in buildings:
+            building = self.find_building_to_update(b)
+            self._mark_building_as_updated(building)
 
-         with Logger.info("Processing "+str(building)):
-            self._update_a_building(building, b)
+            with Logger.info("Processing "+str(building)):
+               self._update_a_building(building, b)
 
       self._clean_unmarked_buildings()
 
@@ -126,7 +132,7 @@ class BuildingDataUpdater():
       n_removed, b_removed = Building.remove_untouched_keys(
          self.get_namespace(), self.batch_date
       )
-      b_removed            = [ b["b_id"] for b in b_removed ]
+      b_removed            = [ b["_id"] for b in b_removed ]
 
       if b_removed:
          Logger.info(
@@ -137,7 +143,7 @@ class BuildingDataUpdater():
                   )
 
          n_destroyed, b_destroyed   = Building.remove_deleted_buildings()
-         b_destroyed                = [ b["b_id"] for b in b_destroyed ]
+         b_destroyed                = [ b["_id"] for b in b_destroyed ]
          if n_destroyed:
             Logger.info(
                      n_destroyed,
@@ -186,6 +192,16 @@ class BuildingDataUpdater():
       sanitize a building namespace data"""
       pass
 
+   def building_ids_to_prefetch(self, building_dict):
+      """
+      Returns the ids of the buildings that may be looked up while updating
+      with building_dict, to be loaded in advance.
+
+      The default implementation returns only its b_id. Subclasses looking up
+      other buildings must override this method.
+      """
+      return [ building_dict["b_id"] ]
+
    def find_building_to_update(self, building_dict):
       """
       Finds on database or create a Buiding object to be updated with information
@@ -197,9 +213,10 @@ class BuildingDataUpdater():
 
       Returns a Building object.
 
-      The default implementation finds the building by its b_id or creates a new
-      one if none exists. Subclasses may override this behavior.
+      The default implementation finds the building by its b_id among the
+      prefetched ones or creates a new one if none exists. Subclasses may
+      override this behavior.
       """
       b_id = building_dict.get("b_id", "")
 
-      return Building.find_or_create_by_id(b_id)
+      return self.prefetched_buildings.find_or_create(b_id)
@@ -1,5 +1,5 @@
 from tasks.mergers import DataMerger, DXFRoomIdsResolver, DXFRoomCatsResolver
-from model         import Building
+from model         import Building, FloorGeometry
 from datetime      import datetime
 from utils.logger  import Logger
 
@@ -55,9 +55,17 @@ class DXFDataUpdater:
       new_floor["updated_at"]          = datetime.now()
       del new_floor["b_id"]
 
+      # Muri e finestre vengono salvati in una collezione a parte, il floor
+      # mantiene soltanto un riferimento (geometry_id)
+      geometry    = FloorGeometry.extract_from(building["_id"], new_floor)
+
       # Non vogliamo cancellare quanto c'è nel database, soltanto lo stesso floor
       dxf         = building.get("dxf", {})
       floors      = dxf.get("floors", [])
+      old_ids     = [
+         f["geometry_id"] for f in floors
+         if f["f_id"] == floor.f_id and f.get("geometry_id", geometry["_id"]) != geometry["_id"]
+      ]
 
       # Se il floor corrente esiste gia' nel database, vogliamo sostituirlo
       for k, f in enumerate(floors):
@@ -91,4 +99,7 @@ class DXFDataUpdater:
             )
 
          building.listen_once("before_save", before_callback)
+
+         geometry.save()
          building.save()
+         FloorGeometry.remove(old_ids)
@@ -102,6 +102,20 @@ class EdiliziaDataUpdater(BuildingDataUpdater, RoomDataUpdater):
       f_id = FloorInference.fid_from_string(floor_id, "suffix_regex")
       return super().sanitize_and_validate_floor(f_id, floor_rooms)
 
+   def building_ids_to_prefetch(self, building_dict):
+      """
+      Besides the b_id, buildings may be merged with the one saved under their
+      legacy building id (see find_building_to_update).
+
+      Returns a list of ids.
+      """
+      l_b_id = building_dict.get("l_b_id", "")
+
+      if Building.is_valid_bid(l_b_id):
+         return [ building_dict["b_id"], l_b_id ]
+
+      return [ building_dict["b_id"] ]
+
    def find_building_to_update(self, building_dict):
       """
       Finds on database or create a Buiding object to be updated with
@@ -123,7 +137,7 @@ class EdiliziaDataUpdater(BuildingDataUpdater, RoomDataUpdater):
       """
 
       b_id     = building_dict["b_id"]
-      building = Building.find_or_create_by_id(b_id)
+      building = self.prefetched_buildings.find_or_create(b_id)
 
       # controllo di non avere una mappatura tra b_id e l_b_id
       if "merged" not in building or not building["merged"].get("l_b_id", None):
@@ -132,7 +146,7 @@ class EdiliziaDataUpdater(BuildingDataUpdater, RoomDataUpdater):
          if not Building.is_valid_bid(l_b_id):
             return building
 
-         to_merge = Building.find(l_b_id)
+         to_merge = self.prefetched_buildings.find(l_b_id)
 
          if to_merge is not None:
             # abbiamo trovato un building corrispondente all'id legacy
@@ -151,7 +165,12 @@ class EdiliziaDataUpdater(BuildingDataUpdater, RoomDataUpdater):
                )
 
             building.listen_once("before_save", before_callback)
-            building.listen_once("after_save", lambda b: to_merge.destroy() )
+
+            def after_callback(b):
+               to_merge.destroy()
+               self.prefetched_buildings.forget(to_merge)
+
+            building.listen_once("after_save", after_callback)
 
       return building
 
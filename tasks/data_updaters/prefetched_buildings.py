@@ -0,0 +1,61 @@
+from model import Building
+
+class PrefetchedBuildings():
+   """
+   Identity map of the buildings involved in an update batch, loaded from
+   database with a single query instead of one lookup per building.
+
+   Every id is looked up at most once: ids that were not prefetched are
+   searched on database the first time they are requested, and buildings
+   created for missing ids are kept, so that each id always resolves to the
+   same Building object.
+
+   Usage:
+   buildings   = PrefetchedBuildings([ "11010", "21030" ])
+   building    = buildings.find_or_create("11010")
+   """
+
+   def __init__(self, ids = ()):
+      """
+      Arguments:
+      - ids: an iterable of the building ids to be loaded, invalid and
+      duplicate ids are allowed.
+      """
+      self._requested   = { Building.sanitize_id(id) for id in ids }
+      self._buildings   = Building.find_by_ids(self._requested)
+
+   def find(self, b_id):
+      """
+      Returns the Building with the supplied id, or None if it does not exist
+      (or has been forgotten).
+      """
+      b_id = Building.sanitize_id(b_id)
+
+      if b_id not in self._requested:
+         self._requested.add(b_id)
+         building = Building.find(b_id)
+
+         if building is not None:
+            self._buildings[b_id] = building
+
+      return self._buildings.get(b_id)
+
+   def find_or_create(self, b_id):
+      """
+      Returns the Building with the supplied id, creating a new one (not saved)
+      if it does not exist.
+      """
+      building = self.find(b_id)
+
+      if building is None:
+         building = Building({ "_id" : b_id })
+         self._buildings[building["_id"]] = building
+
+      return building
+
+   def forget(self, building):
+      """
+      Removes a building from the map, e.g. because it has been destroyed:
+      following lookups of its id return None.
+      """
+      self._buildings.pop(building["_id"], None)
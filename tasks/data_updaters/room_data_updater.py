@@ -3,6 +3,7 @@ from utils.logger   import Logger
 from tasks.mergers  import DataMerger, DXFRoomIdsResolver
 from datetime       import datetime
 from itertools      import groupby
+from .prefetched_buildings import PrefetchedBuildings
 
 class RoomDataUpdater():
    """
@@ -49,42 +50,49 @@ class RoomDataUpdater():
       # ordiniamo le stanze per edificio e per piano in modo da velocizzare l'algoritmo
       rooms.sort(key = lambda s: (s["b_id"], s["l_floor"]))
 
+      # carichiamo tutti i building coinvolti con un'unica query
+      self.prefetched_buildings = PrefetchedBuildings(
+         b_id for b_id in set(r["b_id"] for r in rooms) if Building.is_valid_bid(b_id)
+      )
+
       # raggruppiamo le stanze per building_id
       rooms = groupby(rooms, key = lambda s: s["b_id"])
 
-      # Analizziamo un building alla volta
-      for (b_id, rooms) in rooms:
-
-         # Non procedo se il b_id non è valido
-         if not Building.is_valid_bid(b_id):
-            Logger.error(
-               "Invalid building id: \"{}\".".format(b_id),
-               "Rooms discarded:",
-               ", ".join(r["r_id"] for r in rooms)
-            )
-            continue
+      # Salviamo i building in blocco (bulk_write) anziche' uno alla volta
+      with Building.batch():
+         # Analizziamo un building alla volta
+         for (b_id, rooms) in rooms:
+
+            # Non procedo se il b_id non è valido
+            if not Building.is_valid_bid(b_id):
+               Logger.error(
+                  "Invalid building id: \"{}\".".format(b_id),
+                  "Rooms discarded:",
+                  ", ".join(r["r_id"] for r in rooms)
+               )
+               continue
 
-         building = Building.find_or_create_by_id(b_id)
+            building = self.prefetched_buildings.find_or_create(b_id)
 
-         # Lavoro principale di aggiornamento
-         self.replace_building_rooms(building, rooms)
+            # Lavoro principale di aggiornamento
+            self.replace_building_rooms(building, rooms)
 
-         # Non sarebbe questa gia' una politica di merge? Si tratta di usare
-         # info di piu' sorgenti per risolvere qualcosa di DXF, ma usiamo più
-         # sorgenti! È un tipo di merge, non un DXFDataUpdater. Mi sembra nel
-         # posto sbagliato questo metodo. Mi sembra che le funzionalità di
-         # merge sono compito del building model.
-         DXFRoomIdsResolver.resolve_rooms_id(building, None, self.get_namespace())
+            # Non sarebbe questa gia' una politica di merge? Si tratta di usare
+            # info di piu' sorgenti per risolvere qualcosa di DXF, ma usiamo più
+            # sorgenti! È un tipo di merge, non un DXFDataUpdater. Mi sembra nel
+            # posto sbagliato questo metodo. Mi sembra che le funzionalità di
+            # merge sono compito del building model.
+            DXFRoomIdsResolver.resolve_rooms_id(building, None, self.get_namespace())
 
-         # Ensure floor merging is performed AFTER DXF Room_id resolution
-         merged            = building.attributes_for_source("merged")
-         merged["floors"]  = DataMerger.merge_floors(
-            building.get("edilizia"),
-            building.get("easyroom"),
-            building.get("dxf")
-         )
+            # Ensure floor merging is performed AFTER DXF Room_id resolution
+            merged            = building.attributes_for_source("merged")
+            merged["floors"]  = DataMerger.merge_floors(
+               building.get("edilizia"),
+               building.get("easyroom"),
+               building.get("dxf")
+            )
 
-         building.save()
+            building.save()
 
    def replace_building_rooms(self, building, rooms):
       """
@@ -1 +1,4 @@
 from .floor_drawer import FloorDrawer
+from .svg_manifest import SVGManifest
+from .streaming_floor_drawer import StreamingFloorDrawer
+from .drawing_cache import DrawingCache
@@ -0,0 +1,174 @@
+from utils.logger import Logger
+import os, json, time, hashlib, sqlite3
+
+class DrawingCache():
+   """
+   Persistent cache of the deterministic parts of floor drawing whose inputs
+   rarely change: the css compiled from the stylesheet, keyed by the hash of
+   the stylesheet content, and the rdp-simplified room outlines, keyed by the
+   hash of the polygon coordinates and the tolerance.
+
+   Entries are stored in a sqlite database, so that the worker processes of
+   SVGTask share them: each process opens its own connection, and new
+   entries are written in a single transaction by flush, along with the last
+   use time of the entries read. Since every change of a floor produces new
+   outline keys, prune keeps only the max_entries most recently used entries.
+
+   Usage:
+   FloorDrawer.cache = DrawingCache("data/svg/cache/drawing_cache.sqlite")
+   ...
+   FloorDrawer.cache.prune()
+   """
+
+   # To be increased whenever the format of the stored values changes
+   cache_format         = 1
+
+   # To be increased whenever the table layout changes, the entries of older
+   # layouts are discarded
+   schema_version       = 2
+
+   default_max_entries  = 100000
+
+   def __init__(self, path, max_entries = None):
+      """
+      Arguments:
+      - path: the sqlite database file, created if needed (with its folder);
+      - max_entries: maximum number of entries kept by prune.
+      """
+      self.path         = path
+      self.max_entries  = max_entries or self.default_max_entries
+      self._connection  = None
+      self._pid         = None
+      self._pending     = {}
+      self._used        = set()
+
+   def _db(self):
+      # Connections are never shared between processes
+      if self._pid != os.getpid():
+         os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+
+         self._connection  = sqlite3.connect(self.path, timeout = 30)
+         self._pid         = os.getpid()
+         self._pending     = {}
+         self._used        = set()
+
+         self._connection.execute("PRAGMA journal_mode = WAL")
+
+         with self._connection:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.schema_version:
+               self._connection.execute("DROP TABLE IF EXISTS entries")
+               self._connection.execute("PRAGMA user_version = {:d}".format(self.schema_version))
+
+            self._connection.execute(
+                  "CREATE TABLE IF NOT EXISTS entries "
+                  "(key TEXT PRIMARY KEY, value TEXT, used_at REAL)"
+               )
+            self._connection.execute(
+                  "CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)"
+               )
+
+      return self._connection
+
+   def get(self, key, compute):
+      """
+      Returns the value stored under key, or computes it with compute (a
+      function without arguments returning a json-serializable value) and
+      stores it, to be written with the next flush.
+      """
+      key = "{}:{}".format(self.cache_format, key)
+
+      try:
+         db    = self._db()
+         value = self._pending.get(key)
+
+         if value is None:
+            row = db.execute("SELECT value FROM entries WHERE key = ?", (key, )).fetchone()
+            if row is not None:
+               self._used.add(key)
+               return json.loads(row[0])
+         else:
+            return json.loads(value)
+      except sqlite3.Error as e:
+         Logger.warning("Unable to read drawing cache:", str(e))
+         return compute()
+
+      result               = compute()
+      self._pending[key]   = json.dumps(result)
+      return result
+
+   def flush(self):
+      """
+      Writes the entries computed since the last flush, and the use time of
+      the entries read since then.
+      """
+      if not (self._pending or self._used) or self._pid != os.getpid():
+         return
+
+      now = time.time()
+
+      try:
+         with self._connection:
+            self._connection.executemany(
+                  "INSERT OR REPLACE INTO entries (key, value, used_at) VALUES (?, ?, ?)",
+                  ( (key, value, now) for key, value in self._pending.items() )
+               )
+            self._connection.executemany(
+                  "UPDATE entries SET used_at = ? WHERE key = ?",
+                  ( (now, key) for key in self._used )
+               )
+      except sqlite3.Error as e:
+         Logger.warning("Unable to write drawing cache:", str(e))
+
+      self._pending  = {}
+      self._used     = set()
+
+   def prune(self):
+      """
+      Removes the least recently used entries exceeding max_entries, after
+      writing the pending ones.
+
+      Returns: the number of removed entries.
+      """
+      try:
+         db = self._db()
+         self.flush()
+
+         with db:
+            removed = db.execute(
+                  "DELETE FROM entries WHERE key NOT IN "
+                  "(SELECT key FROM entries ORDER BY used_at DESC LIMIT ?)",
+                  (self.max_entries, )
+               ).rowcount
+      except sqlite3.Error as e:
+         Logger.warning("Unable to prune drawing cache:", str(e))
+         return 0
+
+      return removed
+
+   def css(self, stylesheet, compile, compiler_version = ""):
+      """
+      Returns the css compiled from a stylesheet file with compile (a function
+      receiving the file name), reusing it while the file content and the
+      compiler_version string are unchanged.
+      """
+      with open(stylesheet, "rb") as fp:
+         digest = hashlib.sha256(fp.read()).hexdigest()
+
+      return self.get("css:{}:{}".format(compiler_version, digest), lambda: compile(stylesheet))
+
+   def outline(self, coords, tolerance, simplify):
+      """
+      Returns the simplified outline of a polygon, computed with simplify (a
+      function without arguments returning a list of [x, y] points) only for
+      coordinates not simplified before with the same tolerance.
+
+      Arguments:
+      - coords: the numpy array of the polygon absolute coordinates;
+      - tolerance: the simplification tolerance;
+      - simplify: the function computing the outline.
+      """
+      digest = hashlib.sha1(coords.tobytes()).hexdigest()
+      key    = "outline:{}:{}:{}".format(digest, coords.dtype.str, repr(tolerance))
+
+      return self.get(key, simplify)
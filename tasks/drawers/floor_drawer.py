@@ -6,77 +6,150 @@ from itertools       import chain, groupby
 import lesscpy
 import svgwrite, re
 import rdp
+import hashlib, json, io
 
 
 class FloorDrawer():
 
    css_style = ""
 
+   stylesheet = "assets/svg.less"
+
+   # An optional DrawingCache, persisting the compiled css and the simplified
+   # room outlines across runs
+   cache = None
+
+   # Part of the floor hash (see floor_hash), to be increased whenever the
+   # drawing rules change, so that all maps are drawn again
+   drawer_version = 1
+
+   @classmethod
+   def floor_hash(klass, floor):
+      """
+      Returns a hash of everything the map of a floor is drawn from: room
+      polygons, categories and names, walls, windows, the stylesheet and the
+      drawer version. Maps of floors with the same hash are identical.
+
+      Arguments:
+      - floor: a dictionary representing a merged floor, with its geometry.
+
+      Returns: a string, the SHA-256 hex digest.
+      """
+      def room_inputs(room):
+         cat_id = room.get("cat_id", "")
+         return [
+            room.get("polygon"),
+            cat_id,
+            RoomCategory.get_group_name_by_id(cat_id),
+            RoomCategory.get_scope_by_id(cat_id),
+            room.get("room_name", "")
+         ]
+
+      inputs = {
+         "version"            : klass.drawer_version,
+         "rooms"              : { r_id : room_inputs(r) for r_id, r in floor.get("rooms", {}).items() },
+         "unidentified_rooms" : [ room_inputs(r) for r in floor.get("unidentified_rooms", []) ],
+         "walls"              : floor.get("walls", []),
+         "windows"            : floor.get("windows", [])
+      }
+
+      sha = hashlib.sha256()
+      sha.update(json.dumps(inputs, sort_keys = True, separators = (",", ":")).encode("utf-8"))
+
+      with open(klass.stylesheet, "rb") as fp:
+         sha.update(fp.read())
+
+      return sha.hexdigest()
+
+   def __init__(self):
+      """
+      Builds the render context of a single drawing: the svg document and the
+      maximum coordinates drawn so far, used for its viewBox. Drawing state is
+      never shared between drawings, hence floors may be drawn concurrently.
+      """
+      self.max_x  = 0
+      self.max_y  = 0
+      self.svg    = svgwrite.Drawing()
+
    @classmethod
    def draw_floor(klass, floor):
       """
-      Create and save a map (in svg format) representing a floor.
+      Create a map (in svg format) representing a floor.
 
       Arguments:
       - floor: a dictionary representing a merged floor.
 
-      Returns: None
+      Returns: an svgwrite Drawing object.
       """
-      klass.max_x          = 0
-      klass.max_y          = 0
-      klass.svg            = svgwrite.Drawing()
-      klass._add_style_to_svg()
+      svg = klass()._draw(floor)
+
+      if FloorDrawer.cache:
+         FloorDrawer.cache.flush()
+
+      return svg
+
+   def _draw(self, floor):
+      self._add_style_to_svg()
 
       window_lines         = floor.get("windows", [])
-      windows_group        = klass._create_lines_group(window_lines, group_id="windows")
+      windows_group        = self._create_lines_group(window_lines, group_id="windows")
 
       wall_lines           = floor.get("walls", [])
-      walls_group          = klass._create_lines_group(wall_lines, group_id="walls")
+      walls_group          = self._create_lines_group(wall_lines, group_id="walls")
 
-      rooms_group          = klass._create_rooms_group(floor)
-      rooms_labels_g       = klass._create_rooms_labels_group(floor)
+      rooms_group          = self._create_rooms_group(floor)
+      rooms_labels_g       = self._create_rooms_labels_group(floor)
 
-      legend               = klass._create_legend_group(floor)
+      legend               = self._create_legend_group(floor)
 
-      klass.svg.add(windows_group)
-      klass.svg.add(rooms_group)
-      klass.svg.add(walls_group)
-      klass.svg.add(rooms_labels_g)
-      #klass.svg.add(legend)
+      self.svg.add(windows_group)
+      self.svg.add(rooms_group)
+      self.svg.add(walls_group)
+      self.svg.add(rooms_labels_g)
+      #self.svg.add(legend)
 
-      if len(klass.svg.elements) <= 1:
+      if len(self.svg.elements) <= 1:
          Logger.warning("Impossible generate csv: no room polylines founded")
 
       # set viewBox for a correct rendering
-      klass.svg.viewbox(0,0,klass.max_x,klass.max_y)
+      self.svg.viewbox(0,0,self.max_x,self.max_y)
 
-      return klass.svg
+      return self.svg
 
    @classmethod
-   def _create_legend_group(klass, floor):
+   def to_string(klass, svg):
+      """
+      Returns the content of the svg file of a Drawing object, as written by
+      its saveas method.
+      """
+      fp = io.StringIO()
+      svg.write(fp)
+      return fp.getvalue()
+
+   def _create_legend_group(self, floor):
       circle_radius = 7
       line_height   = 26
       all_cats      = set()
 
-      for cat_name, cat_rooms in klass.get_grouped_rooms(floor):
+      for cat_name, cat_rooms in self.get_grouped_rooms(floor):
          for r_id, room in cat_rooms:
-            polygon       = klass._create_polygon(room.get("polygon"))
-            klass.max_x   = max(klass.max_x, polygon.max_x())
-            klass.max_y   = max(klass.max_y, polygon.max_y())
+            polygon       = self._create_polygon(room.get("polygon"))
+            self.max_x    = max(self.max_x, polygon.max_x())
+            self.max_y    = max(self.max_y, polygon.max_y())
             all_cats.add( cat_name )
 
       legend_group  = svgwrite.container.Group(id = "legend")
-      x             = klass.max_x + 25
+      x             = self.max_x + 25
       y             = 25
       for cat_name in sorted(all_cats):
          cat_group  = svgwrite.container.Group(
-            id = "L-"+klass._prepare_cat_name(cat_name)
+            id = "L-"+self._prepare_cat_name(cat_name)
          )
          cat_group.add(
-            klass.svg.circle((x, y - circle_radius), circle_radius)
+            self.svg.circle((x, y - circle_radius), circle_radius)
          )
          cat_group.add(
-            klass.svg.text(cat_name, (x + circle_radius + 3, y) )
+            self.svg.text(cat_name, (x + circle_radius + 3, y) )
          )
 
          legend_group.add(cat_group)
@@ -84,21 +157,32 @@ class FloorDrawer():
 
       return legend_group
 
-   @classmethod
-   def _add_style_to_svg(klass):
+   def _add_style_to_svg(self):
       """
-      Compile the assets/svg.less file and return an svg Style object that
-      contains the css formatting.
+      Adds to the svg a Style object containing the css formatting, see
+      compiled_style.
 
       Returns None
       """
-      if not klass.css_style:
-         klass.css_style = lesscpy.compile("assets/svg.less")
-
-      klass.svg.add(klass.svg.style(klass.css_style))
+      self.svg.add(self.svg.style(self.compiled_style()))
 
    @classmethod
-   def _create_lines_group(klass, lines, group_id):
+   def compiled_style(klass):
+      """
+      Returns the css compiled from the assets/svg.less file, compiled once
+      per process and shared by all drawings.
+      """
+      if not FloorDrawer.css_style:
+         if FloorDrawer.cache:
+            FloorDrawer.css_style = FloorDrawer.cache.css(
+                  klass.stylesheet, lesscpy.compile, lesscpy.__version__
+               )
+         else:
+            FloorDrawer.css_style = lesscpy.compile(klass.stylesheet)
+
+      return FloorDrawer.css_style
+
+   def _create_lines_group(self, lines, group_id):
       """
       Given a list of lines and a group name, creates and returns an
       svg group object containing drawings of all lines.
@@ -106,17 +190,16 @@ class FloorDrawer():
       g = svgwrite.container.Group(id = group_id)
 
       for start, end in lines:
-         klass.max_x = max(klass.max_x, start["x"], end["x"])
-         g.add( klass.svg.line(
-            start= klass._approximate_coordinates( start["x"], start["y"] ),
-            end= klass._approximate_coordinates( end["x"], end["y"] )
+         self.max_x = max(self.max_x, start["x"], end["x"])
+         g.add( self.svg.line(
+            start= self._approximate_coordinates( start["x"], start["y"] ),
+            end= self._approximate_coordinates( end["x"], end["y"] )
             )
          )
 
       return g
 
-   @classmethod
-   def _create_rooms_group(klass, floor):
+   def _create_rooms_group(self, floor):
       """
       Creates an svg group with id "rooms" containing all identified and non
       identified rooms in floor, grouped by category, in the following
@@ -138,16 +221,16 @@ class FloorDrawer():
          [...]
       """
       rooms_group          = svgwrite.container.Group(id = "rooms")
-      rooms_by_cat         = klass.get_grouped_rooms(floor)
+      rooms_by_cat         = self.get_grouped_rooms(floor)
 
       for category_name, cat_rooms in rooms_by_cat:
-         group_cat_name = klass._prepare_cat_name(category_name)
+         group_cat_name = self._prepare_cat_name(category_name)
          cat_group      = svgwrite.container.Group(id = group_cat_name)
 
          for r_id, room in cat_rooms:
-            room_group = klass._create_room_group(
+            room_group = self._create_room_group(
                r_id,
-               klass._create_polygon(room.get("polygon"))
+               self._create_polygon(room.get("polygon"))
                )
             cat_group.add(room_group)
 
@@ -184,8 +267,7 @@ class FloorDrawer():
       return rooms_by_cat
 
 
-   @classmethod
-   def _create_rooms_labels_group(klass, floor):
+   def _create_rooms_labels_group(self, floor):
       """
       Creates a group of texts where each one has the name of an identified
       room. The text element itself has as id attribute the room id.
@@ -196,19 +278,18 @@ class FloorDrawer():
          if "polygon" not in room:
             continue
 
-         center = klass._create_polygon(room["polygon"]).center_point
+         center = self._create_polygon(room["polygon"]).center_point
          room_name = room.get("room_name", "")
 
          rooms_labels_g.add(
-            klass._get_centered_text(
+            self._get_centered_text(
                room_name, center.x, center.y, id_attr = "r_label_"+str(r_id)
             )
          )
 
       return rooms_labels_g
 
-   @classmethod
-   def _get_centered_text(klass, text, x, y, split_lines = True, id_attr = None, txttype = None, ):
+   def _get_centered_text(self, text, x, y, split_lines = True, id_attr = None, txttype = None, ):
       """
       Given a text string, x and y coordinates, returns an svg text object
       for that text while also centering horizontally.
@@ -216,9 +297,26 @@ class FloorDrawer():
       By defaul a text object is created, but it may also return other
       text types, like tspan for instance.
       """
+      txttype  = txttype or self.svg.text
+      id_attr  = str(id_attr or "") or None
+      lines    = self._text_lines(text, x, y, split_lines)
+
+      phrase, x, y   = lines[0]
+      first          = txttype(phrase, (x, y), id = id_attr)
+
+      for phrase, x, y in lines[1:]:
+         first.add(self.svg.tspan(phrase, (x, y), id = id_attr))
+
+      return first
+
+   @classmethod
+   def _text_lines(klass, text, x, y, split_lines = True):
+      """
+      Splits a text centered in (x, y) in lines, returning a list of tuples
+      (phrase, x, y) with the insert point of each line.
+      """
       hor_char_offset = 5
       ver_line_offset = 18
-      txttype = txttype or klass.svg.text
 
       if split_lines:
          # Espressione regolare che separa il testo in parole seguite da
@@ -230,21 +328,14 @@ class FloorDrawer():
 
       # Centralizzazione verticale a seconda della quanità di righe
       y = y - (len(phrases) - 1)* (ver_line_offset / 2.4)
-      first = txttype(
-         phrases[0],
-         (x - len(phrases[0]) * hor_char_offset, y),
-         id = str(id_attr or "") or None
-      )
 
-      for i, phrase in enumerate(phrases[1:]):
-         first.add(
-            klass.svg.tspan(
-               phrase,
-               (x - len(phrase) * hor_char_offset, y + (i + 1) * ver_line_offset),
-               id = str(id_attr or "") or None
-            )
-         )
-      return first
+      lines  = [ (phrases[0], x - len(phrases[0]) * hor_char_offset, y) ]
+      lines += [
+         (phrase, x - len(phrase) * hor_char_offset, y + (i + 1) * ver_line_offset)
+         for i, phrase in enumerate(phrases[1:])
+      ]
+
+      return lines
 
    @classmethod
    def _get_all_rooms(klass, floor):
@@ -262,8 +353,7 @@ class FloorDrawer():
       )
       return chain(room_items, unidentified_rooms)
 
-   @classmethod
-   def _create_room_group(klass, r_id, polygon):
+   def _create_room_group(self, r_id, polygon):
       """
       Create an svg Group that contains room's elements: a polyline and a text.
 
@@ -277,8 +367,8 @@ class FloorDrawer():
       group       = svgwrite.container.Group(id = r_id)
 
       if polygon:
-         points = klass._simplify_points(polygon)
-         klass._draw_room(group, points, r_id)
+         points = self._simplify_points(polygon)
+         self._draw_room(group, points, r_id)
 
       return group
 
@@ -312,8 +402,7 @@ class FloorDrawer():
       polygon.absolutize()
       return polygon
 
-   @classmethod
-   def _draw_room(klass, group, points, r_id):
+   def _draw_room(self, group, points, r_id):
       """
       Add an svg polyline from a points list to a group.
 
@@ -324,14 +413,14 @@ class FloorDrawer():
       Returns: None.
       """
       if r_id:
-         poly  = klass.svg.polyline(
-            (klass._approximate_coordinates(p[0], p[1]) for p in points),
+         poly  = self.svg.polyline(
+            (self._approximate_coordinates(p[0], p[1]) for p in points),
             id = r_id,
             fill="rgb(255, 255, 255)"
          )
       else:
-         poly  = klass.svg.polyline(
-            (klass._approximate_coordinates(p[0], p[1]) for p in points),
+         poly  = self.svg.polyline(
+            (self._approximate_coordinates(p[0], p[1]) for p in points),
             fill="rgb(255, 255, 255)"
          )
       group.add(poly)
@@ -341,10 +430,12 @@ class FloorDrawer():
       """
       Applies Ramer–Douglas–Peucker algorithm to simplify a room polygon.
       """
-      pts         = [ tuple(p) for p in polygon.points ]
-      simplified  = rdp.rdp(pts, tol)
+      simplify = lambda: rdp.rdp(polygon.coords.tolist(), tol)
+
+      if FloorDrawer.cache:
+         return FloorDrawer.cache.outline(polygon.coords, tol, simplify)
 
-      return simplified
+      return simplify()
 
    @classmethod
    def _approximate_coordinates(klass, x, y):
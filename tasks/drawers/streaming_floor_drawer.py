@@ -0,0 +1,224 @@
+from .floor_drawer   import FloorDrawer
+from utils.logger    import Logger
+
+import io
+
+class StreamingFloorDrawer(FloorDrawer):
+   """
+   Lean variant of FloorDrawer writing the svg markup directly to a file
+   object, one element at a time, instead of building an svgwrite element
+   tree: no element objects nor validation are involved.
+
+   The output is the same, byte by byte, as the one of FloorDrawer saved with
+   saveas: same group structure (#windows, #rooms/<category>/<r_id>, #walls,
+   #identified_rooms_labels), ids, attributes and viewBox, so that the css
+   compiled from assets/svg.less and the clients work with both.
+
+   Usage:
+   with open(filename, "w", encoding = "utf-8") as fp:
+      StreamingFloorDrawer.write_floor(floor, fp)
+   """
+
+   svg_open_tag = (
+      '<svg baseProfile="full" height="100%" version="1.1" viewBox="{}" '
+      'width="100%" xmlns="http://www.w3.org/2000/svg" '
+      'xmlns:ev="http://www.w3.org/2001/xml-events" '
+      'xmlns:xlink="http://www.w3.org/1999/xlink">'
+   )
+
+   line_tag    = '<line x1="{}" x2="{}" y1="{}" y2="{}" />'
+
+   room_fill   = "rgb(255, 255, 255)"
+
+   def __init__(self):
+      self.max_x  = 0
+      self.max_y  = 0
+
+   @classmethod
+   def write_floor(klass, floor, fp):
+      """
+      Writes the map (in svg format) representing a floor.
+
+      Arguments:
+      - floor: a dictionary representing a merged floor;
+      - fp: a text file object, opened with utf-8 encoding.
+
+      Returns: None
+      """
+      klass()._write(floor, fp)
+
+      if FloorDrawer.cache:
+         FloorDrawer.cache.flush()
+
+   @classmethod
+   def floor_to_string(klass, floor):
+      """Returns the svg content of a floor map, see write_floor"""
+      fp = io.StringIO()
+      klass.write_floor(floor, fp)
+      return fp.getvalue()
+
+   def _write(self, floor, fp):
+      self.fp     = fp
+      windows     = floor.get("windows", [])
+      walls       = floor.get("walls", [])
+
+      # Room polygons are built once, and their bounds (like the lines ones)
+      # are needed for the viewBox before writing any element
+      rooms       = [
+         (category_name, [
+            (r_id, self._create_polygon(room.get("polygon")))
+            for r_id, room in cat_rooms
+         ])
+         for category_name, cat_rooms in self.get_grouped_rooms(floor)
+      ]
+      self._compute_bounds(windows, walls, rooms)
+
+      fp.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+      fp.write(self.svg_open_tag.format(",".join(str(v) for v in (0, 0, self.max_x, self.max_y))))
+      fp.write('<defs />')
+      self._write_style()
+
+      self._write_lines_group(windows, "windows")
+      self._write_rooms_group(rooms)
+      self._write_lines_group(walls, "walls")
+      self._write_rooms_labels_group(floor)
+
+      fp.write('</svg>')
+
+      if not floor.get("rooms") and not floor.get("unidentified_rooms"):
+         Logger.warning("Impossible generate csv: no room polylines founded")
+
+   def _compute_bounds(self, windows, walls, rooms):
+      """
+      Computes max_x and max_y as FloorDrawer does while drawing, in the
+      same order, so that the viewBox is the same.
+      """
+      for start, end in windows:
+         self.max_x = max(self.max_x, start["x"], end["x"])
+
+      for start, end in walls:
+         self.max_x = max(self.max_x, start["x"], end["x"])
+
+      for category_name, cat_rooms in rooms:
+         for r_id, polygon in cat_rooms:
+            self.max_x = max(self.max_x, polygon.max_x())
+            self.max_y = max(self.max_y, polygon.max_y())
+
+   def _write_style(self):
+      self.fp.write('<style type="text/css"><![CDATA[')
+      self.fp.write(self.compiled_style())
+      self.fp.write(']]></style>')
+
+   def _write_lines_group(self, lines, group_id):
+      if not lines:
+         self._empty_tag("g", id = group_id)
+         return
+
+      self._start_tag("g", id = group_id)
+
+      # Rounded coordinates are never empty nor need escaping
+      for start, end in lines:
+         x1, y1 = self._approximate_coordinates(start["x"], start["y"])
+         x2, y2 = self._approximate_coordinates(end["x"], end["y"])
+         self.fp.write(self.line_tag.format(x1, x2, y1, y2))
+
+      self.fp.write('</g>')
+
+   def _write_rooms_group(self, rooms):
+      if not rooms:
+         self._empty_tag("g", id = "rooms")
+         return
+
+      self._start_tag("g", id = "rooms")
+
+      for category_name, cat_rooms in rooms:
+         self._start_tag("g", id = self._prepare_cat_name(category_name))
+
+         for r_id, polygon in cat_rooms:
+            self._start_tag("g", id = r_id)
+            self._write_room(polygon, r_id)
+            self.fp.write('</g>')
+
+         self.fp.write('</g>')
+
+      self.fp.write('</g>')
+
+   def _write_room(self, polygon, r_id):
+      points = " ".join(
+         "%s,%s" % self._approximate_coordinates(p[0], p[1])
+         for p in self._simplify_points(polygon)
+      )
+
+      self._empty_tag("polyline", fill = self.room_fill, id = r_id, points = points)
+
+   def _write_rooms_labels_group(self, floor):
+      labels = [
+         (r_id, room) for r_id, room in floor["rooms"].items() if "polygon" in room
+      ]
+
+      if not labels:
+         self._empty_tag("g", id = "identified_rooms_labels")
+         return
+
+      self._start_tag("g", id = "identified_rooms_labels")
+
+      for r_id, room in labels:
+         center   = self._create_polygon(room["polygon"]).center_point
+         id_attr  = "r_label_" + str(r_id)
+         lines    = self._text_lines(room.get("room_name", ""), center.x, center.y)
+
+         phrase, x, y = lines[0]
+         if not phrase and len(lines) == 1:
+            self._empty_tag("text", id = id_attr, x = x, y = y)
+            continue
+
+         self._start_tag("text", id = id_attr, x = x, y = y)
+         self.fp.write(self._escape_text(phrase))
+
+         for phrase, x, y in lines[1:]:
+            self._text_tag("tspan", phrase, id = id_attr, x = x, y = y)
+
+         self.fp.write('</text>')
+
+      self.fp.write('</g>')
+
+   ###############
+   # XML WRITING #
+   ###############
+
+   # Attributes are written in alphabetical order, skipping the empty ones,
+   # and escaped as xml.etree.ElementTree does in the svgwrite output
+
+   def _attributes(self, attributes):
+      return "".join(
+         ' {}="{}"'.format(name, self._escape_attribute(str(value)))
+         for name, value in sorted(attributes.items())
+         if value is not None and str(value)
+      )
+
+   def _start_tag(self, name, **attributes):
+      self.fp.write("<" + name + self._attributes(attributes) + ">")
+
+   def _empty_tag(self, name, **attributes):
+      self.fp.write("<" + name + self._attributes(attributes) + " />")
+
+   def _text_tag(self, name, text, **attributes):
+      if not text:
+         return self._empty_tag(name, **attributes)
+
+      self._start_tag(name, **attributes)
+      self.fp.write(self._escape_text(text) + "</" + name + ">")
+
+   @classmethod
+   def _escape_text(klass, text):
+      return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+   @classmethod
+   def _escape_attribute(klass, text):
+      return (
+         klass._escape_text(text)
+            .replace("\"", "&quot;")
+            .replace("\r", "&#13;")
+            .replace("\n", "&#10;")
+            .replace("\t", "&#09;")
+      )
@@ -0,0 +1,70 @@
+from utils.logger import Logger
+import os, json, tempfile
+
+class SVGManifest():
+   """
+   Record of the drawn svg files, mapping each file (relative to the svg
+   folder) to the hash of the floor it was drawn from (see
+   FloorDrawer.floor_hash), so that maps of unchanged floors are not drawn
+   again.
+
+   Usage:
+   manifest = SVGManifest("data/svg/preprocessed/manifest.json")
+   if not manifest.is_current(filename, digest):
+      <draw filename>
+      manifest.update(filename, digest)
+   manifest.save()
+   """
+
+   def __init__(self, path):
+      """
+      Arguments:
+      - path: the manifest json file, loaded if existing.
+      """
+      self.path      = path
+      self._entries  = {}
+      self._changed  = False
+
+      try:
+         with open(path) as fp:
+            self._entries = json.load(fp)
+      except FileNotFoundError:
+         pass
+      except (OSError, ValueError) as e:
+         Logger.warning("Ignoring unreadable svg manifest:", str(e))
+
+   def _key(self, filename):
+      return os.path.relpath(filename, os.path.dirname(self.path))
+
+   def is_current(self, filename, digest):
+      """
+      Says if filename exists and was drawn from a floor with hash digest.
+      """
+      return self._entries.get(self._key(filename)) == digest and os.path.exists(filename)
+
+   def update(self, filename, digest):
+      """Records that filename was drawn from a floor with hash digest"""
+      self._entries[self._key(filename)] = digest
+      self._changed = True
+
+   def save(self):
+      """Writes the manifest, if changed since it was loaded or saved"""
+      if not self._changed:
+         return
+
+      folder = os.path.dirname(self.path)
+      os.makedirs(folder or ".", exist_ok = True)
+
+      # Written on a temporary file and then renamed, as DxfCache entries
+      fd, tmp_path = tempfile.mkstemp(dir = folder or ".", suffix = ".tmp")
+      try:
+         with os.fdopen(fd, "w") as fp:
+            json.dump(self._entries, fp, indent = 1, sort_keys = True)
+         os.replace(tmp_path, self.path)
+      except OSError as e:
+         Logger.warning("Unable to write svg manifest:", str(e))
+         if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+         return
+
+      self._changed = False
@@ -1 +1,3 @@
-from .dxf_reader import DxfReader
+from .dxf_cache         import DxfCache
+from .dxf_entity_stream import DxfEntityStream
+from .dxf_reader        import DxfReader
@@ -0,0 +1,126 @@
+from utils.logger import Logger
+import os, json, time, hashlib, tempfile
+
+class DxfCache():
+   """
+   On-disk cache of the entities extracted from dxf files, so that unchanged
+   files do not need to be parsed again.
+
+   Entries are json files named after the SHA-256 of the dxf file content and
+   a version string, which must change whenever the extraction rules change
+   (see DxfReader.cache_version). The cache folder is kept below max_size
+   bytes by evicting the least recently used entries.
+
+   Usage:
+   cache = DxfCache("data/dxf/preprocessed/cache", DxfReader.cache_version())
+   key   = cache.key_for("1234_0.dxf")
+   cache.load(key) # returns the stored dictionary or None
+   """
+
+   default_max_size  = 256 * 1024 * 1024
+
+   # Age, in seconds, after which temporary files are considered abandoned
+   stale_tmp_age     = 3600
+
+   def __init__(self, folder, version, max_size = None):
+      """
+      Arguments:
+      - folder: the folder where cache entries are stored, created if needed;
+      - version: a string identifying the format of the stored entries;
+      - max_size: maximum size in bytes of the cache folder.
+      """
+      self.folder    = folder
+      self.version   = version
+      self.max_size  = max_size or self.default_max_size
+
+      os.makedirs(self.folder, exist_ok = True)
+
+   def key_for(self, filename):
+      """Returns the cache key of a file, computed from its content"""
+      sha = hashlib.sha256()
+
+      with open(filename, "rb") as fp:
+         for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            sha.update(chunk)
+
+      return sha.hexdigest() + "_" + self.version
+
+   def _entry_path(self, key):
+      return os.path.join(self.folder, key + ".json")
+
+   def load(self, key):
+      """
+      Returns the dictionary stored under key, or None if there is no valid
+      entry for it. Hits mark the entry as recently used.
+      """
+      path = self._entry_path(key)
+
+      try:
+         with open(path) as fp:
+            data = json.load(fp)
+      except (OSError, ValueError):
+         return None
+
+      # The entry may have just been evicted by another process
+      try:
+         os.utime(path)
+      except OSError:
+         pass
+
+      return data
+
+   def store(self, key, data):
+      """
+      Stores the json-serializable dictionary data under key, then evicts the
+      least recently used entries if the cache is bigger than max_size.
+      """
+      # Written on a temporary file and then renamed, so that concurrent
+      # readers never see a partial entry
+      fd, tmp_path = tempfile.mkstemp(dir = self.folder, suffix = ".tmp")
+      try:
+         with os.fdopen(fd, "w") as fp:
+            json.dump(data, fp)
+         os.replace(tmp_path, self._entry_path(key))
+      except OSError as e:
+         Logger.warning("Unable to write dxf cache entry:", str(e))
+         if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+         return
+
+      self.evict()
+
+   def evict(self):
+      """
+      Removes the least recently used entries exceeding max_size, and the
+      temporary files left by interrupted writes.
+      """
+      entries  = []
+      now      = time.time()
+
+      for name in os.listdir(self.folder):
+         path = os.path.join(self.folder, name)
+
+         try:
+            stat = os.stat(path)
+
+            # Older temporary files are not being written by any process
+            if name.endswith(".tmp") and now - stat.st_mtime > self.stale_tmp_age:
+               os.remove(path)
+         except OSError:
+            continue
+
+         if name.endswith(".json"):
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+      total = sum(size for _, size, _ in entries)
+
+      for _, size, name in sorted(entries):
+         if total <= self.max_size:
+            break
+
+         try:
+            os.remove(os.path.join(self.folder, name))
+         except OSError:
+            pass
+
+         total -= size
@@ -0,0 +1,128 @@
+from dxfgrabber.tags       import TagIterator, ClassifiedTags, dxfinfo
+from dxfgrabber.entities   import entity_factory
+import io
+
+class DxfEntityStream():
+   """
+   Reads the ENTITIES section of a dxf file in a single streaming pass,
+   yielding only the entities with the requested types and layers.
+
+   Unlike dxfgrabber.readfile, the header, tables, blocks and the entities
+   that are not requested are never kept in memory, and reading stops at the
+   end of the ENTITIES section. Yielded entities are the same dxfgrabber
+   entity objects that would be found in a drawing's entities, except that
+   text styles are not resolved (the STYLE table is never read).
+
+   Usage:
+   stream = DxfEntityStream("1234_0.dxf", [ "LINE" ], lambda layer: layer == "MURI")
+   for entity in stream:
+      print(entity.start, entity.end)
+   """
+
+   def __init__(self, filename, dxftypes, layer_filter, encoding = None, errors = "strict"):
+      """
+      Arguments:
+      - filename: path of the dxf file;
+      - dxftypes: the entity types to be yielded (e.g. "LINE", "MTEXT");
+      - layer_filter: a function receiving a layer name, returning True if
+      the entities of that layer must be yielded;
+      - encoding, errors: the encoding of the file and how decoding errors are
+      handled. By default the encoding declared in the dxf header is used.
+
+      Raises IOError and its subclasses if the file can not be read.
+      """
+      self.filename     = filename
+      self.dxftypes     = set(dxftypes)
+      self.layer_filter = layer_filter
+      self.errors       = errors
+
+      # Same strategy used by dxfgrabber.readfile
+      with io.open(filename) as fp:
+         info = dxfinfo(fp)
+
+      self.dxfversion   = info.version
+      self.encoding     = encoding or info.encoding
+
+   def as_utf8(self):
+      """
+      Returns a stream over the same file, decoded as utf-8 ignoring errors:
+      the fallback used by dxfgrabber when the declared encoding is wrong.
+      """
+      return DxfEntityStream(self.filename, self.dxftypes, self.layer_filter, "utf-8", "ignore")
+
+   def __iter__(self):
+      with io.open(self.filename, encoding = self.encoding, errors = self.errors) as fp:
+         collected = None
+
+         for group in self._entity_groups(TagIterator(fp)):
+            dxftype = group[0].value
+
+            # Polylines and inserts with attributes are followed by their
+            # vertices/attributes, up to a SEQEND entity
+            if collected is not None:
+               if dxftype == "SEQEND":
+                  if collected[0] is not None:
+                     yield self._build_polyline(*collected)
+                  collected = None
+               elif collected[0] is not None and dxftype == "VERTEX":
+                  collected[1].append(group)
+               continue
+
+            if dxftype == "POLYLINE":
+               collected = (self._is_requested(group) and group or None, [])
+            elif dxftype == "INSERT" and self._attribs_follow(group):
+               collected = (None, [])
+            elif self._is_requested(group):
+               yield self._build(group)
+
+   def _is_requested(self, group):
+      if group[0].value not in self.dxftypes:
+         return False
+
+      layer = next((t.value for t in group if t.code == 8), "0")
+      return self.layer_filter(layer)
+
+   def _attribs_follow(self, group):
+      return any(t.code == 66 and t.value == 1 for t in group)
+
+   def _build(self, group):
+      return entity_factory(ClassifiedTags(group), self.dxfversion)
+
+   def _build_polyline(self, group, vertices):
+      polyline = self._build(group)
+      polyline.append_data([ self._build(v) for v in vertices ])
+
+      if hasattr(polyline, "cast"):
+         polyline = polyline.cast()
+
+      return polyline
+
+   def _entity_groups(self, tags):
+      """
+      Yields the tags of each entity of the ENTITIES section, as lists starting
+      with the (0, type) tag.
+      """
+      in_section  = False
+      group       = None
+      previous    = None
+
+      for tag in tags:
+         if not in_section:
+            in_section  = (
+               previous is not None and
+               previous == (0, "SECTION") and
+               tag == (2, "ENTITIES")
+            )
+            previous    = tag
+            continue
+
+         if tag.code == 0:
+            if group:
+               yield group
+
+            if tag.value == "ENDSEC":
+               return
+
+            group = [ tag ]
+         elif group is not None:
+            group.append(tag)
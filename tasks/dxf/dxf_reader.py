@@ -4,7 +4,8 @@ from dxfgrabber.entities   import LWPolyline, Polyline, MText
 from tasks.floor_inference import FloorInference
 from utils.logger          import Logger
 from tasks.task            import FileUpdateException
-import os, re, dxfgrabber
+from .dxf_entity_stream    import DxfEntityStream
+import os, re, json, hashlib, dxfgrabber
 
 class DxfReader():
    """
@@ -15,14 +16,22 @@ class DxfReader():
    valid_poly_layers = ["RM$"]
    valid_text_layers = ["NLOCALI", "RM$TXT"]
    valid_wall_layers = ["MURI", "GROS$"]
+   valid_window_layers = ["FINESTRE"]
+   valid_entity_types = ["LWPOLYLINE", "POLYLINE", "LINE", "TEXT", "MTEXT"]
 
-   def __init__(self, filename):
+   # To be incremented whenever the extraction rules change, in order to
+   # invalidate the entries of DxfCache
+   cache_format = 1
+
+   def __init__(self, filename, cache = None):
       """
       Try reading a dxf file pointed by filename and save the floor in the
       respective attribute.
 
       Arguments:
-      - filename: string rapresents the filename with path of the dxf file.
+      - filename: string rapresents the filename with path of the dxf file;
+      - cache: an optional DxfCache, used to skip the dxf parsing of files
+      already read.
 
       Raise:
       - FileUpdateException in case of impossibility to identify building, floor
@@ -38,18 +47,16 @@ class DxfReader():
       self._basename = os.path.basename(filename)
       self.floor     = None
 
-      self._read_dxf(self._filename)
-      self._extract_entities()
-
+      self._read_entities(cache)
 
       b_id = self._get_b_id(self._basename)
 
       if not b_id:
          raise FileUpdateException("It was not possible to identify the building associated to the DXF file")
 
-      f_id = FloorInference.get_identifier(
+      f_id = FloorInference.identifier_from_ids(
                      self._basename,
-                     self._grabber
+                     self._cartiglio_ids
                   )
 
       if not f_id:
@@ -60,15 +67,88 @@ class DxfReader():
          raise FileUpdateException("The floor read has no rooms: " + self._filename)
       self.floor.associate_room_texts(self._texts)
       self.floor.normalize()
+
+      before, after = self.floor.consolidate_lines()
+      Logger.info(
+         "Wall and window lines merged: {} -> {} (x{:.1f})".format(before, after, before / max(after, 1))
+      )
+
       self.floor.discard_tiny_lines()
 
+   @classmethod
+   def cache_version(klass):
+      """
+      Returns a string identifying the extraction rules (layer configuration
+      and cache format), used to version DxfCache entries.
+      """
+      config = json.dumps([
+            klass.cache_format,
+            klass.valid_poly_layers,
+            klass.valid_text_layers,
+            klass.valid_wall_layers,
+            klass.valid_window_layers
+         ])
+
+      return hashlib.sha256(config.encode("utf-8")).hexdigest()[:12]
+
+   def _read_entities(self, cache):
+      """
+      Reads rooms, texts, lines and the floor ids of the "cartiglio", from the
+      cache if the file was already read, otherwise parsing the dxf file.
+      """
+      key = cache and cache.key_for(self._filename)
+
+      if key:
+         entry = cache.load(key)
+         if entry:
+            Logger.info("Using cached DXF entities")
+            self._entities_from_serializable(entry)
+            return
+
+      self._read_dxf(self._filename)
+      self._extract_entities()
+
+      if key:
+         cache.store(key, self._entities_to_serializable())
+
+   def _entities_to_serializable(self):
+      return {
+         "rooms"           : [ r.polygon.to_serializable() for r in self._rooms ],
+         "texts"           : [ t.to_serializable() for t in self._texts ],
+         "walls"           : [ l.to_serializable() for l in self._wall_lines ],
+         "windows"         : [ l.to_serializable() for l in self._window_lines ],
+         "cartiglio_ids"   : sorted(self._cartiglio_ids)
+      }
+
+   def _entities_from_serializable(self, data):
+      self._rooms          = [ Room(Polygon.from_serializable(p)) for p in data["rooms"] ]
+      self._texts          = [ Text.from_serializable(t) for t in data["texts"] ]
+      self._wall_lines     = [ Segment.from_serializable(l) for l in data["walls"] ]
+      self._window_lines   = [ Segment.from_serializable(l) for l in data["windows"] ]
+      self._cartiglio_ids  = set(data["cartiglio_ids"])
+
    def _extract_entities(self):
+      """
+      Extracts rooms, texts, lines and the floor ids of the "cartiglio" in a
+      single pass over the entities stream.
+      """
+      try:
+         self._extract_entities_from(self._entities)
+      except UnicodeDecodeError:
+         # Same fallback used by dxfgrabber.readfile
+         self._extract_entities_from(self._entities.as_utf8())
+
+   def _extract_entities_from(self, entities):
       self._rooms          = []
       self._texts          = []
       self._wall_lines     = []
       self._window_lines   = []
+      cartiglio_texts      = []
+
+      for ent in entities:
+         if FloorInference.is_cartiglio_text(ent):
+            cartiglio_texts.append(FloorInference.cartiglio_text(ent))
 
-      for ent in self._grabber.entities:
          if self._is_valid_room(ent):
             points = [(p[0], -p[1]) for p in ent.points]
 
@@ -111,6 +191,7 @@ class DxfReader():
             line  = Segment(start, end)
             self._window_lines.append( line )
 
+      self._cartiglio_ids = FloorInference.ids_from_cartiglio_texts(cartiglio_texts)
 
    def _is_valid_room(self, ent):
       """
@@ -161,7 +242,7 @@ class DxfReader():
       return ent.layer.upper() in self.valid_wall_layers and type(ent) in [LWPolyline, Polyline]
 
    def _is_valid_window_line(self, ent):
-      return ent.layer.upper() == "FINESTRE" and type(ent) is dxfgrabber.entities.Line
+      return ent.layer.upper() in self.valid_window_layers and type(ent) is dxfgrabber.entities.Line
 
    def _get_b_id(self, basename):
       """
@@ -185,9 +266,22 @@ class DxfReader():
 
       return b_id
 
+   def _is_relevant_layer(self, layer):
+      """
+      Returns True if the entities of layer are used by the reader, either for
+      extracting the floor or for inferring the floor id.
+      """
+      return (
+         layer in self.valid_poly_layers or
+         layer in self.valid_text_layers or
+         layer.upper() in self.valid_wall_layers or
+         layer.upper() in self.valid_window_layers or
+         FloorInference.is_cartiglio_layer(layer)
+      )
+
    def _read_dxf(self, filename):
       """
-         Read the dxf file with the dxf grabber.
+         Open the dxf file as a stream of the relevant entities.
 
          Arguments:
          - filename: representing the path and the name  of the dxf file.
@@ -197,11 +291,12 @@ class DxfReader():
          Raise: PermissionError, IsADirectoryError, FileNotFoundError or generic
          Exception in case of reading failure.
 
-         Try to read the dxf file with the grabber.
+         Only the entities with the types and layers used by the reader are
+         read, in a single pass (see DxfEntityStream).
       """
 
       try:
-         self._grabber = dxfgrabber.readfile(filename)
+         self._entities = DxfEntityStream(filename, self.valid_entity_types, self._is_relevant_layer)
       except PermissionError:
          Logger.error("Permission error: cannot read file " + filename)
          raise
@@ -1,7 +1,9 @@
-from .dxf            import DxfReader
+from .dxf            import DxfReader, DxfCache
 from .data_updaters  import DXFDataUpdater
 from .               import Task, FileUpdateException
-import os, re
+from model           import Floor
+from utils.logger    import Logger, LoggingContext
+import os, re, functools, multiprocessing
 
 class DXFTask(Task):
    """
@@ -9,13 +11,23 @@ class DXFTask(Task):
    config manager from which to retrive the dxf backup folder.
    """
 
-   def __init__(self, config):
+   def __init__(self, config, use_cache = True):
       """
       Arguments:
       config: a dictionary-like object containing the source dxf backup path
-      (view code)
+      and the dxf cache folder and size (view code)
+      use_cache: if False, dxf files are always parsed again
       """
       self._backup_folder  = config["folders"]["data_dxf_sources"]
+      self._cache          = None
+
+      if use_cache:
+         cache_config   = config.get("dxf_cache", {})
+         self._cache    = DxfCache(
+               os.path.join(config["folders"]["data_dxf_preprocessed_output"], "cache"),
+               DxfReader.cache_version(),
+               cache_config.get("max_size_mb", 256) * 1024 * 1024
+            )
 
    def perform_update(self, dxf_file):
       """
@@ -29,6 +41,65 @@ class DXFTask(Task):
 
       Called by parents perform_update_on_files method.
       """
+      self.floor = self.read_floor(dxf_file, self._cache)
+      self.save_floor(self.floor)
+
+   def perform_updates_on_files(self, files, jobs = 1):
+      """
+      Given a list of files, dispatch the update and file backup procedures.
+
+      Arguments:
+      - files: a list of dxf files to be processed;
+      - jobs: number of worker processes used to read the dxf files.
+
+      Returns None.
+
+      With more than one job, dxf files are read and turned into Floor objects
+      by a pool of worker processes, which send back serialized floors. Floors
+      are then saved one at a time by the current process, the only one
+      talking to the database: saves of floors of the same building are hence
+      never interleaved, and every floor is merged on top of the previously
+      saved ones. The log of each file is printed as a single block.
+      """
+      if jobs <= 1 or len(files) <= 1:
+         return super().perform_updates_on_files(files)
+
+      total = len(files)
+      with multiprocessing.Pool(min(jobs, total)) as pool:
+         job     = functools.partial(_read_floor_job, cache = self._cache)
+         results = pool.imap_unordered(job, files)
+
+         for i, (filename, data, error, log) in enumerate(results):
+            msg = "{}/{} - Processing file {}".format(i, total, filename)
+            with Logger.info(msg):
+               Logger.context.write(*log)
+               try:
+                  if error:
+                     raise FileUpdateException(error)
+
+                  self.floor = Floor.from_serializable(data)
+                  self.save_floor(self.floor)
+                  self.perform_file_backup(filename)
+               except FileUpdateException as e:
+                  Logger.error(e.msg)
+               else:
+                  Logger.success("File processing complete.")
+
+   @classmethod
+   def read_floor(klass, dxf_file, cache = None):
+      """
+      Reads a dxf file and returns the Floor it represents.
+
+      Arguments:
+      - dxf_file: full path to dxf file to read;
+      - cache: an optional DxfCache used by the DxfReader.
+
+      Returns: a Floor object, with a sanitized b_id.
+      Throws FileUpdateException in case of unsolvable errors.
+
+      Does not access the database, hence it is safe to call it from worker
+      processes.
+      """
       # Valido che il file su cui lavoriamo sia effettivamente un DXF
       rm = re.match(".+\.dxf", os.path.basename(dxf_file), re.I)
       if rm is None:
@@ -36,22 +107,33 @@ class DXFTask(Task):
 
       # Leggo il file DXF su cui stiamo lavorando
       try:
-         self.dx = DxfReader(dxf_file)
+         dx = DxfReader(dxf_file, cache)
       except FileUpdateException:
          raise
       except Exception as e:
          raise FileUpdateException("There was an unknown error reading the DXF file: "+ str(e))
 
-      floor = self.dx.floor;
+      floor = dx.floor;
       if not floor:
          raise FileUpdateException("No floor found")
 
       # Troviamo un building_id valido (sequenzad di digiti)
-      floor.b_id = self.sanitize_b_id(floor.b_id)
+      floor.b_id = klass.sanitize_b_id(floor.b_id)
 
       if not floor.b_id:
          raise FileUpdateException("It was not possible to identify the building id.")
 
+      return floor
+
+   def save_floor(self, floor):
+      """
+      Saves a floor read by read_floor on the database.
+
+      Arguments:
+      - floor: the Floor object to be saved.
+
+      Returns: None
+      """
       updater = DXFDataUpdater()
 
       # Trova un building su cui lavorare, cercando per diverse strategie:
@@ -62,9 +144,6 @@ class DXFTask(Task):
       # Pulisce i dati ed esegue il vero salvataggio sul DB
       updater.save_floor(building, floor)
 
-      backup_filename      = self.get_backup_filepath(dxf_file)
-      self.backup_filepath = os.path.join(backup_filename)
-
    def get_backup_filepath(self, filename):
       """
       Given a source filename, returns a full path for saving a backup file.
@@ -77,14 +156,15 @@ class DXFTask(Task):
 
       Called by parent class (method perform_file_backup).
       """
-      backup_file_folder  = os.path.join(self._backup_folder, self.dx.floor.b_id)
+      backup_file_folder  = os.path.join(self._backup_folder, self.floor.b_id)
 
       if not os.path.exists( backup_file_folder ):
          os.mkdir(backup_file_folder)
 
-      return os.path.join(backup_file_folder ,self.dx.floor.b_id+'_'+self.dx.floor.f_id+'.dxf')
+      return os.path.join(backup_file_folder ,self.floor.b_id+'_'+self.floor.f_id+'.dxf')
 
-   def sanitize_b_id(self, b_id):
+   @classmethod
+   def sanitize_b_id(klass, b_id):
       """
       Sanitizes and validate the string identifying a building.
 
@@ -96,3 +176,24 @@ class DXFTask(Task):
       rm = re.match("(\d{4,})", b_id)
       return rm and rm.group(0)
 
+
+def _read_floor_job(dxf_file, cache = None):
+   """
+   Worker process entry point of DXFTask.perform_updates_on_files: reads a dxf
+   file, collecting the log messages instead of printing them.
+
+   Returns a tuple (dxf_file, serialized floor, error message, log), where log
+   is a (verbosity, text) tuple to be written on the parent logging context.
+   """
+   context        = LoggingContext(1, Logger.VERBOSITY_ALL + 1)
+   Logger.context = context
+   data, error    = None, None
+
+   try:
+      data = DXFTask.read_floor(dxf_file, cache).to_serializable()
+   except FileUpdateException as e:
+      error = e.msg
+   except Exception as e:
+      error = "There was an unknown error reading the DXF file: "+ str(e)
+
+   return (dxf_file, data, error, (context.verbosity, context.buffer.getvalue()))
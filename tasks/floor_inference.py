@@ -27,8 +27,24 @@ class FloorInference:
       layers. Returns the best id and in case of conflicts prints messages with
       the logger.
       """
+      return self.identifier_from_ids(filename, self.from_cartiglio(grabber))
+
+   @classmethod
+   def identifier_from_ids(self, filename, possible_ids):
+      """
+      Chooses the best floor id between the one inferred from the filename and
+      the ones already read from the "cartiglio" layers.
+
+      Arguments:
+      - filename: name of the dxf floor file;
+      - possible_ids: the set of ids returned by from_cartiglio.
+
+      Returns:
+      - a string representing the best id fouded for the floor;
+      - False in case of conflict.
+      """
       filename_id    = self.from_filename(filename)
-      possible_ids   = self.from_cartiglio(grabber)
+      possible_ids   = set(possible_ids)
 
       if(len(possible_ids) > 1):
          with Logger.warning(
@@ -98,7 +114,20 @@ class FloorInference:
       trying to find significative texts. Adds the possible floor id to a set
       and return it, if possible texts not founded return an empty set.
       """
-      texts          = self._extract_texts_from_cartiglio(grabber)
+      return self.ids_from_cartiglio_texts(self._extract_texts_from_cartiglio(grabber))
+
+   @classmethod
+   def ids_from_cartiglio_texts(self, texts):
+      """
+      Match texts read from the layer CARTIGLIO and return a set of possible
+      ids.
+
+      Arguments:
+      - texts: a list of Text objects, see cartiglio_text.
+
+      Returns:
+      - a set of possible ids.
+      """
       possible_ids   = set()
 
       for t in texts:
@@ -178,19 +207,35 @@ class FloorInference:
 
       Auxiliary method for inference from cartiglio
       """
-      def get_text(p):
-         return self.sanitize_layer_name(
-                  ( hasattr(p, "text") and p.text or p.plain_text()) or
-                  ( hasattr(p, "rawtext") and p.rawtext ) or ""
-               )
-
       return [
-               Text( get_text(p), Point(p.insert) )
+               self.cartiglio_text(p)
                for p in grabber.entities
-               if re.match("CARTIGLIO", p.layer, re.I) and
-                  (p.dxftype == "MTEXT" or p.dxftype == "TEXT")
+               if self.is_cartiglio_text(p)
             ]
 
+   @classmethod
+   def is_cartiglio_layer(self, layer):
+      """Returns True if layer is one of the layers containing the cartiglio"""
+      return bool(re.match("CARTIGLIO", layer, re.I))
+
+   @classmethod
+   def is_cartiglio_text(self, entity):
+      """Returns True if the dxfgrabber entity is a text of the cartiglio"""
+      return (
+         self.is_cartiglio_layer(entity.layer) and
+         (entity.dxftype == "MTEXT" or entity.dxftype == "TEXT")
+      )
+
+   @classmethod
+   def cartiglio_text(self, entity):
+      """Builds a Text object from a dxfgrabber text entity of the cartiglio"""
+      text = self.sanitize_layer_name(
+               ( hasattr(entity, "text") and entity.text or entity.plain_text()) or
+               ( hasattr(entity, "rawtext") and entity.rawtext ) or ""
+            )
+
+      return Text( text, Point(entity.insert) )
+
    @classmethod
    def sanitize_layer_name(self, name):
       """
@@ -38,7 +38,8 @@ class LookupTableTask:
       self._delete_old_db()
 
       Logger.success("Retrieving building view collection from persistence")
-      buildings      = list(BuildingView.get_collection().find({'building_name':{'$exists':True}}))
+      fields         = [ "building_name", "floors.f_id", "floors.floor_name", "floors.rooms" ]
+      buildings      = list(BuildingView.where({'building_name':{'$exists':True}}, fields, raw = True))
 
       Logger.success("Creating new db")
       db_connection = sqlite3.connect( self.db_path() )
@@ -306,9 +306,15 @@ class DataMerger():
       """
       result                        = {}
       result["f_id"]                = floor["f_id"]
-      result["walls"]               = floor.get("walls", [])
-      result["windows"]             = floor.get("windows", [])
       result["rooms"]               = {}
+
+      # Walls and windows are referenced through geometry_id (see
+      # FloorGeometry), floors saved before the split still embed them
+      if "geometry_id" in floor:
+         result["geometry_id"]      = floor["geometry_id"]
+      else:
+         result["walls"]            = floor.get("walls", [])
+         result["windows"]          = floor.get("windows", [])
       result["unidentified_rooms"]  = []
 
       # 1 - copia lista di stanze, creando copie e lasciando soltanto le
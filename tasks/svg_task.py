@@ -1,28 +1,58 @@
-from .drawers     import FloorDrawer
-from model        import Building
-from utils.logger import Logger
-import os
+from .drawers     import FloorDrawer, StreamingFloorDrawer, SVGManifest, DrawingCache
+from model        import Building, FloorGeometry
+from utils.logger import Logger, LoggingContext
+from collections  import deque
+import os, multiprocessing
 
 class SVGTask():
-   def __init__(self, config):
+   def __init__(self, config, force = False):
       """
       Builds a SVGTask object.
 
       Arguments:
       - config: a config manager reference, from which retrieve the path of
-      preprocessed svg folder
+      preprocessed svg folder, and the path and size of the drawing cache
+      (view code);
+      - force: if True, maps are drawn even if their floor is unchanged since
+      the last run (see SVGManifest), without using the drawing cache.
       """
       self._svg_folder  = config["folders"]["data_svg_preprocessed_output"]
-
-   def perform_svg_update(self, b_ids = None):
+      cache_folder      = config["folders"].get("data_svg_base_data")
+
+      # Compiled css and simplified outlines, reused across runs and workers
+      if cache_folder and not force:
+         FloorDrawer.cache = DrawingCache(
+               os.path.join(cache_folder, "cache", "drawing_cache.sqlite"),
+               config.get("drawing_cache", {}).get("max_entries")
+            )
+      else:
+         FloorDrawer.cache = None
+
+      self._manifest    = SVGManifest(os.path.join(self._svg_folder, "manifest.json"))
+      self._force       = force
+      self.redrawn      = 0
+      self.skipped      = 0
+
+      # Drawings submitted to the worker pool and not yet written
+      self._pool        = None
+      self._pending     = deque()
+      self._max_pending = 0
+
+   def perform_svg_update(self, b_ids = None, jobs = 1):
       """
       Call the perform_maps_update on every building or on a list of buildings
       specified with a list of b_ids.
 
       Arguments:
-      - b_ids: a list of string representing b_ids.
+      - b_ids: a list of string representing b_ids;
+      - jobs: number of worker processes drawing the floor maps.
 
       Returns: None.
+
+      With more than one job floors are drawn by a pool of worker processes,
+      which send back the svg content, while the database queries and all the
+      file and manifest writes are performed by the current process. At most
+      2 * jobs drawings are pending at any time, bounding the memory used.
       """
 
       query = { "$and" : [
@@ -33,10 +63,34 @@ class SVGTask():
       if  b_ids:
          query["_id"] = { "$in": b_ids }
 
-      buildings   = Building.where(query)
+      # Only the merged floors are drawn, the other keys are used for logging.
+      # Buildings are only read, and so not tracked for changes
+      fields      = [ "merged", "edilizia.l_b_id", "easyroom.building_name" ]
+      buildings   = ( Building(b) for b in Building.where(query, fields, raw = True) )
+
+      if jobs > 1:
+         self._pool        = multiprocessing.Pool(jobs)
+         self._max_pending = 2 * jobs
+
+      try:
+         for building in buildings:
+            self.perform_maps_update(building)
+
+         self._write_drawings(0)
+      finally:
+         if self._pool:
+            self._pool.terminate()
+            self._pool = None
+
+         self._pending.clear()
+         self._manifest.save()
 
-      for building in buildings:
-         self.perform_maps_update(building)
+         if FloorDrawer.cache:
+            FloorDrawer.cache.prune()
+
+      Logger.success(
+         "Floor maps redrawn:", self.redrawn, "- unchanged, skipped:", self.skipped
+      )
 
    def perform_maps_update(self, building):
       """
@@ -49,13 +103,47 @@ class SVGTask():
 
       Returns: None.
       """
+      floors = FloorGeometry.with_geometry(building["merged"]["floors"])
+
       with Logger.info("Generating floor maps for", str(building)):
-         for floor in building["merged"]["floors"]:
+         for floor in floors:
+            filename = self.prepare_path_and_filename(building["_id"], floor["f_id"])
+            digest   = FloorDrawer.floor_hash(floor)
+
+            if not self._force and self._manifest.is_current(filename, digest):
+               self.skipped += 1
+               continue
+
+            if self._pool:
+               result = self._pool.apply_async(_draw_floor_job, (floor, ))
+               self._pending.append((filename, digest, result))
+               self._write_drawings(self._max_pending)
+               continue
+
             Logger.info("Generating map for floor: ", floor["f_id"])
-            svg      = FloorDrawer.draw_floor(floor)
+            with open(filename, "w", encoding = "utf-8") as fp:
+               StreamingFloorDrawer.write_floor(floor, fp)
 
-            filename = self.prepare_path_and_filename(building["_id"], floor["f_id"])
-            svg.saveas(filename)
+            self._manifest.update(filename, digest)
+            self.redrawn += 1
+
+   def _write_drawings(self, max_pending):
+      """Saves the oldest pending drawings, until at most max_pending are left"""
+      while len(self._pending) > max_pending:
+         self._write_drawing(*self._pending.popleft())
+
+   def _write_drawing(self, filename, digest, result):
+      """Waits for a drawing of the worker pool and saves it"""
+      content, log = result.get()
+
+      with Logger.info("Generating map", filename):
+         Logger.context.write(*log)
+
+         with open(filename, "w", encoding = "utf-8") as fp:
+            fp.write(content)
+
+      self._manifest.update(filename, digest)
+      self.redrawn += 1
 
    def prepare_path_and_filename(self, b_id, f_id):
       """
@@ -72,3 +160,18 @@ class SVGTask():
       if not os.path.exists(path):
          os.makedirs(path)
       return os.path.join(self._svg_folder, b_id, b_id + "_" + f_id + ".svg")
+
+
+def _draw_floor_job(floor):
+   """
+   Worker process entry point of SVGTask.perform_svg_update: draws a floor,
+   collecting the log messages instead of printing them.
+
+   Returns a tuple (svg content, log), where log is a (verbosity, text) tuple
+   to be written on the parent logging context.
+   """
+   context        = LoggingContext(1, Logger.VERBOSITY_ALL + 1)
+   Logger.context = context
+   content        = StreamingFloorDrawer.floor_to_string(floor)
+
+   return (content, (context.verbosity, context.buffer.getvalue()))
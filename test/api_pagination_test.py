@@ -0,0 +1,150 @@
+import unittest, copy
+from persistence.db  import MongoDBPersistenceManager
+from model.odm       import ODMModel
+from mock            import MagicMock, patch
+
+# The collections are set up at import time, with no database here
+with patch("model.BuildingView.setup_collection"), patch("model.RoomView.setup_collection"):
+   from api import app
+
+class ApiPaginationTest(unittest.TestCase):
+
+   def setUp(self):
+      self.old_pm    = getattr(ODMModel, "_pm", None)
+      self.coll      = MagicMock()
+      self.versions  = MagicMock()
+      self.versions.find_one.return_value = None
+      ODMModel.set_pm(MongoDBPersistenceManager(db = {
+         "buildingview" : self.coll,
+         "dataversion"  : self.versions
+      }))
+
+      app.app.response_cache._entries.clear()
+      self.client = app.app.test_client()
+
+      # (b_id, distance from the requested position)
+      self.near   = [ ("1004", 30), ("1001", 10), ("1003", 20), ("1002", 10), ("1005", 40) ]
+      self.coll.aggregate.side_effect = self.aggregate
+
+   def tearDown(self):
+      ODMModel.set_pm(self.old_pm)
+
+   def building(self, b_id):
+      return {
+         "_id"             : b_id,
+         "building_name"   : "Edificio " + b_id,
+         "coordinates"     : { "type" : "Point", "coordinates" : [ 9.2, 45.4 ] }
+      }
+
+   def buildings(self, *b_ids):
+      return [ self.building(b_id) for b_id in b_ids ]
+
+   def aggregate(self, pipeline):
+      """
+      Runs on self.near the subset of the aggregation pipeline stages used by
+      the near endpoint.
+      """
+      docs = []
+
+      for stage in pipeline:
+         name, args = list(stage.items())[0]
+
+         if name == "$geoNear":
+            docs = [
+               dict(self.building(b_id), distance = distance)
+               for b_id, distance in self.near
+               if distance >= args.get("minDistance", 0) and
+                  ("_id" not in args["query"] or args["query"]["_id"] == b_id)
+            ]
+         elif name == "$match":
+            docs = [
+               d for d in docs
+               if any(
+                  all(self.matches(d[field], condition) for field, condition in alternative.items())
+                  for alternative in args["$or"]
+               )
+            ]
+         elif name == "$sort":
+            self.assertEqual(list(args.items()), [ ("distance", 1), ("_id", 1) ])
+            docs.sort(key = lambda d: (d["distance"], d["_id"]))
+         elif name == "$limit":
+            docs = docs[:args]
+         elif name == "$project":
+            docs = [ { k : v for k, v in d.items() if k not in args } for d in docs ]
+
+      return iter(copy.deepcopy(docs))
+
+   def matches(self, value, condition):
+      if isinstance(condition, dict):
+         return value > condition["$gt"]
+      return value == condition
+
+   def page(self, url):
+      response = self.client.get(url)
+      self.assertEqual(response.status_code, 200)
+      return [ b["b_id"] for b in response.json["buildings"] ], response.json.get("next")
+
+   def test_first_page(self):
+      cursor = self.coll.find.return_value.sort.return_value.limit.return_value
+      cursor.__iter__.return_value = self.buildings("1001", "1002", "1003")
+
+      self.assertEqual(self.page("/api/v1.0/buildings/?limit=2"), ([ "1001", "1002" ], "1002"))
+
+      self.coll.find.assert_called_once_with({ "building_name" : { "$exists" : True } }, { "floors" : 0 })
+      self.coll.find.return_value.sort.assert_called_once_with("_id")
+      self.coll.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+
+   def test_after_cursor_and_last_page(self):
+      cursor = self.coll.find.return_value.sort.return_value.limit.return_value
+      cursor.__iter__.return_value = self.buildings("1003", "1004")
+
+      self.assertEqual(self.page("/api/v1.0/buildings/?limit=2&after=1002"), ([ "1003", "1004" ], None))
+
+      query = { "building_name" : { "$exists" : True }, "_id" : { "$gt" : "1002" } }
+      self.coll.find.assert_called_once_with(query, { "floors" : 0 })
+
+   def test_streamed_page(self):
+      cursor = self.coll.find.return_value.sort.return_value.limit.return_value
+      cursor.__iter__.return_value = self.buildings("1001", "1002", "1003")
+
+      response = self.client.get("/api/v1.0/buildings/?limit=2&stream=1")
+      self.assertTrue(response.is_streamed)
+      self.assertEqual([ b["b_id"] for b in response.json["buildings"] ], [ "1001", "1002" ])
+      self.assertEqual(response.json["next"], "1002")
+
+      cursor.__iter__.return_value = self.buildings("1003")
+      response = self.client.get("/api/v1.0/buildings/?limit=2&after=1002&stream=1")
+      self.assertEqual(response.json, { "buildings" : [ {
+         "b_id"            : "1003",
+         "building_name"   : "Edificio 1003",
+         "coordinates"     : [ 9.2, 45.4 ]
+      } ] })
+
+   def test_invalid_limit(self):
+      for limit in [ "abc", "0", "-1", "1.5", str(app.app.max_page_size + 1) ]:
+         response = self.client.get("/api/v1.0/buildings/?limit=" + limit)
+         self.assertEqual(response.status_code, 400)
+
+         response = self.client.get("/api/v1.0/buildings/near/45.4/9.2/?limit=" + limit)
+         self.assertEqual(response.status_code, 400)
+
+      self.assertFalse(self.coll.find.called)
+      self.assertFalse(self.coll.aggregate.called)
+
+   def test_near_pages(self):
+      url = "/api/v1.0/buildings/near/45.4/9.2/?limit=2"
+
+      # Ties on the distance are ordered by _id, also across pages
+      self.assertEqual(self.page(url), ([ "1001", "1002" ], "1002"))
+      self.assertEqual(self.page(url + "&after=1002"), ([ "1003", "1004" ], "1004"))
+      self.assertEqual(self.page(url + "&after=1004"), ([ "1005" ], None))
+      self.assertEqual(self.page(url + "&after=1001"), ([ "1002", "1003" ], "1003"))
+
+      pipeline = self.coll.aggregate.call_args[0][0]
+      self.assertEqual(pipeline[0]["$geoNear"]["minDistance"], 10)
+      self.assertEqual(pipeline[0]["$geoNear"]["near"]["coordinates"], [ 9.2, 45.4 ])
+      self.assertEqual(pipeline[-2], { "$limit" : 3 })
+
+   def test_near_unknown_after(self):
+      response = self.client.get("/api/v1.0/buildings/near/45.4/9.2/?limit=2&after=9999")
+      self.assertEqual(response.status_code, 400)
@@ -0,0 +1,89 @@
+import unittest
+from api.response_cache import ResponseCache
+from flask              import Flask, Response, jsonify, abort
+from mock               import MagicMock
+
+class ResponseCacheTest(unittest.TestCase):
+
+   def setUp(self):
+      self.version   = 1
+      self.calls     = MagicMock()
+      self.cache     = ResponseCache(lambda: self.version, max_entries = 2)
+      app            = Flask(__name__)
+
+      @app.route("/items/<int:n>/")
+      @self.cache.cached
+      def items(n):
+         self.calls(n)
+         if n == 0:
+            abort(404)
+         return jsonify({ "n" : n, "version" : self.version })
+
+      @app.route("/stream/")
+      @self.cache.cached
+      def stream():
+         self.calls("stream")
+         return Response(( c for c in [ "[", "1", "]" ] ), mimetype = "application/json")
+
+      self.client = app.test_client()
+
+   def test_cached_until_version_changes(self):
+      first = self.client.get("/items/1/")
+      self.assertEqual(first.status_code, 200)
+      self.assertTrue(first.headers["ETag"].startswith('"v1-'))
+
+      second = self.client.get("/items/1/")
+      self.assertEqual(second.get_data(), first.get_data())
+      self.assertEqual(self.calls.call_count, 1)
+
+      # Query arguments are part of the key
+      self.client.get("/items/1/?a=1")
+      self.assertEqual(self.calls.call_count, 2)
+
+      self.version = 2
+      third = self.client.get("/items/1/")
+      self.assertEqual(third.json["version"], 2)
+      self.assertTrue(third.headers["ETag"].startswith('"v2-'))
+      self.assertEqual(self.calls.call_count, 3)
+
+   def test_not_modified(self):
+      etag     = self.client.get("/items/1/").headers["ETag"]
+      response = self.client.get("/items/1/", headers = { "If-None-Match" : etag })
+      self.assertEqual(response.status_code, 304)
+      self.assertEqual(response.headers["ETag"], etag)
+      self.assertEqual(self.calls.call_count, 1)
+
+      response = self.client.get("/items/1/", headers = { "If-None-Match" : '"v0"' })
+      self.assertEqual(response.status_code, 200)
+
+      # ETags are per request
+      other = self.client.get("/items/2/", headers = { "If-None-Match" : etag })
+      self.assertEqual(other.status_code, 200)
+      self.assertNotEqual(other.headers["ETag"], etag)
+
+      # Errors are never reported as not modified
+      response = self.client.get("/items/0/", headers = { "If-None-Match" : "*" })
+      self.assertEqual(response.status_code, 404)
+
+      # Nor responses not cached (anymore), e.g. after a version change
+      self.version = 2
+      self.assertEqual(self.client.get("/items/1/", headers = { "If-None-Match" : etag }).status_code, 200)
+
+   def test_errors_and_size(self):
+      self.assertEqual(self.client.get("/items/0/").status_code, 404)
+      self.assertEqual(self.client.get("/items/0/").status_code, 404)
+      self.assertEqual(self.calls.call_count, 2)
+
+      for n in [ 1, 2, 3, 1 ]:
+         self.client.get("/items/{}/".format(n))
+
+      # The oldest entry (1) was discarded
+      self.assertEqual(self.calls.call_count, 6)
+
+   def test_streamed_not_cached(self):
+      for _ in range(2):
+         response = self.client.get("/stream/")
+         self.assertEqual(response.json, [ 1 ])
+         self.assertTrue(response.headers["ETag"].startswith('"v1-'))
+
+      self.assertEqual(self.calls.call_count, 2)
@@ -5,7 +5,7 @@ from datetime  import datetime
 
 class BuildingModelTest(unittest.TestCase):
    def setUp(self):
-      self.old_pm = Building._pm
+      self.old_pm = getattr(Building, "_pm", None)
       self.pm = MagicMock()
       Building.set_pm(self.pm)
 
@@ -55,7 +55,7 @@ class BuildingModelTest(unittest.TestCase):
          ]
       }
       options  = {"multi" : True}
-      self.assertEqual(self.pm.remove.call_count, 2)
+      self.assertEqual(self.pm.remove.call_count, 3)
 
       valid_ids = Building._pm.get_collection_ids(building_collection)
       query_bv = {
@@ -68,5 +68,13 @@ class BuildingModelTest(unittest.TestCase):
       call2 = call("buildingview", query_bv, options)
       self.pm.remove.assert_has_calls([call1, call2], any_order = True)
 
+      # RoomView.remove_deleted_buildings listener
+      query_rv = {
+         "b_id" : {
+            "$nin" : list(valid_ids)
+         }
+      }
+      self.pm.remove.assert_any_call("roomview", query_rv, options)
+
    def tearDown(self):
       Building.set_pm(self.old_pm)
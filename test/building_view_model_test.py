@@ -207,3 +207,13 @@ class BuildingViewModelTest(unittest.TestCase):
       self.assertIn("Studio", available_services_2)
       self.assertIn("Ufficio", available_services_2)
 
+
+   def test_building_available_services(self):
+      b_view   = BuildingView.create_from_building(self.building)
+      services = set()
+
+      for floor in b_view["floors"]:
+         services.update(floor["available_services"])
+
+      self.assertEqual(b_view["available_services"], sorted(services))
+      self.assertIn("Studio", b_view["available_services"])
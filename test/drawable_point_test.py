@@ -10,6 +10,13 @@ class PointTest(unittest.TestCase):
       self.assertTrue( 10 == Point( (10, 20, 30) ).x )
       self.assertTrue( 20 == Point( (10, 20, 30) ).y )
 
+   def test_point_has_no_instance_dict(self):
+      p = Point(1, 2)
+      self.assertFalse(hasattr(p, "__dict__"))
+
+      with self.assertRaises(AttributeError):
+         p.z = 3
+
    def test_point_equality(self):
       p1 = Point(1.0, 1.0)
       self.assertEqual(p1, (1.00, 1.00))
@@ -1,7 +1,8 @@
-from model.drawable import Point, Polygon
+from model.drawable import Point, Polygon, Segment
 from mock           import MagicMock
 from itertools      import chain
 import unittest
+import numpy as np
 
 class PolygonTest(unittest.TestCase):
 
@@ -34,6 +35,17 @@ class PolygonTest(unittest.TestCase):
 
       self.assertEqual(p3.points, [ (0, 0), (0, 0.9), (0, 1.41) ])
 
+      # A run of close points wrapping around the end of a closed polygon
+      p4 = Polygon.from_relative_coordinates( Point(0,0),
+         [ (0, 0.2), (10, 0), (10, 10), (0, 10), (0, 0.3), (0, 0) ]
+      ).simplify_close_points()
+
+      self.assertEqual(p4.points, [ (10, 0), (10, 10), (0, 10), (0, 0.3), (10, 0) ])
+
+      # Nothing to simplify: the polygon is left untouched
+      square = Polygon.from_absolute_coordinates([ (0, 0), (10, 0), (10, 10), (0, 10) ])
+      self.assertEqual(square.simplify_close_points().points, [ (0, 0), (10, 0), (10, 10), (0, 10) ])
+
    def test_is_self_crossing(self):
       l_shaped = Polygon.from_absolute_coordinates(
          [ (0, 0), (10, 0), (10, 10), (5, 10), (5, 5), (0,5), (0,0) ] )
@@ -44,6 +56,22 @@ class PolygonTest(unittest.TestCase):
       self.assertTrue(crossing.is_self_crossing())
       print(crossing.is_self_crossing())
 
+   def test_is_self_crossing_result(self):
+      # Bow tie: the two diagonals cross in (5, 5)
+      bow_tie = Polygon.from_absolute_coordinates(
+         [ (0, 0), (10, 10), (10, 0), (0, 10) ] )
+
+      point, s1, s2 = bow_tie.is_self_crossing()
+      self.assertEqual(point, Point(5, 5))
+      self.assertEqual(s1, Segment(Point(0, 0), Point(10, 10)))
+      self.assertEqual(s2, Segment(Point(10, 0), Point(0, 10)))
+
+      # Far away segments are not crossing
+      comb = Polygon.from_absolute_coordinates(
+         [ (x, y) for i in range(50) for x, y in ((i * 10, 0), (i * 10 + 5, 100)) ] +
+         [ (495, -10), (0, -10) ] )
+      self.assertFalse(comb.is_self_crossing())
+
    def test_point_to_right_of_line(self):
       self.assertTrue(Polygon._compare_line_and_point( Point(10, 0), Point(0, 10), Point(9.9, 9.9)) > 0 )
       self.assertTrue(Polygon._compare_line_and_point( Point(0, 0), Point(1, 9), Point(1, 2)) > 0 )
@@ -189,3 +217,40 @@ class PolygonTest(unittest.TestCase):
       )
 
       self.assertEqual(list(result), list(self.polygon1.__entities__()))
+
+   def test_coords_storage(self):
+      self.assertEqual(self.polygon1.coords.shape, (4, 2))
+      self.assertEqual(self.polygon1.coords.dtype, np.float64)
+      self.assertTrue(type(self.polygon2.anchor_point.x) is float)
+      self.assertEqual(self.polygon1.coords.tolist(),
+         [ [0, 0], [10, 0], [10, 10], [0, 10] ]
+      )
+
+      # Points are views over the coordinates array
+      p = self.polygon1.points[2]
+      self.assertTrue(p is self.polygon1.points[2])
+      p.traslate(5, 5)
+      self.assertEqual(self.polygon1.coords[2].tolist(), [15, 15])
+
+      self.polygon1.traslate(1, 1)
+      self.assertEqual(p, Point(16, 16))
+
+   def test_points_assignment(self):
+      p = Polygon()
+      p.points = [ Point(1, 2), (3, 4.123456) ]
+      self.assertEqual(p.coords.tolist(), [ [1, 2], [3, 4.1235] ])
+      self.assertEqual(len(p.points), 2)
+      self.assertEqual(p.points[-1], Point(3, 4.1235))
+      self.assertEqual(p.points[0:1], [ Point(1, 2) ])
+
+      p.points.append(Point(5, 6))
+      self.assertEqual(p.points, [ (1, 2), (3, 4.1235), (5, 6) ])
+
+   def test_absolutize(self):
+      p = self.polygon1.absolutized()
+      self.assertEqual(p.anchor_point, Point(0, 0))
+      self.assertEqual(p.points,
+         [ Point(100, 200), Point(110, 200), Point(110, 210), Point(100, 210) ]
+      )
+      self.assertEqual(p.bounding_box, (Point(100, 200), Point(110, 210)))
+      self.assertEqual(p.center_point, Point(105, 205))
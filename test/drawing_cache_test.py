@@ -0,0 +1,86 @@
+import unittest, tempfile, shutil, os, copy, itertools
+from tasks.drawers import FloorDrawer, StreamingFloorDrawer, DrawingCache
+from mock          import MagicMock, patch
+
+class DrawingCacheTest(unittest.TestCase):
+
+   def setUp(self):
+      self.folder = tempfile.mkdtemp()
+      self.path   = os.path.join(self.folder, "cache", "drawing_cache.sqlite")
+      self.cache  = DrawingCache(self.path)
+
+   def tearDown(self):
+      FloorDrawer.cache = None
+      shutil.rmtree(self.folder)
+
+   def test_get_and_flush(self):
+      compute = MagicMock(return_value = [ [ 1.5, 2 ] ])
+
+      self.assertEqual(self.cache.get("a", compute), [ [ 1.5, 2 ] ])
+      self.assertEqual(self.cache.get("a", compute), [ [ 1.5, 2 ] ])
+      self.assertEqual(compute.call_count, 1)
+
+      # Entries are persisted by flush
+      self.cache.flush()
+      self.assertEqual(DrawingCache(self.path).get("a", compute), [ [ 1.5, 2 ] ])
+      self.assertEqual(compute.call_count, 1)
+
+   def test_css(self):
+      stylesheet = os.path.join(self.folder, "style.less")
+      compile    = MagicMock(side_effect = lambda f: open(f).read().upper())
+
+      with open(stylesheet, "w") as fp:
+         fp.write("a {}")
+
+      self.assertEqual(self.cache.css(stylesheet, compile), "A {}")
+      self.assertEqual(self.cache.css(stylesheet, compile), "A {}")
+
+      with open(stylesheet, "w") as fp:
+         fp.write("b {}")
+
+      self.assertEqual(self.cache.css(stylesheet, compile), "B {}")
+      self.assertEqual(compile.call_count, 2)
+
+      # A new compiler version compiles the stylesheet again
+      self.assertEqual(self.cache.css(stylesheet, compile, "2.0"), "B {}")
+      self.assertEqual(compile.call_count, 3)
+
+   @patch("time.time", side_effect = itertools.count())
+   def test_prune(self, time):
+      cache    = DrawingCache(self.path, max_entries = 2)
+      compute  = MagicMock(return_value = 1)
+
+      for key in [ "a", "b", "c" ]:
+         cache.get(key, compute)
+         cache.flush()
+
+      # "a" is used again, "b" becomes the least recently used entry
+      cache.get("a", compute)
+      cache.flush()
+      self.assertEqual(compute.call_count, 3)
+
+      self.assertEqual(cache.prune(), 1)
+      self.assertEqual(cache.prune(), 0)
+
+      cache = DrawingCache(self.path, max_entries = 2)
+      for key in [ "a", "c", "b" ]:
+         cache.get(key, compute)
+      self.assertEqual(compute.call_count, 4)
+
+   def test_same_drawing(self):
+      polygon  = { "anchor_point" : { "x" : 0, "y" : 0 }, "points" : [
+         { "x" : 0, "y" : 0 }, { "x" : 50, "y" : 0.5 }, { "x" : 100, "y" : 0 },
+         { "x" : 100, "y" : 50 }, { "x" : 0, "y" : 50 }
+      ] }
+      floor    = {
+         "rooms"              : { "R001" : { "room_name" : "Aula 1", "cat_id" : "AUL01", "polygon" : polygon } },
+         "unidentified_rooms" : [ { "cat_id" : "WC01", "polygon" : polygon } ]
+      }
+      expected = StreamingFloorDrawer.floor_to_string(copy.deepcopy(floor))
+
+      # Cold and warm cache
+      FloorDrawer.cache = self.cache
+      for _ in range(2):
+         self.assertEqual(StreamingFloorDrawer.floor_to_string(copy.deepcopy(floor)), expected)
+
+      self.assertTrue(os.path.exists(self.path))
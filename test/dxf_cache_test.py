@@ -0,0 +1,69 @@
+import unittest, tempfile, shutil, os
+from tasks.dxf import DxfCache
+from mock      import patch
+
+class DxfCacheTest(unittest.TestCase):
+
+   def setUp(self):
+      self.folder = tempfile.mkdtemp()
+      self.cache  = DxfCache(os.path.join(self.folder, "cache"), "v1", max_size = 1000)
+
+      self.source = os.path.join(self.folder, "1234_0.dxf")
+      with open(self.source, "w") as fp:
+         fp.write("content")
+
+   def tearDown(self):
+      shutil.rmtree(self.folder)
+
+   def test_key_depends_on_content_and_version(self):
+      key = self.cache.key_for(self.source)
+      self.assertEqual(key, self.cache.key_for(self.source))
+      self.assertNotEqual(key, DxfCache(self.cache.folder, "v2").key_for(self.source))
+
+      with open(self.source, "w") as fp:
+         fp.write("changed")
+
+      self.assertNotEqual(key, self.cache.key_for(self.source))
+
+   def test_store_and_load(self):
+      key = self.cache.key_for(self.source)
+      self.assertIsNone(self.cache.load(key))
+
+      self.cache.store(key, { "rooms": [], "cartiglio_ids": [ "1" ] })
+      self.assertEqual(self.cache.load(key), { "rooms": [], "cartiglio_ids": [ "1" ] })
+
+   def test_least_recently_used_entries_are_evicted(self):
+      data = { "text": "x" * 300 }
+
+      for i, key in enumerate([ "a", "b", "c" ]):
+         self.cache.store(key, data)
+         os.utime(os.path.join(self.cache.folder, key + ".json"), (i, i))
+
+      # Loading "a" marks it as recently used, hence "b" is evicted
+      self.cache.load("a")
+      self.cache.store("d", data)
+
+      self.assertIsNotNone(self.cache.load("a"))
+      self.assertIsNone(self.cache.load("b"))
+      self.assertIsNotNone(self.cache.load("c"))
+      self.assertIsNotNone(self.cache.load("d"))
+
+   def test_load_when_evicted_after_reading(self):
+      self.cache.store("a", { "rooms": [] })
+
+      with patch("os.utime", side_effect = FileNotFoundError):
+         self.assertEqual(self.cache.load("a"), { "rooms": [] })
+
+   def test_stale_temporary_files_are_removed(self):
+      stale = os.path.join(self.cache.folder, "stale.tmp")
+      fresh = os.path.join(self.cache.folder, "fresh.tmp")
+
+      for path in [ stale, fresh ]:
+         with open(path, "w") as fp:
+            fp.write("partial")
+
+      os.utime(stale, (0, 0))
+      self.cache.evict()
+
+      self.assertFalse(os.path.exists(stale))
+      self.assertTrue(os.path.exists(fresh))
@@ -0,0 +1,65 @@
+import unittest, tempfile, shutil, os
+from tasks.dxf             import DxfEntityStream
+from dxfgrabber.entities   import Polyline, Line, Text
+
+class DxfEntityStreamTest(unittest.TestCase):
+
+   def setUp(self):
+      self.folder    = tempfile.mkdtemp()
+      self.filename  = os.path.join(self.folder, "1234_0.dxf")
+
+      tags = [
+         "0", "SECTION", "2", "HEADER", "9", "$ACADVER", "1", "AC1009", "0", "ENDSEC",
+         "0", "SECTION", "2", "BLOCKS",
+         "0", "BLOCK", "8", "0", "2", "B1", "70", "0", "10", "0", "20", "0",
+         "0", "LINE", "8", "MURI", "10", "0", "20", "0", "11", "1", "21", "1",
+         "0", "ENDBLK", "8", "0",
+         "0", "ENDSEC",
+         "0", "SECTION", "2", "ENTITIES",
+         "0", "POLYLINE", "8", "RM$", "66", "1", "70", "1",
+         "0", "VERTEX", "8", "RM$", "10", "0", "20", "0",
+         "0", "VERTEX", "8", "RM$", "10", "10", "20", "0",
+         "0", "VERTEX", "8", "RM$", "10", "10", "20", "10",
+         "0", "SEQEND", "8", "RM$",
+         "0", "POLYLINE", "8", "OTHER", "66", "1", "70", "1",
+         "0", "VERTEX", "8", "OTHER", "10", "0", "20", "0",
+         "0", "SEQEND", "8", "OTHER",
+         "0", "INSERT", "8", "NLOCALI", "66", "1", "2", "B1", "10", "0", "20", "0",
+         "0", "ATTRIB", "8", "NLOCALI", "10", "0", "20", "0", "40", "1", "1", "A01", "2", "T", "70", "0",
+         "0", "SEQEND", "8", "NLOCALI",
+         "0", "TEXT", "8", "NLOCALI", "10", "5", "20", "5", "40", "1", "1", "R001",
+         "0", "LINE", "8", "MURI", "10", "0", "20", "0", "11", "5", "21", "0",
+         "0", "LINE", "8", "OTHER", "10", "0", "20", "0", "11", "5", "21", "0",
+         "0", "CIRCLE", "8", "MURI", "10", "0", "20", "0", "40", "3",
+         "0", "ENDSEC",
+         "0", "EOF"
+      ]
+
+      with open(self.filename, "w") as fp:
+         fp.write("\n".join(tags) + "\n")
+
+   def tearDown(self):
+      shutil.rmtree(self.folder)
+
+   def test_only_requested_entities_are_yielded(self):
+      stream   = DxfEntityStream(
+            self.filename,
+            [ "POLYLINE", "LINE", "TEXT" ],
+            lambda layer: layer in [ "RM$", "NLOCALI", "MURI" ]
+         )
+      entities = list(stream)
+
+      self.assertEqual([ type(e) for e in entities ], [ Polyline, Text, Line ])
+      self.assertEqual(
+            [ p[0:2] for p in entities[0].points ],
+            [ (0, 0), (10, 0), (10, 10) ]
+         )
+      self.assertEqual(entities[1].text, "R001")
+      self.assertEqual(entities[2].end[0:2], (5, 0))
+
+      # Streams can be iterated again
+      self.assertEqual(len(list(stream)), 3)
+
+   def test_missing_file(self):
+      with self.assertRaises(FileNotFoundError):
+         DxfEntityStream(os.path.join(self.folder, "missing.dxf"), [ "LINE" ], lambda l: True)
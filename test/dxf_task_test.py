@@ -0,0 +1,90 @@
+import unittest, tempfile, shutil, os
+from tasks import DXFTask, FileUpdateException
+from mock  import MagicMock, patch
+
+def write_dxf(filename, rooms, texts = []):
+   """Writes a minimal R12 dxf file with the supplied room polylines and texts"""
+   out = [
+      "0", "SECTION", "2", "HEADER", "9", "$ACADVER", "1", "AC1009", "0", "ENDSEC",
+      "0", "SECTION", "2", "ENTITIES"
+   ]
+
+   for points in rooms:
+      out += [ "0", "POLYLINE", "8", "RM$", "66", "1", "70", "1" ]
+      for x, y in points:
+         out += [ "0", "VERTEX", "8", "RM$", "10", str(x), "20", str(y), "30", "0" ]
+      out += [ "0", "SEQEND", "8", "RM$" ]
+
+   for text, (x, y) in texts:
+      out += [ "0", "TEXT", "8", "NLOCALI", "10", str(x), "20", str(y), "30", "0", "40", "1", "1", text ]
+
+   out += [ "0", "ENDSEC", "0", "EOF" ]
+
+   with open(filename, "w") as fp:
+      fp.write("\n".join(out) + "\n")
+
+class DXFTaskTest(unittest.TestCase):
+
+   def setUp(self):
+      self.folder = tempfile.mkdtemp()
+      self.task   = DXFTask({
+            "folders": {
+               "data_dxf_sources"               : self.folder,
+               "data_dxf_preprocessed_output"   : self.folder
+            }
+         })
+
+      self.files  = []
+      for b_id, f_id in [ ("1234", "0"), ("1234", "1"), ("5678", "0") ]:
+         filename = os.path.join(self.folder, b_id + "_" + f_id + ".dxf")
+         write_dxf(
+               filename,
+               [ [ (0, 0), (10, 0), (10, 10), (0, 10) ], [ (10, 0), (20, 0), (20, 10), (10, 10) ] ],
+               [ ("R001", (5, 5)), ("R002", (15, 5)) ]
+            )
+         self.files.append(filename)
+
+   def tearDown(self):
+      shutil.rmtree(self.folder)
+
+   def test_read_floor(self):
+      floor = DXFTask.read_floor(self.files[2])
+
+      self.assertEqual(floor.b_id, "5678")
+      self.assertEqual(floor.f_id, "0")
+      self.assertEqual(floor.n_rooms, 2)
+      self.assertEqual(floor.rooms[1].texts[0].text, "R002")
+
+      with self.assertRaises(FileUpdateException):
+         DXFTask.read_floor(os.path.join(self.folder, "1234_0.txt"))
+
+   def test_parallel_updates(self):
+      saved                = []
+      self.task.save_floor = MagicMock(side_effect = lambda f: saved.append(f))
+
+      missing = os.path.join(self.folder, "9999_0.dxf")
+      self.task.perform_updates_on_files(self.files + [ missing ], jobs = 2)
+
+      # Floors read by the workers are equal to the ones read sequentially
+      self.assertEqual(
+            sorted((f.to_serializable() for f in saved), key = str),
+            sorted((DXFTask.read_floor(f).to_serializable() for f in self.files), key = str)
+         )
+
+      # Backups are performed by the writer process
+      self.assertTrue(os.path.exists(os.path.join(self.folder, "5678", "5678_0.dxf")))
+
+   def test_cached_read(self):
+      cache = self.task._cache
+      first = DXFTask.read_floor(self.files[0], cache)
+
+      with patch("tasks.dxf.dxf_reader.DxfEntityStream") as stream:
+         second = DXFTask.read_floor(self.files[0], cache)
+         self.assertFalse(stream.called)
+
+      self.assertEqual(first.to_serializable(), second.to_serializable())
+
+      # Without cache the file is always parsed
+      with patch("tasks.dxf.dxf_reader.DxfEntityStream", side_effect = IOError("parsed")):
+         with self.assertRaises(FileUpdateException):
+            DXFTask.read_floor(self.files[0])
@@ -0,0 +1,54 @@
+import unittest
+from persistence.db  import MongoDBPersistenceManager
+from model.odm       import ODMModel
+from model           import FloorGeometry
+from mock            import MagicMock
+
+class FloorGeometryTest(unittest.TestCase):
+
+   def setUp(self):
+      self.old_pm = getattr(ODMModel, "_pm", None)
+      self.coll   = MagicMock()
+      ODMModel.set_pm(MongoDBPersistenceManager(db = { "floorgeometry" : self.coll }))
+
+      self.walls  = [ { "start" : { "x" : 0, "y" : 0 }, "end" : { "x" : 10, "y" : 0 } } ]
+      self.floor  = { "f_id" : "0", "rooms" : [], "walls" : self.walls, "windows" : [] }
+
+   def tearDown(self):
+      ODMModel.set_pm(self.old_pm)
+
+   def test_extract_from(self):
+      geometry = FloorGeometry.extract_from("1234", self.floor)
+
+      self.assertEqual(self.floor, { "f_id" : "0", "rooms" : [], "geometry_id" : geometry["_id"] })
+      self.assertEqual(geometry["walls"], self.walls)
+      self.assertEqual((geometry["b_id"], geometry["f_id"]), ("1234", "0"))
+      self.assertTrue(geometry["_id"].startswith("1234_0_"))
+
+      # The id only depends on the content
+      same     = FloorGeometry.extract_from("1234", { "f_id" : "0", "walls" : self.walls })
+      other    = FloorGeometry.extract_from("1234", { "f_id" : "0", "windows" : self.walls })
+      self.assertEqual(same["_id"], geometry["_id"])
+      self.assertNotEqual(other["_id"], geometry["_id"])
+
+   def test_with_geometry(self):
+      geometry = FloorGeometry.extract_from("1234", self.floor)
+      legacy   = { "f_id" : "1", "walls" : [] }
+      self.coll.find.return_value = [ geometry.as_dict() ]
+
+      floors   = FloorGeometry.with_geometry([ self.floor, legacy ])
+
+      self.assertEqual(self.coll.find.call_count, 1)
+      self.assertEqual(floors[0]["walls"], self.walls)
+      self.assertEqual(floors[0]["windows"], [])
+      self.assertIs(floors[1], legacy)
+
+      # Original floors are not modified
+      self.assertNotIn("walls", self.floor)
+
+   def test_remove(self):
+      FloorGeometry.remove([ "1234_0_a", "1234_0_b" ])
+      self.coll.delete_many.assert_called_once_with({ "_id" : { "$in" : [ "1234_0_a", "1234_0_b" ] } })
+
+      FloorGeometry.remove([])
+      self.assertEqual(self.coll.delete_many.call_count, 1)
@@ -0,0 +1,56 @@
+from model           import Room, Floor, FloorSpatialIndex
+from model.drawable  import Polygon
+import unittest
+
+class FloorSpatialIndexTest(unittest.TestCase):
+
+   def setUp(self):
+      # A row of three 10x10 rooms, and a big room below them
+      self.rooms = [
+         Room(Polygon.from_absolute_coordinates([(0,0),(10,0),(10,10),(0,10)])),
+         Room(Polygon.from_absolute_coordinates([(10,0),(20,0),(20,10),(10,10)])),
+         Room(Polygon.from_absolute_coordinates([(20,0),(30,0),(30,10),(20,10)])),
+         Room(Polygon.from_absolute_coordinates([(0,10),(30,10),(30,40),(0,40)]))
+      ]
+      self.index = FloorSpatialIndex(self.rooms)
+
+   def test_candidates(self):
+      self.assertEqual(self.index.candidates(5, 5), [0])
+      self.assertEqual(self.index.candidates(10, 5), [0, 1])
+      self.assertEqual(self.index.candidates(15, 25), [3])
+      self.assertEqual(self.index.candidates(50, 50), [])
+
+   def test_room_at(self):
+      self.assertTrue(self.index.room_at(5, 5) is self.rooms[0])
+      self.assertTrue(self.index.room_at(25, 5) is self.rooms[2])
+      self.assertTrue(self.index.room_at(15, 35) is self.rooms[3])
+      self.assertEqual(self.index.room_at(-1, 5), None)
+      self.assertEqual(self.index.room_at(31, 39), None)
+
+      # Shared borders belong to the first room
+      self.assertTrue(self.index.room_at(10, 5) is self.rooms[0])
+      self.assertTrue(self.index.room_at(15, 10) is self.rooms[1])
+
+   def test_locate(self):
+      points = [ (5, 5), (15, 5), (29, 9), (1, 39), (100, 100) ]
+      self.assertEqual(self.index.locate(points).tolist(), [0, 1, 2, 3, -1])
+
+      index = FloorSpatialIndex(self.rooms, cell_size = 3)
+      self.assertEqual(index.locate(points).tolist(), [0, 1, 2, 3, -1])
+
+   def test_empty_index(self):
+      index = FloorSpatialIndex([])
+      self.assertEqual(index.room_at(0, 0), None)
+      self.assertEqual(index.locate([ (1, 1) ]).tolist(), [-1])
+
+   def test_floor_index_is_rebuilt(self):
+      floor = Floor("Building 1", "Floor1", self.rooms[0:1])
+      index = floor.spatial_index()
+      self.assertTrue(floor.spatial_index() is index)
+
+      floor.add_room(self.rooms[1])
+      self.assertTrue(floor.spatial_index() is not index)
+      self.assertTrue(floor.room_at(15, 5) is self.rooms[1])
+
+      floor.transform(traslate_x = 100)
+      self.assertTrue(floor.room_at(115, 5) is self.rooms[1])
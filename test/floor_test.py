@@ -63,6 +63,20 @@ class FloorTest(unittest.TestCase):
       self.assertTrue( t1_1 in self.room1.texts )
       self.assertTrue( t_none not in self.room1.texts )
 
+   def test_associate_text_to_first_containing_room(self):
+      # r2 overlaps room1: texts inside both go to the first room only
+      p2 = Polygon.from_absolute_coordinates([(0,0),(20,0),(20,20),(0,20)])
+      r2 = Room(p2)
+      t1 = Text("Text room 1", Point(2,2))
+      t2 = Text("Text room 2", Point(15,15))
+      t3 = Text("Text room 1 again", Point(1,9))
+
+      floor = Floor("Building 1", "Floor1", [self.room1, r2])
+      floor.associate_room_texts([t1, t2, t3])
+
+      self.assertEqual(self.room1.texts, [t1, t3])
+      self.assertEqual(r2.texts, [t2])
+
    def test_floor_equal(self):
       p2 = Polygon.from_absolute_coordinates([(12,0),(22,0),(22,10),(12,10)])
       r2 = Room(p2)
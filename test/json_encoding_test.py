@@ -1,6 +1,7 @@
-from mock            import MagicMock
-from model           import Floor, Room
-from model.drawable  import Point, Text, Polygon
+from mock                          import MagicMock, patch
+from model                         import Floor, Room
+from model.drawable                import Point, Text, Polygon
+from model.drawable.polygon_points import PointView
 import unittest, json
 
 def serialize_list(ls):
@@ -72,14 +73,15 @@ class JsonEncodingTest(unittest.TestCase):
 
 
    def test_polygon_to_serializable(self):
-      self.polygon1.anchor_point.to_serializable = MagicMock(return_value="anchor_pippo")
-      for p in self.polygon1.points:
-         p.to_serializable = MagicMock(return_value="pippo_point")
-      self.assertEqual( self.polygon1.to_serializable(),
-         {
-            "anchor_point" : "anchor_pippo",
-            "points"       : [ "pippo_point" for p in self.polygon1.points ]
-         })
+      # Points have __slots__, hence their methods are mocked on the classes:
+      # the anchor point is a Point, polygon points are PointView objects
+      with patch.object(Point, "to_serializable", return_value="anchor_pippo"), \
+           patch.object(PointView, "to_serializable", return_value="pippo_point"):
+         self.assertEqual( self.polygon1.to_serializable(),
+            {
+               "anchor_point" : "anchor_pippo",
+               "points"       : [ "pippo_point" for p in self.polygon1.points ]
+            })
 
 
    def test_polygon_from_serializable(self):
@@ -0,0 +1,77 @@
+import unittest
+from model           import LineMerger, Floor
+from model.drawable  import Segment
+from math            import cos, sin
+
+class LineMergerTest(unittest.TestCase):
+
+   def setUp(self):
+      self.merger = LineMerger()
+
+   def merge(self, *coordinates):
+      return self.merger.merge([ Segment.from_coordinates(*c) for c in coordinates ])
+
+   def test_duplicates_and_overlaps(self):
+      result = self.merge(
+            (0, 0, 10, 0),
+            (10, 0, 0, 0),       # same segment, reversed
+            (5, 0, 20, 0),       # overlapping
+            (20.2, 0, 30, 0.1),  # touching, after snapping
+            (0, 0, 0, 10)        # other direction
+         )
+
+      self.assertEqual(len(result), 2)
+      self.assertIn(Segment.from_coordinates(0, 0, 30, 0), result)
+      self.assertIn(Segment.from_coordinates(0, 0, 0, 10), result)
+
+   def test_parallel_and_distant_lines(self):
+      result = self.merge(
+            (0, 0, 10, 0),
+            (0, 5, 10, 5),       # parallel
+            (15, 0, 25, 0),      # collinear, not touching
+            (0, 0, 0, 0.2)       # null after snapping
+         )
+
+      self.assertEqual(len(result), 3)
+
+   def test_diagonal_lines(self):
+      result = self.merge(
+            (0, 0, 10, 10),
+            (10, 10, 20, 20),
+            (20, 20, 15, 15),
+            (-10, 10, -20, 20)
+         )
+
+      self.assertEqual(len(result), 2)
+      self.assertIn(Segment.from_coordinates(0, 0, 20, 20), result)
+
+   def test_almost_parallel_long_lines(self):
+      # Directions within the angle tolerance, but endpoints too far apart
+      result = self.merge((0, 0, 1000, 0), (0, 0, 1000, 8))
+      self.assertEqual(len(result), 2)
+
+   def test_curved_wall(self):
+      # A curved wall, made of segments whose directions change by 0.005
+      # radians from one to the next, from 0 to 0.5 radians
+      radius   = 40000
+      step     = 0.005
+      points   = [
+         (radius * sin(i * step), 50000 - radius * cos(i * step)) for i in range(101)
+      ]
+      curve    = [ a + b for a, b in zip(points, points[1:]) ]
+
+      # A short segment crossing a straight wall, with a direction within the
+      # range of the curve ones
+      wall     = (0, 0, 100, 0)
+      crossing = (50, -0.5, 52.5, 0.5)
+      result   = self.merge(wall, crossing, *curve)
+
+      self.assertIn(Segment.from_coordinates(*wall), result)
+      self.assertIn(Segment.from_coordinates(*crossing), result)
+
+   def test_floor_consolidate_lines(self):
+      walls = [ Segment.from_coordinates(0, 0, 10, 0), Segment.from_coordinates(10, 0, 20, 0) ]
+      floor = Floor("1234", "0", wall_lines = walls, window_lines = walls[:1])
+
+      self.assertEqual(floor.consolidate_lines(), (3, 2))
+      self.assertEqual(floor.walls, [ Segment.from_coordinates(0, 0, 20, 0) ])
@@ -0,0 +1,132 @@
+import unittest
+from persistence.db  import MongoDBPersistenceManager
+from model.odm       import ODMModel
+from pymongo         import ReplaceOne, UpdateOne
+from mock            import MagicMock
+
+class MongoDBPersistenceManagerTest(unittest.TestCase):
+
+   def setUp(self):
+      self.db     = MagicMock()
+      self.pm     = MongoDBPersistenceManager(db = self.db)
+      self.coll   = self.db.__getitem__.return_value
+
+   def test_save(self):
+      self.pm.save("building", { "_id" : "123", "a" : 1 })
+
+      self.coll.replace_one.assert_called_once_with(
+            { "_id" : "123" }, { "_id" : "123", "a" : 1 }, upsert = True
+         )
+      self.assertFalse(self.coll.bulk_write.called)
+
+   def test_delete_many(self):
+      self.coll.delete_many.return_value.deleted_count = 2
+
+      with self.pm.batch():
+         self.pm.save("building", { "_id" : "1" })
+         self.assertEqual(self.pm.delete_many("building", { "_id" : { "$in" : [ "1", "2" ] } }), 2)
+
+         # Queued saves are written before the removal
+         self.assertTrue(self.coll.bulk_write.called)
+
+      self.coll.delete_many.assert_called_once_with({ "_id" : { "$in" : [ "1", "2" ] } })
+
+   def test_batch(self):
+      with self.pm.batch(batch_size = 3):
+         self.pm.save("building", { "_id" : "1" })
+         self.pm.save("building", { "_id" : "2" })
+         self.pm.save("building", { "_id" : "1", "v" : 2 })
+         self.assertFalse(self.coll.bulk_write.called)
+
+         # Queries by _id do not flush, unless they request a pending document
+         self.pm.find_one("building", { "_id" : "3" })
+         self.assertFalse(self.coll.bulk_write.called)
+
+         self.pm.save("building", { "_id" : "3" })
+         self.pm.save("building", { "_id" : "4" })
+
+         # A document saved twice is written once, in its last version
+         self.coll.bulk_write.assert_called_once_with([
+               ReplaceOne({ "_id" : "1" }, { "_id" : "1", "v" : 2 }, upsert = True),
+               ReplaceOne({ "_id" : "2" }, { "_id" : "2" }, upsert = True),
+               ReplaceOne({ "_id" : "3" }, { "_id" : "3" }, upsert = True)
+            ], ordered = False)
+
+         self.pm.find_one("building", { "_id" : "4" })
+         self.assertEqual(self.coll.bulk_write.call_count, 2)
+
+         self.pm.save("building", { "_id" : "5" })
+
+      # Remaining saves are written at the end of the batch
+      self.assertEqual(self.coll.bulk_write.call_count, 3)
+      self.assertFalse(self.coll.replace_one.called)
+
+   def test_update_fields(self):
+      self.pm.update_fields("building", "1", { "a.b" : 1 }, {})
+      self.coll.update_one.assert_called_once_with({ "_id" : "1" }, { "$set" : { "a.b" : 1 } })
+
+      with self.pm.batch():
+         self.pm.update_fields("building", "1", {}, { "c" : "" })
+         self.pm.update_fields("building", "2", { "d" : 2 }, { "c" : "" })
+
+         # Operations on the same document are never sent in the same bulk
+         self.pm.save("building", { "_id" : "1" })
+         self.coll.bulk_write.assert_called_once_with([
+               UpdateOne({ "_id" : "1" }, { "$unset" : { "c" : "" } }),
+               UpdateOne({ "_id" : "2" }, { "$set" : { "d" : 2 }, "$unset" : { "c" : "" } })
+            ], ordered = False)
+
+      self.assertEqual(self.coll.bulk_write.call_args[0][0], [
+            ReplaceOne({ "_id" : "1" }, { "_id" : "1" }, upsert = True)
+         ])
+
+   def test_partial_save(self):
+      old_pm = getattr(ODMModel, "_pm", None)
+      self.coll.find_one.return_value = { "_id" : "1", "a" : { "b" : 1, "c" : 2 } }
+
+      try:
+         ODMModel.set_pm(self.pm)
+
+         # New documents are replaced, loaded ones only send their changes
+         new = ODMModel({ "_id" : "2", "a" : 1 })
+         new.save()
+         self.coll.replace_one.assert_called_once_with({ "_id" : "2" }, { "_id" : "2", "a" : 1 }, upsert = True)
+
+         odm = ODMModel.find("1")
+         odm["a"]["b"] = 3
+         odm.save()
+         self.coll.update_one.assert_called_once_with({ "_id" : "1" }, { "$set" : { "a.b" : 3 } })
+
+         # Unchanged documents are not written
+         odm.save()
+         new.save()
+         self.assertEqual(self.coll.update_one.call_count, 1)
+         self.assertEqual(self.coll.replace_one.call_count, 1)
+      finally:
+         ODMModel.set_pm(old_pm)
+
+   def test_batch_callbacks(self):
+      old_pm      = getattr(ODMModel, "_pm", None)
+      old_before  = ODMModel.before_callbacks
+      old_after   = ODMModel.after_callbacks
+      saved       = []
+
+      try:
+         ODMModel.set_pm(self.pm)
+         ODMModel.before_callbacks = {}
+         ODMModel.after_callbacks  = {}
+         ODMModel.listen("before_save", lambda m: saved.append(("before", m["_id"])))
+         ODMModel.listen("after_save", lambda m: saved.append(("after", m["_id"])))
+
+         with ODMModel.batch():
+            ODMModel({ "_id" : "1" }).save()
+            ODMModel({ "_id" : "2" }).save()
+
+         self.assertEqual(saved, [
+               ("before", "1"), ("after", "1"), ("before", "2"), ("after", "2")
+            ])
+         self.assertEqual(len(self.coll.bulk_write.call_args[0][0]), 2)
+      finally:
+         ODMModel.set_pm(old_pm)
+         ODMModel.before_callbacks = old_before
+         ODMModel.after_callbacks  = old_after
@@ -260,3 +260,64 @@ class ODMAttrsTest(unittest.TestCase):
       self.attrs.set_changed(False)
       self.attrs["pippo"] = "ciao2"
       self.assertTrue(self.attrs.is_changed())
+
+   def test_changed_paths(self):
+      attrs = self.attrs
+      self.assertIsNone(attrs.changed_paths())
+
+      attrs.mark_as_persisted()
+      self.assertFalse(attrs.is_changed())
+      self.assertEqual(attrs.changed_paths(), ({}, {}))
+
+      # Changes made in place on nested dictionaries are found as well
+      attrs["another"]["deep"]["structure"] = "changed"
+      attrs.get_path("some.really.new", "n", build = True)
+      del attrs["some"]["no_deep"]
+      del attrs["particular"]
+      attrs["cat_name"] = { "a" : 1 }
+
+      self.assertEqual(attrs.changed_paths(), (
+            {
+               "another.deep.structure"   : "changed",
+               "some.really.new"          : "n",
+               "cat_name"                 : { "a" : 1 }
+            },
+            { "some.no_deep" : "", "particular" : "" }
+         ))
+
+      # Keys that can not be used in paths cause their parent to be set
+      attrs["another"]["deep"]["v1.2"] = 1
+      self.assertEqual(attrs.changed_paths()[0]["another.deep"], attrs["another"]["deep"])
+
+      attrs["_id"] = "other"
+      self.assertIsNone(attrs.changed_paths())
+
+   def test_changed_paths_with_tuples(self):
+      attrs = odm_attrs.ODMAttrs({ "_id" : "1", "point" : (1, 2), "poly" : { "points" : [ (0, 0), (1, 1) ] } })
+      attrs.mark_as_persisted()
+
+      # Tuples are stored as lists, values read or assigned again are unchanged
+      attrs["point"]    = (1, 2)
+      attrs["poly"]     = { "points" : [ [ 0, 0 ], (1, 1) ] }
+      self.assertEqual(attrs.changed_paths(), ({}, {}))
+
+      attrs["point"]             = (1, 3)
+      attrs["poly"]["points"][1] = (2, 2)
+      self.assertEqual(attrs.changed_paths(), (
+            { "point" : [ 1, 3 ], "poly.points" : [ [ 0, 0 ], [ 2, 2 ] ] }, {}
+         ))
+
+   def test_changed_paths_only_record_accessed_keys(self):
+      attrs = odm_attrs.ODMAttrs({ "_id" : "1", "a" : { "b" : 1 }, "c" : { "d" : 2 } })
+      attrs.mark_as_persisted()
+      self.assertEqual(attrs._snapshot, {})
+
+      attrs["a"]["b"] = 2
+      self.assertEqual(list(attrs._snapshot), [ "a" ])
+      self.assertEqual(attrs.changed_paths(), ({ "a.b" : 2 }, {}))
+
+      # After a save, references to accessed values are still tracked
+      a = attrs["a"]
+      attrs.mark_as_persisted()
+      a["b"] = 3
+      self.assertEqual(attrs.changed_paths(), ({ "a.b" : 3 }, {}))
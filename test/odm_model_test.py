@@ -162,3 +162,57 @@ class ODMModelTest(unittest.TestCase):
       MagicMock.assert_called_once_with(sempronio, odm)
       self.assertEqual(odm.pluto.call_count, 0)
       self.assertEqual(odm.after_callbacks_single["destroy"], [])
+
+   def test_session(self):
+      pm    = MongoDBPersistenceManager(db = MagicMock())
+      coll  = pm.db.__getitem__.return_value
+      coll.find_one.side_effect  = lambda q: q["_id"] == "1" and { "_id" : "1" } or None
+      coll.find.return_value     = [ { "_id" : "1" }, { "_id" : "2" } ]
+      ODMModel.set_pm(pm)
+
+      # Without a session every lookup builds a new instance
+      self.assertIsNot(ODMModel.find("1"), ODMModel.find("1"))
+
+      with ODMModel.session():
+         odm = ODMModel.find("1")
+         self.assertIs(ODMModel.find(" 1"), odm)
+         self.assertIsNone(ODMModel.find("3"))
+         self.assertIsNone(ODMModel.find("3"))
+         self.assertEqual(coll.find_one.call_count, 4)
+
+         where = list(ODMModel.where({}))
+         self.assertIs(where[0], odm)
+         self.assertIs(ODMModel.find("2"), where[1])
+
+         # Saved instances are found, destroyed ones are not
+         new = ODMModel({ "_id" : "3" })
+         new.save()
+         self.assertIs(ODMModel.find("3"), new)
+         new.destroy()
+         self.assertIsNone(ODMModel.find("3"))
+
+         ODMModel.evict([ "1" ])
+         self.assertIsNot(ODMModel.find("1"), odm)
+         self.assertEqual(coll.find_one.call_count, 5)
+
+      self.assertIsNone(ODMModel._identity_map)
+
+   def test_projection(self):
+      pm    = MongoDBPersistenceManager(db = MagicMock())
+      coll  = pm.db.__getitem__.return_value
+      coll.find.return_value     = [ { "_id" : "1" } ]
+      coll.find_one.return_value = { "_id" : "1" }
+      ODMModel.set_pm(pm)
+
+      self.assertEqual(list(ODMModel.where({}, [ "_id" ], raw = True)), [ { "_id" : "1" } ])
+      coll.find.assert_called_once_with({}, [ "_id" ])
+
+      self.assertEqual(ODMModel.find("1", { "a" : 1 }, raw = True), { "_id" : "1" })
+      coll.find_one.assert_called_once_with({ "_id" : "1" }, { "a" : 1 })
+
+      # Partial documents are not part of the session
+      with ODMModel.session():
+         partial = ODMModel.find_by_field("a", 1, [ "a" ])
+         self.assertIsInstance(partial, ODMModel)
+         self.assertIsNot(ODMModel.find("1"), partial)
+         self.assertIsNot(next(ODMModel.where({}, [ "_id" ])), ODMModel.find("1"))
@@ -111,3 +111,36 @@ class PolygonPointsInsideTest(unittest.TestCase):
 
          for (x, y) in test_polygon["falses"]:
             polygon_not_contains(test_polygon["polygon"], x, y)
+
+   def test_polygon_contains_points_batch(self):
+      points = [ (5, 5), (0, 0), (10, 5), (5, -4), (10.001, 10.001), (6, 6), (5.1, 5.1) ]
+
+      self.assertEqual(
+         self.polygon1.contains_points(points).tolist(),
+         [ True, True, True, False, False, True, True ]
+      )
+
+      self.assertEqual(
+         self.polygon3.contains_points(points).tolist(),
+         [ True, True, True, False, False, False, False ]
+      )
+
+      self.assertEqual(self.polygon1.contains_points([]).tolist(), [])
+
+   def test_closed_polygon_counts_vertices_once(self):
+      closed = Polygon.from_relative_coordinates((0, 0), [(0,0),(10,0),(10,10),(0,10),(0,0)])
+
+      for x, y in [ (5, 0), (5, 5), (5, 10), (10, 10), (9, 0.5) ]:
+         self.assertTrue(closed._contains_point(Point(x, y)))
+
+      for x, y in [ (11, 0), (11, 10), (-1, 0), (5, 10.1) ]:
+         self.assertFalse(closed._contains_point(Point(x, y)))
+
+   def test_non_integer_point_on_border(self):
+      polygon = Polygon.from_relative_coordinates((0, 0), [
+         (2,9),(6,0),(3,1),(2,1),(10,9),(6,7),(10,1),(7,5),(2,10),(1,10),(10,3),(8,7),(2,9)
+      ])
+
+      # Over the edge (8, 7) -> (2, 9)
+      self.assertTrue(polygon._contains_point(Point(2.3, 8.9)))
+      self.assertTrue(polygon.contains_points([ (2.3, 8.9), (5, 8) ]).all())
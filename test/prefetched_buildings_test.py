@@ -0,0 +1,45 @@
+import unittest
+from persistence.db        import MongoDBPersistenceManager
+from model.odm             import ODMModel
+from model                 import Building
+from tasks.data_updaters.prefetched_buildings import PrefetchedBuildings
+from mock                  import MagicMock
+
+class PrefetchedBuildingsTest(unittest.TestCase):
+
+   def setUp(self):
+      self.old_pm = getattr(ODMModel, "_pm", None)
+      self.coll   = MagicMock()
+      ODMModel.set_pm(MongoDBPersistenceManager(db = { "building" : self.coll }))
+
+      self.coll.find.return_value      = [ { "_id" : "11010" }, { "_id" : "21030" } ]
+      self.coll.find_one.return_value  = None
+
+   def tearDown(self):
+      ODMModel.set_pm(self.old_pm)
+
+   def test_single_query(self):
+      buildings = PrefetchedBuildings([ "11010", " 21030", "11010", "5703" ])
+
+      query = self.coll.find.call_args[0][0]
+      self.assertEqual(sorted(query["_id"]["$in"]), [ "11010", "21030", "5703" ])
+
+      self.assertEqual(buildings.find("21030")["_id"], "21030")
+      self.assertIs(buildings.find("11010"), buildings.find_or_create("11010"))
+
+      # Prefetched ids are never looked up again, missing ones are created once
+      self.assertIsNone(buildings.find("5703"))
+      created = buildings.find_or_create("5703")
+      self.assertIs(buildings.find_or_create("5703"), created)
+      self.assertFalse(self.coll.find_one.called)
+
+   def test_fallback_and_forget(self):
+      buildings = PrefetchedBuildings([ "11010" ])
+
+      self.coll.find_one.return_value = { "_id" : "1234" }
+      self.assertEqual(buildings.find("1234")["_id"], "1234")
+      buildings.find("1234")
+      self.coll.find_one.assert_called_once_with({ "_id" : "1234" })
+
+      buildings.forget(buildings.find("11010"))
+      self.assertIsNone(buildings.find("11010"))
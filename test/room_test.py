@@ -83,6 +83,11 @@ class RoomTest(unittest.TestCase):
       self.assertTrue(self.room1.contains_text(t1))
       self.assertFalse(self.room1.contains_text(t2))
 
+   def test_room_contains_points(self):
+      self.room3.traslate(100, 100)
+      points = [ (105, 105), (102, 108), (108, 108), (5, 5) ]
+      self.assertEqual(self.room3.contains_points(points).tolist(), [ True, True, False, False ])
+
    ###################
    # TRANSFORMATIONS #
    ###################
@@ -115,10 +120,11 @@ class RoomTest(unittest.TestCase):
                         [Point(0,0), Point(10,0), Point(10,-10), Point(0,-10)]
                      )
 
-      self.polygon1.anchor_point.reflect_y = MagicMock()
+      # Points have __slots__: they are replaced by mocks wrapping them
+      self.polygon1.anchor_point = MagicMock(wraps = self.polygon1.anchor_point)
       self.polygon1.reflect_y = MagicMock()
       for t in self.room1.texts:
-         t.anchor_point.reflect_y = MagicMock()
+         t.anchor_point = MagicMock(wraps = t.anchor_point)
 
       self.room1.reflect_y()
 
@@ -130,7 +136,7 @@ class RoomTest(unittest.TestCase):
    def test_room_scale(self):
       self.room1.polygon = MagicMock()
       for p in self.room1.texts:
-         p.anchor_point.scale =  MagicMock()
+         p.anchor_point = MagicMock(wraps = p.anchor_point)
 
       self.room1.scale(2)
 
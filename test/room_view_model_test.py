@@ -0,0 +1,84 @@
+import unittest
+from persistence.db  import MongoDBPersistenceManager
+from model.odm       import ODMModel
+from model           import BuildingView, RoomView
+from mock            import MagicMock
+
+class RoomViewModelTest(unittest.TestCase):
+
+   def setUp(self):
+      self.old_pm = getattr(ODMModel, "_pm", None)
+      self.coll   = MagicMock()
+      ODMModel.set_pm(MongoDBPersistenceManager(db = { "roomview" : self.coll }))
+
+      self.building_view = BuildingView({
+         "_id"             : "21030",
+         "building_name"   : "Dipartimento di Informatica",
+         "address"         : "Via Comelico, 39, Milano",
+         "coordinates"     : { "type" : "Point", "coordinates" : [ 9.214915, 45.454309 ] },
+         "floors"          : [
+            {
+               "f_id"         : "0",
+               "floor_name"   : "Piano terra",
+               "rooms"        : { "R001" : { "room_name" : "Aula Alfa", "cat_name" : "Aula" } }
+            },
+            {
+               "f_id"         : "10",
+               "rooms"        : { "T001" : { "room_name" : "Aula Beta" } }
+            }
+         ]
+      })
+
+   def tearDown(self):
+      ODMModel.set_pm(self.old_pm)
+
+   def test_create_from_building_view(self):
+      rooms = { r["r_id"] : r for r in RoomView.create_from_building_view(self.building_view) }
+
+      self.assertEqual(set(rooms), { "R001", "T001" })
+      self.assertEqual(rooms["R001"].as_dict(), {
+         "_id"                   : RoomView.room_id("21030", "R001"),
+         "b_id"                  : "21030",
+         "r_id"                  : "R001",
+         "room_name"             : "Aula Alfa",
+         "cat_name"              : "Aula",
+         "building_name"         : "Dipartimento di Informatica",
+         "building_address"      : "Via Comelico, 39, Milano",
+         "building_coordinates"  : [ 9.214915, 45.454309 ],
+         "f_id"                  : "0",
+         "floor"                 : "Piano terra"
+      })
+      self.assertEqual(rooms["T001"]["floor"], "")
+
+      # Rooms of the building view are not modified
+      self.assertEqual(list(self.building_view["floors"][0]["rooms"]["R001"]), [ "room_name", "cat_name" ])
+
+   def test_update_building_rooms(self):
+      stale = RoomView.room_id("21030", "R999")
+      self.coll.find.return_value = [ { "_id" : RoomView.room_id("21030", "R001") }, { "_id" : stale } ]
+
+      RoomView.update_building_rooms(self.building_view)
+
+      # Rooms are written with a single bulk write
+      self.assertEqual(self.coll.bulk_write.call_count, 1)
+      self.assertEqual(len(self.coll.bulk_write.call_args[0][0]), 2)
+      self.assertFalse(self.coll.replace_one.called)
+      self.coll.delete_many.assert_called_once_with({ "_id" : { "$in" : [ stale ] } })
+
+   def test_save_and_find_room(self):
+      saved = {}
+      self.coll.find.return_value         = []
+      self.coll.bulk_write.side_effect    = lambda ops, ordered: saved.update(
+            (op._filter["_id"], op._doc) for op in ops
+         )
+      self.coll.find_one.side_effect      = lambda query, *args: saved.get(query["_id"])
+
+      RoomView.update_building_rooms(self.building_view)
+      self.assertEqual(set(saved), { "21030_R001", "21030_T001" })
+
+      room = RoomView.find_room("21030", "T001")
+      self.assertEqual(room["room_name"], "Aula Beta")
+      self.assertEqual(room["building_name"], "Dipartimento di Informatica")
+      self.assertEqual(room["building_coordinates"], [ 9.214915, 45.454309 ])
+      self.assertEqual(room["f_id"], "10")
+      self.assertIsNone(RoomView.find_room("21030", "X999"))
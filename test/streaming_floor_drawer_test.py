@@ -0,0 +1,37 @@
+import unittest, copy
+from tasks.drawers import FloorDrawer, StreamingFloorDrawer
+
+class StreamingFloorDrawerTest(unittest.TestCase):
+
+   def setUp(self):
+      def polygon(x, y):
+         return { "anchor_point" : { "x" : x, "y" : y }, "points" : [
+            { "x" : 0, "y" : 0 }, { "x" : 100.5, "y" : 0 }, { "x" : 100.5, "y" : 50 }, { "x" : 0, "y" : 50 }
+         ] }
+
+      self.floor = {
+         "f_id"               : "0",
+         "rooms"              : {
+            "R001"   : { "room_name" : "Aula di Informatica", "cat_id" : "AUL01", "polygon" : polygon(0, 0) },
+            "R&\"02" : { "room_name" : "Lab <A> & \"B\"", "cat_id" : "LAB01", "polygon" : polygon(200, 0) },
+            "R003"   : { "room_name" : "", "cat_id" : "WC01", "polygon" : polygon(0, 100) },
+            "R004"   : { "room_name" : "Senza poligono", "cat_id" : "AUL01" }
+         },
+         "unidentified_rooms" : [ { "cat_id" : "UFF01", "polygon" : polygon(300, 300) } ],
+         "walls"              : [ [ { "x" : 0, "y" : 0 }, { "x" : 500.4, "y" : 0 } ] ],
+         "windows"            : [ [ { "x" : 10, "y" : 0 }, { "x" : 20, "y" : 0 } ] ]
+      }
+
+   def assertSameOutput(self, floor):
+      expected = FloorDrawer.to_string(FloorDrawer.draw_floor(copy.deepcopy(floor)))
+      self.assertEqual(StreamingFloorDrawer.floor_to_string(copy.deepcopy(floor)), expected)
+
+   def test_same_output_as_svgwrite(self):
+      self.assertSameOutput(self.floor)
+
+   def test_empty_groups(self):
+      self.assertSameOutput({ "f_id" : "0", "rooms" : {} })
+
+      del self.floor["windows"]
+      self.floor["unidentified_rooms"] = []
+      self.assertSameOutput(self.floor)
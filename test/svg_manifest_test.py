@@ -0,0 +1,57 @@
+import unittest, tempfile, shutil, os, copy
+from tasks.drawers import FloorDrawer, SVGManifest
+
+class SVGManifestTest(unittest.TestCase):
+
+   def setUp(self):
+      self.folder    = tempfile.mkdtemp()
+      self.path      = os.path.join(self.folder, "manifest.json")
+      self.svg       = os.path.join(self.folder, "1234", "1234_0.svg")
+
+      os.makedirs(os.path.dirname(self.svg))
+      with open(self.svg, "w") as fp:
+         fp.write("<svg/>")
+
+      self.floor = {
+         "f_id"               : "0",
+         "rooms"              : {
+            "R001" : { "room_name" : "Aula 1", "cat_id" : "AUL01", "polygon" : { "points" : [] } }
+         },
+         "unidentified_rooms" : [],
+         "walls"              : [ [ { "x" : 0, "y" : 0 }, { "x" : 10, "y" : 0 } ] ],
+         "windows"            : []
+      }
+
+   def tearDown(self):
+      shutil.rmtree(self.folder)
+
+   def test_manifest(self):
+      manifest = SVGManifest(self.path)
+      self.assertFalse(manifest.is_current(self.svg, "abc"))
+
+      manifest.update(self.svg, "abc")
+      manifest.save()
+
+      manifest = SVGManifest(self.path)
+      self.assertTrue(manifest.is_current(self.svg, "abc"))
+      self.assertFalse(manifest.is_current(self.svg, "def"))
+
+      # Deleted maps are drawn again
+      os.remove(self.svg)
+      self.assertFalse(manifest.is_current(self.svg, "abc"))
+
+   def test_floor_hash(self):
+      digest = FloorDrawer.floor_hash(self.floor)
+      self.assertEqual(digest, FloorDrawer.floor_hash(copy.deepcopy(self.floor)))
+
+      # Keys not drawn do not matter
+      floor = copy.deepcopy(self.floor)
+      floor["rooms"]["R001"]["capacity"] = "20"
+      self.assertEqual(digest, FloorDrawer.floor_hash(floor))
+
+      floor["rooms"]["R001"]["room_name"] = "Aula 2"
+      self.assertNotEqual(digest, FloorDrawer.floor_hash(floor))
+
+      floor = copy.deepcopy(self.floor)
+      floor["walls"].append([ { "x" : 0, "y" : 0 }, { "x" : 0, "y" : 10 } ])
+      self.assertNotEqual(digest, FloorDrawer.floor_hash(floor))
@@ -0,0 +1,74 @@
+import unittest, tempfile, shutil, os
+from persistence.db  import MongoDBPersistenceManager
+from model.odm       import ODMModel
+from tasks           import SVGTask
+from mock            import MagicMock
+
+class SVGTaskTest(unittest.TestCase):
+
+   def setUp(self):
+      self.old_pm = getattr(ODMModel, "_pm", None)
+      self.folder = tempfile.mkdtemp()
+      self.coll   = MagicMock()
+      ODMModel.set_pm(MongoDBPersistenceManager(db = { "building" : self.coll }))
+
+      self.set_floors([ "0", "1", "2" ])
+
+   def set_floors(self, f_ids):
+      polygon  = { "anchor_point" : { "x" : 0, "y" : 0 }, "points" : [
+         { "x" : 0, "y" : 0 }, { "x" : 100, "y" : 0 }, { "x" : 100, "y" : 50 }, { "x" : 0, "y" : 50 }
+      ] }
+      floors   = [
+         {
+            "f_id"               : f_id,
+            "rooms"              : { "R00" + f_id : { "room_name" : "Aula " + f_id, "cat_id" : "AUL01", "polygon" : polygon } },
+            "unidentified_rooms" : [ { "cat_id" : "WC01", "polygon" : polygon } ],
+            "walls"              : [ [ { "x" : 0, "y" : 0 }, { "x" : 100, "y" : 0 } ] ],
+            "windows"            : []
+         }
+         for f_id in f_ids
+      ]
+      self.coll.find.side_effect = lambda *args: [ { "_id" : "1234", "merged" : { "floors" : floors } } ]
+
+   def tearDown(self):
+      ODMModel.set_pm(self.old_pm)
+      shutil.rmtree(self.folder)
+
+   def task(self, folder):
+      return SVGTask({ "folders" : { "data_svg_preprocessed_output" : os.path.join(self.folder, folder) } })
+
+   def read_maps(self, folder):
+      path = os.path.join(self.folder, folder, "1234")
+      return { name : open(os.path.join(path, name)).read() for name in os.listdir(path) }
+
+   def test_parallel_drawing(self):
+      serial   = self.task("serial")
+      parallel = self.task("parallel")
+
+      serial.perform_svg_update()
+      parallel.perform_svg_update(jobs = 2)
+
+      self.assertEqual(len(self.read_maps("serial")), 3)
+      self.assertEqual(self.read_maps("serial"), self.read_maps("parallel"))
+      self.assertEqual((parallel.redrawn, parallel.skipped), (3, 0))
+
+      # Unchanged floors are not drawn again
+      parallel = self.task("parallel")
+      parallel.perform_svg_update(jobs = 2)
+      self.assertEqual((parallel.redrawn, parallel.skipped), (0, 3))
+
+   def test_pending_drawings_are_bounded(self):
+      self.set_floors([ str(f) for f in range(12) ])
+      task     = self.task("parallel")
+      write    = task._write_drawings
+      pending  = []
+
+      def write_drawings(max_pending):
+         write(max_pending)
+         pending.append(len(task._pending))
+
+      task._write_drawings = write_drawings
+      task.perform_svg_update(jobs = 2)
+
+      self.assertEqual(max(pending), 4)
+      self.assertEqual(len(self.read_maps("parallel")), 12)
@@ -21,6 +21,9 @@ class ConfigManager:
    def __getitem__(self, index):
          return self._config[index]
 
+   def get(self, index, default = None):
+         return self._config.get(index, default)
+
    def _ensure_folders_exist(self):
       for key, value in self["folders"].items():
          try: